@@ -0,0 +1,54 @@
+"""add assessments.updated_at for delta exports
+
+Revision ID: 3b7c1d2e9f40
+Revises: e55aefa85615
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3b7c1d2e9f40"
+down_revision = "e55aefa85615"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "assessments",
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+    )
+    # existing rows: treat their creation as the last change
+    op.execute("UPDATE assessments SET updated_at = created_at")
+    op.create_index("ix_assessments_updated_at_id", "assessments", ["updated_at", "id"])
+
+    # Answer edits do not touch the parent row through the ORM, so bump it here.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION touch_assessment_updated_at() RETURNS trigger AS $$
+        BEGIN
+            UPDATE assessments SET updated_at = now()
+            WHERE id = COALESCE(NEW.assessment_id, OLD.assessment_id);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_assessment_answers_touch
+        AFTER INSERT OR UPDATE OR DELETE ON assessment_answers
+        FOR EACH ROW EXECUTE FUNCTION touch_assessment_updated_at();
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_assessment_answers_touch ON assessment_answers")
+    op.execute("DROP FUNCTION IF EXISTS touch_assessment_updated_at()")
+    op.drop_index("ix_assessments_updated_at_id", table_name="assessments")
+    op.drop_column("assessments", "updated_at")
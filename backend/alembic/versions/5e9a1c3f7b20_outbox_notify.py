@@ -0,0 +1,43 @@
+"""notify the outbox dispatcher on outbox_events inserts
+
+Revision ID: 5e9a1c3f7b20
+Revises: c41e9a7b5d28
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "5e9a1c3f7b20"
+down_revision = "c41e9a7b5d28"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Statement-level: one notification per inserting statement, delivered on
+    # commit (and Postgres folds identical notifications within a transaction).
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_outbox_events() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('outbox_events', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_outbox_events_notify
+        AFTER INSERT ON outbox_events
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_outbox_events();
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_outbox_events_notify ON outbox_events")
+    op.execute("DROP FUNCTION IF EXISTS notify_outbox_events()")
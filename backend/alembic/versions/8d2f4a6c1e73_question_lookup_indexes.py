@@ -0,0 +1,63 @@
+"""expression indexes for normalised question lookups
+
+Revision ID: 8d2f4a6c1e73
+Revises: 3b7c1d2e9f40
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8d2f4a6c1e73"
+down_revision = "3b7c1d2e9f40"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    dupes = conn.execute(
+        sa.text(
+            """
+            SELECT domain, lower(trim(category)) AS category, lower(trim(text)) AS text, count(*) AS n
+            FROM questions
+            GROUP BY 1, 2, 3
+            HAVING count(*) > 1
+            LIMIT 5
+            """
+        )
+    ).all()
+    if dupes:
+        raise RuntimeError(
+            "Cannot add uq_questions_domain_category_text_norm; remove duplicate questions first: "
+            + "; ".join(f"{d.domain}/{d.category}/{d.text[:40]!r} x{d.n}" for d in dupes)
+        )
+
+    # category filter in list_questions
+    op.create_index(
+        "ix_questions_category_norm",
+        "questions",
+        [sa.text("lower(trim(category))")],
+    )
+    # duplicate probe in create_question / bulk import, and the race-proof backstop
+    op.create_index(
+        "uq_questions_domain_category_text_norm",
+        "questions",
+        ["domain", sa.text("lower(trim(category))"), sa.text("lower(trim(text))")],
+        unique=True,
+    )
+    # ordered active-bank scans (list_questions, get_first/next_question)
+    op.create_index(
+        "ix_questions_active_order",
+        "questions",
+        ["is_active", "display_order", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_questions_active_order", table_name="questions")
+    op.drop_index("uq_questions_domain_category_text_norm", table_name="questions")
+    op.drop_index("ix_questions_category_norm", table_name="questions")
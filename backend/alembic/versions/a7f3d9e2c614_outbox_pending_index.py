@@ -0,0 +1,34 @@
+"""partial index on pending outbox events
+
+Revision ID: a7f3d9e2c614
+Revises: 5e9a1c3f7b20
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7f3d9e2c614"
+down_revision = "5e9a1c3f7b20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # outbox_events is written on every submission; don't block inserts while building
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_outbox_events_pending",
+            "outbox_events",
+            ["id"],
+            postgresql_where=sa.text("processed IS false"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_outbox_events_pending", table_name="outbox_events", postgresql_concurrently=True)
@@ -0,0 +1,91 @@
+"""touch assessments.updated_at once per answers statement, not once per row
+
+Revision ID: b6e2d4f8a1c7
+Revises: f3a8c5d1b962
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b6e2d4f8a1c7"
+down_revision = "f3a8c5d1b962"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_assessment_answers_touch ON assessment_answers")
+    op.execute("DROP FUNCTION IF EXISTS touch_assessment_updated_at()")
+
+    # One UPDATE per statement over the transition tables. Rows already stamped
+    # by this transaction (e.g. the assessment inserted alongside its answers on
+    # submission) are skipped, so a submission costs no extra parent writes.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION touch_assessments_from_answers() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE assessments SET updated_at = now()
+                WHERE id IN (SELECT assessment_id FROM new_rows) AND updated_at <> now();
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE assessments SET updated_at = now()
+                WHERE id IN (SELECT assessment_id FROM old_rows) AND updated_at <> now();
+            ELSE
+                UPDATE assessments SET updated_at = now()
+                WHERE id IN (SELECT assessment_id FROM new_rows UNION SELECT assessment_id FROM old_rows)
+                  AND updated_at <> now();
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    # transition tables need one trigger per event
+    op.execute(
+        """
+        CREATE TRIGGER trg_assessment_answers_touch_ins
+        AFTER INSERT ON assessment_answers REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION touch_assessments_from_answers();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_assessment_answers_touch_upd
+        AFTER UPDATE ON assessment_answers REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION touch_assessments_from_answers();
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_assessment_answers_touch_del
+        AFTER DELETE ON assessment_answers REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION touch_assessments_from_answers();
+        """
+    )
+
+
+def downgrade() -> None:
+    for suffix in ("del", "upd", "ins"):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_assessment_answers_touch_{suffix} ON assessment_answers")
+    op.execute("DROP FUNCTION IF EXISTS touch_assessments_from_answers()")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION touch_assessment_updated_at() RETURNS trigger AS $$
+        BEGIN
+            UPDATE assessments SET updated_at = now()
+            WHERE id = COALESCE(NEW.assessment_id, OLD.assessment_id);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_assessment_answers_touch
+        AFTER INSERT OR UPDATE OR DELETE ON assessment_answers
+        FOR EACH ROW EXECUTE FUNCTION touch_assessment_updated_at();
+        """
+    )
@@ -0,0 +1,56 @@
+"""immutable published question bank versions
+
+Revision ID: c41e9a7b5d28
+Revises: 8d2f4a6c1e73
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c41e9a7b5d28"
+down_revision = "8d2f4a6c1e73"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "question_bank_versions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("label", sa.String(100), nullable=True),
+        sa.Column("snapshot", sa.JSON(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(
+        "uq_question_bank_versions_active",
+        "question_bank_versions",
+        ["is_active"],
+        unique=True,
+        postgresql_where=sa.text("is_active"),
+    )
+
+    op.add_column("assessments", sa.Column("bank_version_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_assessments_bank_version", "assessments", "question_bank_versions",
+        ["bank_version_id"], ["id"], ondelete="RESTRICT",
+    )
+    op.add_column("chat_sessions", sa.Column("bank_version_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_chat_sessions_bank_version", "chat_sessions", "question_bank_versions",
+        ["bank_version_id"], ["id"], ondelete="RESTRICT",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("fk_chat_sessions_bank_version", "chat_sessions", type_="foreignkey")
+    op.drop_column("chat_sessions", "bank_version_id")
+    op.drop_constraint("fk_assessments_bank_version", "assessments", type_="foreignkey")
+    op.drop_column("assessments", "bank_version_id")
+    op.drop_index("uq_question_bank_versions_active", table_name="question_bank_versions")
+    op.drop_table("question_bank_versions")
@@ -0,0 +1,31 @@
+"""index outbox_events.created_at for retention purges
+
+Revision ID: d2b8e6f1a9c3
+Revises: a7f3d9e2c614
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "d2b8e6f1a9c3"
+down_revision = "a7f3d9e2c614"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_outbox_events_created_at",
+            "outbox_events",
+            ["created_at"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_outbox_events_created_at", table_name="outbox_events", postgresql_concurrently=True)
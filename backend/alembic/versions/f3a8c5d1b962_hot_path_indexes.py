@@ -0,0 +1,76 @@
+"""indexes for answer/recommendation foreign keys and completed-assessment reports
+
+Replaces the full (updated_at, id) index with a partial one on completed
+assessments: the delta export, its only reader, always filters on them.
+
+Revision ID: f3a8c5d1b962
+Revises: d2b8e6f1a9c3
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f3a8c5d1b962"
+down_revision = "d2b8e6f1a9c3"
+branch_labels = None
+depends_on = None
+
+# Not needed: assessment_answers.assessment_id leads uq_assessment_question, and
+# chat session lookups by (channel, phone[, state]) use uq_chat_sessions_channel_phone.
+
+COMPLETED = sa.text("overall_score > 0")
+
+
+def upgrade() -> None:
+    # built without blocking writes; each statement runs outside a transaction
+    with op.get_context().autocommit_block():
+        # RESTRICT checks when a question/option is deleted, and joins from the bank side
+        op.create_index(
+            "ix_assessment_answers_question_id", "assessment_answers", ["question_id"], postgresql_concurrently=True
+        )
+        op.create_index(
+            "ix_assessment_answers_option_id", "assessment_answers", ["option_id"], postgresql_concurrently=True
+        )
+        # cascade deletes and per-assessment lookups
+        op.create_index(
+            "ix_recommendations_assessment_id", "recommendations", ["assessment_id"], postgresql_concurrently=True
+        )
+        op.create_index("ix_assessments_created_at", "assessments", ["created_at"], postgresql_concurrently=True)
+        # reports only look at completed assessments
+        op.create_index(
+            "ix_assessments_completed_updated_at_id",
+            "assessments",
+            ["updated_at", "id"],
+            postgresql_where=COMPLETED,
+            postgresql_concurrently=True,
+        )
+        # superseded by the partial index above; dropped only once that exists
+        op.drop_index("ix_assessments_updated_at_id", table_name="assessments", postgresql_concurrently=True)
+        op.create_index(
+            "ix_assessments_completed_sector",
+            "assessments",
+            ["respondent_sector"],
+            postgresql_where=COMPLETED,
+            postgresql_include=["overall_score", "digital_score", "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_assessments_updated_at_id", "assessments", ["updated_at", "id"], postgresql_concurrently=True
+        )
+        for name, table in [
+            ("ix_assessments_completed_sector", "assessments"),
+            ("ix_assessments_completed_updated_at_id", "assessments"),
+            ("ix_assessments_created_at", "assessments"),
+            ("ix_recommendations_assessment_id", "recommendations"),
+            ("ix_assessment_answers_option_id", "assessment_answers"),
+            ("ix_assessment_answers_question_id", "assessment_answers"),
+        ]:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -2,8 +2,8 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.deps import get_current_user
-from app.models.user import User
+from app.core.deps import get_current_principal
+from app.core.principal_cache import Principal
 from app.schemas.assessment import AssessmentSubmitRequest, AssessmentResultOut
 from app.services.assessment_service import submit_assessment
 
@@ -14,7 +14,7 @@ router = APIRouter()
 async def submit_assessment_endpoint(
     payload: AssessmentSubmitRequest,
     db: AsyncSession = Depends(get_db),
-    user: User | None = Depends(get_current_user),
+    user: Principal | None = Depends(get_current_principal),
 ):
     result = await submit_assessment(
         db=db,
@@ -23,5 +23,6 @@ async def submit_assessment_endpoint(
         respondent_category=payload.respondent_category,
         answers=[a.model_dump() for a in payload.answers],
         user_id=user.id if user else None,
+        bank_version_id=payload.bank_version_id,
     )
     return result
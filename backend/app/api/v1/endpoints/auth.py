@@ -1,40 +1,67 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, get_admin_user
+from app.core.rate_limit import enforce_login_limits
+from app.core.security import decode_token
 from app.models.user import User
 from app.schemas.auth import (
     SignupRequest, LoginRequest, TokenResponse, LoginStepResponse,
     TwoFASetupResponse, TwoFAEnableRequest, TwoFAVerifyLoginRequest,
+    UserFlagsUpdate, UserOut,
 )
-from app.services.auth_service import signup, login_step, setup_2fa, enable_2fa, verify_2fa_login
+from app.services.auth_service import (
+    signup, login_step, setup_2fa, enable_2fa, verify_2fa_login, issue_access_token, update_user_flags,
+    provisioning_uri,
+)
+from app.utils.qr import QR_MEDIA_TYPES, qr_image
 
 router = APIRouter()
 
 
 @router.post("/signup", response_model=TokenResponse)
-async def signup_endpoint(payload: SignupRequest, db: AsyncSession = Depends(get_db)):
+async def signup_endpoint(payload: SignupRequest, request: Request, db: AsyncSession = Depends(get_db)):
+    await enforce_login_limits(request)
     user = await signup(db, payload.email, payload.full_name, payload.password)
-    result = await login_step(db, payload.email, payload.password)
-    return {"access_token": result["access_token"], "token_type": "bearer"}
+    # a fresh account has no 2FA, so skip re-verifying the password we just hashed
+    return {"access_token": issue_access_token(user), "token_type": "bearer"}
 
 
 @router.post("/login", response_model=LoginStepResponse)
-async def login_endpoint(payload: LoginRequest, db: AsyncSession = Depends(get_db)):
+async def login_endpoint(payload: LoginRequest, request: Request, db: AsyncSession = Depends(get_db)):
+    # throttle before any DB lookup or Argon2 verification
+    await enforce_login_limits(request, account=payload.email)
     result = await login_step(db, payload.email, payload.password)
     return result
 
 
 @router.post("/2fa/setup", response_model=TwoFASetupResponse)
 async def setup_2fa_endpoint(
+    request: Request,
+    qr_format: str = Query("png", pattern="^(png|svg)$"),
+    inline: bool = Query(True, description="false: return qr_image_url instead of a data URL"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await setup_2fa(current_user, db)
+    result = await setup_2fa(current_user, db, qr_format=qr_format, inline=inline)
+    if not inline:
+        result["qr_image_url"] = str(request.url_for("get_2fa_qr").include_query_params(format=qr_format))
     return result
 
 
+@router.get("/2fa/qr", name="get_2fa_qr")
+async def get_2fa_qr_endpoint(
+    format: str = Query("png", pattern="^(png|svg)$"),
+    current_user: User = Depends(get_current_user),
+):
+    if not current_user.totp_secret:
+        raise HTTPException(status_code=400, detail="2FA not initialized")
+    image = await qr_image(provisioning_uri(current_user), format)
+    # the image encodes the TOTP secret
+    return Response(content=image, media_type=QR_MEDIA_TYPES[format], headers={"Cache-Control": "private, no-store"})
+
+
 @router.post("/2fa/enable")
 async def enable_2fa_endpoint(
     payload: TwoFAEnableRequest,
@@ -46,6 +73,24 @@ async def enable_2fa_endpoint(
 
 
 @router.post("/2fa/verify-login", response_model=TokenResponse)
-async def verify_2fa_login_endpoint(payload: TwoFAVerifyLoginRequest, db: AsyncSession = Depends(get_db)):
+async def verify_2fa_login_endpoint(
+    payload: TwoFAVerifyLoginRequest, request: Request, db: AsyncSession = Depends(get_db)
+):
+    try:
+        account = f"user:{decode_token(payload.temp_token)['sub']}"
+    except Exception:
+        account = None  # verify_2fa_login rejects it; still counts against the IP
+    await enforce_login_limits(request, account=account)
     token = await verify_2fa_login(db, payload.temp_token, payload.code)
     return {"access_token": token, "token_type": "bearer"}
+
+
+@router.patch("/users/{user_id}", response_model=UserOut)
+async def update_user_flags_endpoint(
+    user_id: int,
+    payload: UserFlagsUpdate,
+    db: AsyncSession = Depends(get_db),
+    _admin=Depends(get_admin_user),
+):
+    """Activate/deactivate or promote/demote a user (admin)."""
+    return await update_user_flags(db, user_id, is_active=payload.is_active, is_admin=payload.is_admin)
@@ -1,26 +1,166 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import Select, select, func, tuple_
 from io import BytesIO
-import pandas as pd
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_read_db
 from app.core.deps import get_admin_user
-from app.models.assessment import Assessment, AssessmentAnswer
+from app.core.executor import export_executor
+from app.models.assessment import COMPLETED, Assessment, AssessmentAnswer
 from app.models.question import Question, QuestionOption
+from app.services.export_service import ExportRow, build_policy_report, build_delta_report
+from app.utils.cursor import encode_cursor, decode_cursor
 
 router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# rows per round trip while streaming the Raw Data rows
+EXPORT_FETCH_SIZE = 5_000
+# in ExportRow field order
+EXPORT_COLUMNS = (
+    Assessment.id,
+    Assessment.user_id,
+    Assessment.respondent_sector,
+    Assessment.respondent_category,
+    Assessment.overall_score,
+    Assessment.soft_score,
+    Assessment.digital_score,
+    Assessment.created_at,
+    Assessment.updated_at,
+)
+
+
+def completed_rows_stmt(
+    watermark: tuple[datetime, int] | None = None,
+    limit: int | None = None,
+    before: datetime | None = None,
+) -> Select:
+    # ix_assessments_completed_updated_at_id covers both the filter and the order
+    stmt = select(*EXPORT_COLUMNS).where(COMPLETED)
+    if watermark:
+        stmt = stmt.where(tuple_(Assessment.updated_at, Assessment.id) > tuple_(*watermark)).limit(limit)
+    if before:
+        stmt = stmt.where(Assessment.updated_at < before)
+    return stmt.order_by(Assessment.updated_at.asc(), Assessment.id.asc())
+
+
+async def fetch_export_rows(db: AsyncSession, stmt: Select) -> list[ExportRow]:
+    """Plain tuples, streamed in EXPORT_FETCH_SIZE chunks: no ORM identity map, no loop-blocking fetch."""
+    result = await db.stream(stmt.execution_options(yield_per=EXPORT_FETCH_SIZE))
+    rows: list[ExportRow] = []
+    async for chunk in result.partitions():
+        rows.extend(ExportRow._make(r) for r in chunk)
+    return rows
+
+
+def next_export_cursor(
+    records: list[ExportRow],
+    watermark: tuple[datetime, int] | None,
+    cutoff: datetime,
+) -> str:
+    """
+    Cursor after the last exported row stamped before `cutoff`.
+
+    updated_at is the writing transaction's start time (now()), so a
+    transaction that is still open can later commit rows stamped earlier
+    than rows already exported. Keeping the cursor EXPORT_CURSOR_LAG_SECONDS
+    behind the database clock means such rows are only missed if their
+    transaction ran longer than that; rows past the cutoff in a full export
+    are simply exported again by the next delta.
+    """
+    for r in reversed(records):
+        if r.updated_at < cutoff:
+            return encode_cursor(r.updated_at, r.id)
+    if watermark:
+        return encode_cursor(*watermark)
+    return encode_cursor(cutoff, 0)
+
+
+def sector_performance_stmt() -> Select:
+    # index-only scan of ix_assessments_completed_sector
+    return (
+        select(
+            Assessment.respondent_sector,
+            func.avg(Assessment.overall_score),
+            func.avg(Assessment.digital_score),
+            func.count(Assessment.id),
+        )
+        .where(COMPLETED)
+        .group_by(Assessment.respondent_sector)
+    )
+
+
+async def _resolve_since(db: AsyncSession, since: str) -> tuple[datetime, int]:
+    """
+    Turn a `since` value into an (updated_at, id) watermark.
+
+    Accepts:
+      - the opaque cursor returned in X-Next-Cursor (preferred)
+      - an assessment id: everything created or changed after that assessment was created
+      - an ISO-8601 timestamp: everything created or changed after that instant
+    """
+    if since.isdigit():
+        created_at = (
+            await db.execute(select(Assessment.created_at).where(Assessment.id == int(since)))
+        ).scalar_one_or_none()
+        if created_at is None:
+            raise HTTPException(status_code=400, detail="Unknown assessment id in 'since'")
+        return created_at, int(since)
+
+    try:
+        ts = datetime.fromisoformat(since)
+        return (ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)), 0
+    except ValueError:
+        pass
+
+    try:
+        ts, last_id = decode_cursor(since)
+        return datetime.fromisoformat(ts), int(last_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid 'since' cursor")
+
 
 @router.get("/assessments.xlsx")
 async def export_assessments_excel(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     _admin=Depends(get_admin_user),
+    since: Optional[str] = Query(
+        None,
+        description="Cursor from a previous export's X-Next-Cursor header, an assessment id, or an ISO timestamp. "
+                    "When set, only the Raw Data sheet is returned, limited to rows added or changed after it.",
+    ),
+    limit: int = Query(50_000, ge=1, le=500_000),
 ):
+    # Only the async DB reads happen here, streamed as plain tuples; shaping the
+    # rows and building the workbook run in export_executor so the event loop
+    # keeps serving webhooks meanwhile.
+    watermark = await _resolve_since(db, since) if since else None
+    db_now = (await db.execute(select(func.now()))).scalar_one()
+    cutoff = db_now - timedelta(seconds=settings.EXPORT_CURSOR_LAG_SECONDS)
+
     # -------------------------------------------------------
-    # 1️⃣ NATIONAL SUMMARY (Completed Assessments Only)
+    # RAW DATA (Cleaned – Completed Only)
+    # Ordered by (updated_at, id); deltas stop at the cursor safety lag.
     # -------------------------------------------------------
+    records = await fetch_export_rows(db, completed_rows_stmt(watermark, limit, before=cutoff if watermark else None))
+
+    headers = {
+        "Content-Disposition": "attachment; filename=skills_policy_report.xlsx",
+        NEXT_CURSOR_HEADER: next_export_cursor(records, watermark, cutoff),
+    }
+
+    if watermark:
+        content = await export_executor.run(build_delta_report, records)
+        headers["Content-Disposition"] = "attachment; filename=skills_policy_delta.xlsx"
+        return StreamingResponse(BytesIO(content), media_type=XLSX_MEDIA_TYPE, headers=headers)
+
+    # NATIONAL SUMMARY (Completed Assessments Only)
     summary_q = await db.execute(
         select(
             func.count(Assessment.id),
@@ -28,23 +168,11 @@ async def export_assessments_excel(
             func.avg(Assessment.soft_score),
             func.avg(Assessment.digital_score),
         )
-        .where(Assessment.overall_score > 0)
+        .where(COMPLETED)
     )
+    summary = tuple(summary_q.one())
 
-    total, avg_overall, avg_soft, avg_digital = summary_q.one()
-
-    summary_df = pd.DataFrame([
-        {
-            "Total Assessments": int(total or 0),
-            "Average Overall Score": round(float(avg_overall or 0), 2),
-            "Average Soft Skills": round(float(avg_soft or 0), 2),
-            "Average Digital Skills": round(float(avg_digital or 0), 2),
-        }
-    ])
-
-    # -------------------------------------------------------
-    # 2️⃣ SKILL GAP ANALYSIS (Lowest Scores First)
-    # -------------------------------------------------------
+    # SKILL GAP ANALYSIS (Lowest Scores First)
     skill_q = await db.execute(
         select(
             Question.category.label("skill_area"),
@@ -57,122 +185,12 @@ async def export_assessments_excel(
         .group_by(Question.category)
         .order_by(func.avg(QuestionOption.score).asc())
     )
+    skill_rows = [tuple(r) for r in skill_q.all()]
 
-    skill_rows = skill_q.all()
-
-    skill_data = []
-    for r in skill_rows:
-        avg_score = round(float(r.avg_score or 0), 2)
-
-        if avg_score < 3:
-            risk = "High"
-        elif avg_score < 3.5:
-            risk = "Medium"
-        else:
-            risk = "Low"
-
-        skill_data.append({
-            "Skill Area": r.skill_area,
-            "Average Score": avg_score,
-            "Risk Level": risk,
-            "Total Responses": int(r.responses),
-        })
-
-    skill_df = pd.DataFrame(skill_data)
-
-    # -------------------------------------------------------
-    # 3️⃣ SECTOR PERFORMANCE
-    # -------------------------------------------------------
-    sector_q = await db.execute(
-        select(
-            Assessment.respondent_sector,
-            func.avg(Assessment.overall_score),
-            func.avg(Assessment.digital_score),
-            func.count(Assessment.id),
-        )
-        .where(Assessment.overall_score > 0)
-        .group_by(Assessment.respondent_sector)
-    )
-
-    sector_rows = sector_q.all()
-
-    sector_data = [
-        {
-            "Sector": r[0],
-            "Avg Overall Score": round(float(r[1] or 0), 2),
-            "Avg Digital Score": round(float(r[2] or 0), 2),
-            "Assessments": int(r[3]),
-        }
-        for r in sector_rows if r[0] is not None
-    ]
-
-    sector_df = pd.DataFrame(sector_data)
-
-    # -------------------------------------------------------
-    # 4️⃣ RISK DISTRIBUTION (Overall Score)
-    # -------------------------------------------------------
-    risk_q = await db.execute(
-        select(Assessment.overall_score)
-        .where(Assessment.overall_score > 0)
-    )
-
-    scores = [r[0] for r in risk_q.all()]
-
-    risk_counts = {"High Risk (<3)": 0, "Medium Risk (3–3.5)": 0, "Low Risk (>3.5)": 0}
-
-    for s in scores:
-        if s < 3:
-            risk_counts["High Risk (<3)"] += 1
-        elif s < 3.5:
-            risk_counts["Medium Risk (3–3.5)"] += 1
-        else:
-            risk_counts["Low Risk (>3.5)"] += 1
-
-    risk_df = pd.DataFrame([
-        {"Risk Level": k, "Count": v}
-        for k, v in risk_counts.items()
-    ])
+    # SECTOR PERFORMANCE
+    sector_q = await db.execute(sector_performance_stmt())
+    sector_rows = [tuple(r) for r in sector_q.all()]
 
-    # -------------------------------------------------------
-    # 5️⃣ RAW DATA (Cleaned – Completed Only)
-    # -------------------------------------------------------
-    rows = await db.execute(
-        select(Assessment).where(Assessment.overall_score > 0)
-    )
-    records = rows.scalars().all()
-
-    raw_data = [
-        {
-            "Assessment ID": r.id,
-            "User ID": r.user_id,
-            "Sector": r.respondent_sector,
-            "Category": r.respondent_category,
-            "Overall Score": r.overall_score,
-            "Soft Score": r.soft_score,
-            "Digital Score": r.digital_score,
-            "Created At": r.created_at.isoformat() if r.created_at else None,
-        }
-        for r in records
-    ]
-
-    raw_df = pd.DataFrame(raw_data)
-
-    # -------------------------------------------------------
-    # WRITE MULTI-SHEET EXCEL
-    # -------------------------------------------------------
-    output = BytesIO()
-
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        summary_df.to_excel(writer, index=False, sheet_name="National Summary")
-        skill_df.to_excel(writer, index=False, sheet_name="Skill Gaps")
-        sector_df.to_excel(writer, index=False, sheet_name="Sector Analysis")
-        risk_df.to_excel(writer, index=False, sheet_name="Risk Distribution")
-        raw_df.to_excel(writer, index=False, sheet_name="Raw Data")
-
-    output.seek(0)
-
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=skills_policy_report.xlsx"},
-    )
\ No newline at end of file
+    # the risk distribution is computed from the completed rows fetched above
+    content = await export_executor.run(build_policy_report, summary, skill_rows, sector_rows, records)
+    return StreamingResponse(BytesIO(content), media_type=XLSX_MEDIA_TYPE, headers=headers)
@@ -1,57 +1,234 @@
 from __future__ import annotations
 
-import re
+from collections.abc import AsyncGenerator
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import Select, func, select, tuple_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
 from app.core.deps import get_admin_user
 from app.models.question import Question, QuestionOption
-from app.schemas.question import QuestionCreate, QuestionOut
+from app.models.question_bank import QuestionBankVersion
+from app.schemas.question import (
+    QuestionCreate,
+    QuestionOut,
+    QuestionSummaryOut,
+    QuestionCountOut,
+    QuestionImportReport,
+    QuestionBankPublishRequest,
+    QuestionBankVersionOut,
+    QuestionBankVersionDetail,
+)
+from app.services.question_bank_service import (
+    BankSnapshot,
+    activate_version,
+    get_active_snapshot,
+    get_snapshot,
+    publish_version,
+)
+from app.services.question_cache import CachedBody, accepts_gzip, etag_matches, make_cached_body, question_cache
+from app.services.question_import_service import (
+    MAX_IMPORT_ROWS,
+    import_questions,
+    parse_csv_rows,
+    parse_json_rows,
+    question_rule_error,
+)
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.text import normalize_spaces
 
 router = APIRouter()
 
+_question_list_adapter = TypeAdapter(list[QuestionOut])
+_question_summary_adapter = TypeAdapter(list[QuestionSummaryOut])
+QUESTION_FIELDS = frozenset(QuestionOut.model_fields)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+BANK_VERSION_HEADER = "X-Bank-Version"
 
-def _normalize_spaces(value: str) -> str:
-    """Trim and collapse repeated whitespace to a single space."""
-    return re.sub(r"\s+", " ", value.strip())
+
+def _filtered(stmt: Select, active_only: bool, domain: str | None, norm_category: str | None) -> Select:
+    if active_only:
+        stmt = stmt.where(Question.is_active.is_(True))
+
+    if domain:
+        stmt = stmt.where(Question.domain == domain)
+
+    if norm_category is not None:
+        stmt = stmt.where(func.lower(func.trim(Question.category)) == norm_category)
+
+    return stmt
+
+
+def list_questions_stmt(
+    active_only: bool,
+    domain: str | None,
+    norm_category: str | None,
+    after: tuple[int, int] | None = None,
+    limit: int | None = None,
+) -> Select:
+    """
+    Ordered bank scan. The category predicate matches ix_questions_category_norm
+    and the (display_order, id) keyset matches ix_questions_active_order; keep them in sync.
+    """
+    stmt = _filtered(select(Question), active_only, domain, norm_category)
+
+    if after is not None:
+        stmt = stmt.where(tuple_(Question.display_order, Question.id) > tuple_(*after))
+
+    stmt = stmt.order_by(Question.display_order.asc(), Question.id.asc())
+    return stmt.limit(limit) if limit is not None else stmt
+
+
+def _parse_fields(fields: str | None) -> frozenset[str]:
+    if not fields:
+        return QUESTION_FIELDS
+    requested = frozenset(f.strip() for f in fields.split(",") if f.strip())
+    unknown = requested - QUESTION_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def _parse_question_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        display_order, last_id = decode_cursor(cursor)
+        return int(display_order), int(last_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def duplicate_question_stmt(domain: str, norm_category: str, norm_text: str) -> Select:
+    """Probe served by the uq_questions_domain_category_text_norm expression index."""
+    return (
+        select(Question.id)
+        .where(Question.domain == domain)
+        .where(func.lower(func.trim(Question.category)) == norm_category.lower())
+        .where(func.lower(func.trim(Question.text)) == norm_text.lower())
+        .limit(1)
+    )
+
+
+async def get_questions_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    `get_read_db`, except shortly after this process changed the bank: a
+    replica that has not replayed the write yet would be cached as fresh for
+    the whole TTL. The guard only uses a replica lagging at most
+    REPLICA_MAX_LAG_SECONDS, measured up to REPLICA_LAG_CHECK_SECONDS ago.
+    """
+    window = settings.REPLICA_MAX_LAG_SECONDS + settings.REPLICA_LAG_CHECK_SECONDS
+    read = get_db if question_cache.written_within(window) else get_read_db
+    async for db in read():
+        yield db
+
+
+def _cached_response(
+    request: Request,
+    entry: CachedBody,
+    cache_control: str = "no-cache",
+    bank: BankSnapshot | None = None,
+) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if entry.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = entry.next_cursor
+    if bank is not None:
+        # submit with this bank_version_id to be validated against the same questions
+        headers[BANK_VERSION_HEADER] = str(bank.version_id)
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=entry.gzipped, media_type="application/json", headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
 
 
 @router.get("", response_model=list[QuestionOut])
 async def list_questions(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_questions_read_db),
     active_only: bool = Query(False),
     domain: Optional[str] = Query(None, pattern="^(soft|digital)$"),
     category: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; omit for the whole bank"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of fields, e.g. id,text,category"),
 ):
-    stmt = select(Question).options(selectinload(Question.options))
+    """
+    With active_only=true and a published bank version active, lists that
+    version (what respondents answer and submissions are validated against)
+    and names it in X-Bank-Version; otherwise lists the live tables.
+    """
+    norm_category = normalize_spaces(category).lower() if category else None
+    selected = _parse_fields(fields)
+    after = _parse_question_cursor(cursor) if cursor else None
+    bank = await get_active_snapshot(db) if active_only else None
+    cache_key = (active_only, domain, norm_category, limit, after, selected, bank.version_id if bank else None)
 
-    if active_only:
-        stmt = stmt.where(Question.is_active.is_(True))
+    # Served from memory (or as a 304) until the bank changes; no DB round trip.
+    entry = question_cache.get(cache_key)
+    if entry is not None:
+        return _cached_response(request, entry, bank=bank)
 
-    if domain:
-        stmt = stmt.where(Question.domain == domain)
+    version = question_cache.version
+    with_options = "options" in selected
+    # fetch one extra row to learn whether another page exists
+    fetch = limit + 1 if limit else None
+    if bank is not None:
+        questions = bank.filtered(domain, norm_category, after, fetch)
+    else:
+        stmt = list_questions_stmt(active_only, domain, norm_category, after, fetch)
+        if with_options:
+            stmt = stmt.options(selectinload(Question.options))
+        result = await db.execute(stmt)
+        questions = result.scalars().unique().all()
 
-    if category:
-        norm_category = _normalize_spaces(category)
-        stmt = stmt.where(func.lower(func.trim(Question.category)) == norm_category.lower())
+    next_cursor = None
+    if limit and len(questions) > limit:
+        questions = questions[:limit]
+        next_cursor = encode_cursor(questions[-1].display_order, questions[-1].id)
+
+    adapter = _question_list_adapter if with_options else _question_summary_adapter
+    if with_options and bank is None:
+        # Ensure options are always in a predictable order for the UI/WhatsApp (snapshots already are)
+        for q in questions:
+            if q.options:
+                q.options.sort(key=lambda o: (o.score, o.label, o.id))
+
+    include = None if selected == QUESTION_FIELDS else {"__all__": set(selected)}
+    body = adapter.dump_json(adapter.validate_python(questions), include=include)
+    return _cached_response(request, question_cache.put(cache_key, body, version, next_cursor), bank=bank)
 
-    stmt = stmt.order_by(Question.display_order.asc(), Question.id.asc())
 
-    result = await db.execute(stmt)
-    questions = result.scalars().unique().all()
+@router.get("/count", response_model=QuestionCountOut)
+async def count_questions(
+    request: Request,
+    db: AsyncSession = Depends(get_questions_read_db),
+    active_only: bool = Query(False),
+    domain: Optional[str] = Query(None, pattern="^(soft|digital)$"),
+    category: Optional[str] = Query(None),
+):
+    norm_category = normalize_spaces(category).lower() if category else None
+    # counts what GET /questions lists for the same filters
+    bank = await get_active_snapshot(db) if active_only else None
+    cache_key = ("count", active_only, domain, norm_category, bank.version_id if bank else None)
 
-    # Ensure options are always in a predictable order for the UI/WhatsApp
-    for q in questions:
-        if q.options:
-            q.options.sort(key=lambda o: (o.score, o.label, o.id))
+    entry = question_cache.get(cache_key)
+    if entry is not None:
+        return _cached_response(request, entry, bank=bank)
 
-    return questions
+    version = question_cache.version
+    if bank is not None:
+        count = len(bank.filtered(domain, norm_category))
+    else:
+        stmt = _filtered(select(func.count()).select_from(Question), active_only, domain, norm_category)
+        count = (await db.execute(stmt)).scalar_one()
+    body = QuestionCountOut(count=count).model_dump_json().encode()
+    return _cached_response(request, question_cache.put(cache_key, body, version), bank=bank)
 
 
 @router.post("", response_model=QuestionOut, status_code=201)
@@ -60,21 +237,17 @@ async def create_question(
     db: AsyncSession = Depends(get_db),
     _admin=Depends(get_admin_user),
 ):
-    if len(payload.options) < 2:
-        raise HTTPException(status_code=400, detail="At least two options required")
+    # Option count + unique labels (A/B/C/D/E, stored uppercase)
+    rule_error = question_rule_error(payload)
+    if rule_error:
+        raise HTTPException(status_code=400, detail=rule_error)
 
     # Normalize inputs (helps avoid accidental duplicates)
-    norm_text = _normalize_spaces(payload.text)
-    norm_category = _normalize_spaces(payload.category)
+    norm_text = normalize_spaces(payload.text)
+    norm_category = normalize_spaces(payload.category)
 
     # 1) API-level duplicate check (friendly error message)
-    dup_stmt = (
-        select(Question.id)
-        .where(Question.domain == payload.domain)
-        .where(func.lower(func.trim(Question.category)) == norm_category.lower())
-        .where(func.lower(func.trim(Question.text)) == norm_text.lower())
-        .limit(1)
-    )
+    dup_stmt = duplicate_question_stmt(payload.domain, norm_category, norm_text)
     existing_id = (await db.execute(dup_stmt)).scalar_one_or_none()
     if existing_id:
         raise HTTPException(
@@ -82,11 +255,6 @@ async def create_question(
             detail="Question already exists (same domain/category/text)",
         )
 
-    # 2) Validate option labels are unique and store them uppercase (A/B/C/D/E)
-    labels = [op.label.strip().upper() for op in payload.options]
-    if len(labels) != len(set(labels)):
-        raise HTTPException(status_code=400, detail="Duplicate option labels are not allowed")
-
     question = Question(
         text=norm_text,
         domain=payload.domain,
@@ -99,7 +267,7 @@ async def create_question(
         question.options.append(
             QuestionOption(
                 label=op.label.strip().upper(),
-                text=_normalize_spaces(op.text),
+                text=normalize_spaces(op.text),
                 score=op.score,
             )
         )
@@ -110,9 +278,11 @@ async def create_question(
         await db.commit()
     except IntegrityError:
         await db.rollback()
-        # In case you add DB constraints later, this remains a safe fallback
+        # Concurrent insert lost the race on uq_questions_domain_category_text_norm
         raise HTTPException(status_code=409, detail="Duplicate detected (DB constraint)")
 
+    question_cache.invalidate()
+
     # Return with options loaded + predictable ordering
     result = await db.execute(
         select(Question)
@@ -123,3 +293,110 @@ async def create_question(
     if created.options:
         created.options.sort(key=lambda o: (o.score, o.label, o.id))
     return created
+
+
+@router.post("/import", response_model=QuestionImportReport)
+async def import_questions_endpoint(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    _admin=Depends(get_admin_user),
+    dry_run: bool = Query(False, description="Validate and check duplicates without inserting"),
+):
+    """
+    Bulk-load questions. Send either a JSON list of QuestionCreate objects
+    (Content-Type: application/json) or a CSV file (Content-Type: text/csv)
+    with columns text,domain,category,display_order,is_active,option_a,score_a,...,option_e,score_e.
+    Returns a per-row report; duplicates and invalid rows are skipped, not fatal.
+    """
+    raw = await request.body()
+    content_type = request.headers.get("content-type", "")
+    try:
+        items = parse_csv_rows(raw) if "csv" in content_type else parse_json_rows(raw)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    if not items:
+        raise HTTPException(status_code=400, detail="No rows to import")
+    if len(items) > MAX_IMPORT_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_IMPORT_ROWS} rows per import")
+
+    try:
+        report = await import_questions(db, items, dry_run=dry_run)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Duplicate detected (DB constraint)")
+
+    if report["created"]:
+        question_cache.invalidate()
+    return report
+
+
+# --------------------------
+# Published bank versions
+# --------------------------
+
+def _version_body(bank: BankSnapshot) -> CachedBody:
+    def build() -> CachedBody:
+        detail = QuestionBankVersionDetail(
+            version_id=bank.version_id,
+            questions=[QuestionOut.model_validate(q) for q in bank.questions],
+        )
+        return make_cached_body(detail.model_dump_json().encode(), version=bank.version_id)
+
+    return bank.derived("api_body", build)
+
+
+@router.get("/versions", response_model=list[QuestionBankVersionOut])
+async def list_bank_versions(db: AsyncSession = Depends(get_db)):
+    rows = await db.execute(
+        select(
+            QuestionBankVersion.id,
+            QuestionBankVersion.label,
+            QuestionBankVersion.is_active,
+            QuestionBankVersion.created_at,
+        )
+        .order_by(QuestionBankVersion.id.desc())
+    )
+    return [QuestionBankVersionOut.model_validate(r) for r in rows.all()]
+
+
+@router.post("/versions", response_model=QuestionBankVersionOut, status_code=201)
+async def publish_bank_version(
+    payload: QuestionBankPublishRequest,
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(get_admin_user),
+):
+    """Freeze the current active questions and options into a new immutable version."""
+    version = await publish_version(db, label=payload.label, created_by=admin.id, activate=payload.activate)
+    return version
+
+
+@router.post("/versions/{version_id}/activate", response_model=QuestionBankVersionOut)
+async def activate_bank_version(
+    version_id: int,
+    db: AsyncSession = Depends(get_db),
+    _admin=Depends(get_admin_user),
+):
+    if not await activate_version(db, version_id):
+        raise HTTPException(status_code=404, detail="Bank version not found")
+    version = (
+        await db.execute(select(QuestionBankVersion).where(QuestionBankVersion.id == version_id))
+    ).scalar_one()
+    return version
+
+
+@router.get("/versions/active", response_model=QuestionBankVersionDetail)
+async def get_active_bank_version(request: Request, db: AsyncSession = Depends(get_db)):
+    bank = await get_active_snapshot(db)
+    if bank is None:
+        raise HTTPException(status_code=404, detail="No bank version has been published")
+    # the pointer can move, so clients must revalidate; the body itself is per-version
+    return _cached_response(request, _version_body(bank))
+
+
+@router.get("/versions/{version_id}", response_model=QuestionBankVersionDetail)
+async def get_bank_version(version_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    bank = await get_snapshot(db, version_id)
+    if bank is None:
+        raise HTTPException(status_code=404, detail="Bank version not found")
+    return _cached_response(request, _version_body(bank), cache_control="public, max-age=31536000, immutable")
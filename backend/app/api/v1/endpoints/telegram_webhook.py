@@ -1,8 +1,9 @@
 import uuid
+from collections import defaultdict
 import httpx
 from fastapi import APIRouter, Request, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import Select, select, func, tuple_
 from sqlalchemy.orm import selectinload
 
 from app.core.config import settings
@@ -10,6 +11,8 @@ from app.core.database import get_db
 from app.models.question import Question, QuestionOption
 from app.models.assessment import Assessment, AssessmentAnswer, Recommendation
 from app.models.chat_session import ChatSession
+from app.services.assessment_service import assessment_submitted_event
+from app.services.question_bank_service import BankSnapshot, FrozenQuestion, get_active_snapshot, get_snapshot
 
 router = APIRouter()
 
@@ -60,17 +63,15 @@ async def get_next_question(db: AsyncSession, current: Question) -> Question | N
         select(Question)
         .options(selectinload(Question.options))
         .where(Question.is_active.is_(True))
-        .where(
-            (Question.display_order > current.display_order)
-            | ((Question.display_order == current.display_order) & (Question.id > current.id))
-        )
+        # row-value comparison so ix_questions_active_order serves this as a range scan
+        .where(tuple_(Question.display_order, Question.id) > tuple_(current.display_order, current.id))
         .order_by(Question.display_order.asc(), Question.id.asc())
         .limit(1)
     )
     return res.scalar_one_or_none()
 
 
-def format_question(q: Question, total: int | None = None) -> str:
+def format_question(q: Question | FrozenQuestion, total: int | None = None) -> str:
     header = f"Q{q.display_order}"
     if total:
         header = f"{header}/{total}"
@@ -98,8 +99,50 @@ async def count_active_questions(db: AsyncSession) -> int:
     return int(res.scalar_one())
 
 
-async def get_active_session(db: AsyncSession, user_id: str) -> ChatSession | None:
+# --------------------------
+# Bank access: the session's pinned published version, or the live tables
+# when nothing has been published yet
+# --------------------------
+
+async def pinned_bank(db: AsyncSession, session: ChatSession) -> BankSnapshot | None:
+    if session.bank_version_id is None:
+        return None
+    return await get_snapshot(db, session.bank_version_id)
+
+
+async def load_question(
+    db: AsyncSession, bank: BankSnapshot | None, question_id: int | None
+) -> Question | FrozenQuestion | None:
+    if bank:
+        return bank.by_id.get(question_id)
     res = await db.execute(
+        select(Question)
+        .options(selectinload(Question.options))
+        .where(Question.id == question_id)
+    )
+    return res.scalar_one_or_none()
+
+
+async def first_question(db: AsyncSession, bank: BankSnapshot | None) -> Question | FrozenQuestion | None:
+    return bank.first() if bank else await get_first_question(db)
+
+
+async def next_question(
+    db: AsyncSession, bank: BankSnapshot | None, current: Question | FrozenQuestion
+) -> Question | FrozenQuestion | None:
+    return bank.next_after(current.id) if bank else await get_next_question(db, current)
+
+
+async def question_message(db: AsyncSession, bank: BankSnapshot | None, q: Question | FrozenQuestion) -> str:
+    if bank:
+        # versions are immutable, so the rendered text is too
+        return bank.derived(("telegram_message", q.id), lambda: format_question(q, total=len(bank)))
+    return format_question(q, total=await count_active_questions(db))
+
+
+def active_session_stmt(user_id: str) -> Select:
+    # served by uq_chat_sessions_channel_phone; state is checked on the single row
+    return (
         select(ChatSession)
         .where(ChatSession.channel == "telegram")
         .where(ChatSession.phone == user_id)
@@ -107,6 +150,10 @@ async def get_active_session(db: AsyncSession, user_id: str) -> ChatSession | No
         .order_by(ChatSession.id.desc())
         .limit(1)
     )
+
+
+async def get_active_session(db: AsyncSession, user_id: str) -> ChatSession | None:
+    res = await db.execute(active_session_stmt(user_id))
     return res.scalar_one_or_none()
 
 
@@ -125,17 +172,63 @@ async def get_any_session(db: AsyncSession, user_id: str) -> ChatSession | None:
     return res.scalar_one_or_none()
 
 
-async def compute_scores(db: AsyncSession, assessment_id: int) -> tuple[float, float, float]:
-    rows = (
-        await db.execute(
-            select(Question.domain, func.avg(QuestionOption.score))
-            .select_from(AssessmentAnswer)
-            .join(QuestionOption, QuestionOption.id == AssessmentAnswer.option_id)
-            .join(Question, Question.id == AssessmentAnswer.question_id)
-            .where(AssessmentAnswer.assessment_id == assessment_id)
-            .group_by(Question.domain)
-        )
-    ).all()
+async def category_totals(
+    db: AsyncSession, assessment_id: int, bank: BankSnapshot | None = None
+) -> dict[str, list[float]]:
+    """[score sum, answers] per skill area (question category), as load_aggregates counts them."""
+    if bank:
+        option_ids = (
+            await db.execute(
+                select(AssessmentAnswer.option_id).where(AssessmentAnswer.assessment_id == assessment_id)
+            )
+        ).scalars().all()
+        totals: dict[str, list[float]] = {}
+        for oid in option_ids:
+            opt = bank.options_by_id.get(oid)
+            if opt:
+                entry = totals.setdefault(bank.by_id[opt.question_id].category, [0, 0])
+                entry[0] += opt.score
+                entry[1] += 1
+        return totals
+
+    rows = await db.execute(
+        select(Question.category, func.sum(QuestionOption.score), func.count(AssessmentAnswer.id))
+        .select_from(AssessmentAnswer)
+        .join(QuestionOption, QuestionOption.id == AssessmentAnswer.option_id)
+        .join(Question, Question.id == AssessmentAnswer.question_id)
+        .where(AssessmentAnswer.assessment_id == assessment_id)
+        .group_by(Question.category)
+    )
+    return {category: [float(total), int(n)] for category, total, n in rows.all()}
+
+
+async def compute_scores(
+    db: AsyncSession, assessment_id: int, bank: BankSnapshot | None = None
+) -> tuple[float, float, float]:
+    if bank:
+        # score against the frozen options the respondent actually saw
+        option_ids = (
+            await db.execute(
+                select(AssessmentAnswer.option_id).where(AssessmentAnswer.assessment_id == assessment_id)
+            )
+        ).scalars().all()
+        by_domain: dict[str, list[int]] = defaultdict(list)
+        for oid in option_ids:
+            opt = bank.options_by_id.get(oid)
+            if opt:
+                by_domain[bank.by_id[opt.question_id].domain].append(opt.score)
+        rows = [(domain, sum(v) / len(v)) for domain, v in by_domain.items()]
+    else:
+        rows = (
+            await db.execute(
+                select(Question.domain, func.avg(QuestionOption.score))
+                .select_from(AssessmentAnswer)
+                .join(QuestionOption, QuestionOption.id == AssessmentAnswer.option_id)
+                .join(Question, Question.id == AssessmentAnswer.question_id)
+                .where(AssessmentAnswer.assessment_id == assessment_id)
+                .group_by(Question.domain)
+            )
+        ).all()
 
     soft_avg = 0.0
     digital_avg = 0.0
@@ -215,7 +308,8 @@ async def telegram_webhook(request: Request, db: AsyncSession = Depends(get_db))
     # --------------------------
     if cmd == "ready":
 
-        first_q = await get_first_question(db)
+        bank = await get_active_snapshot(db)
+        first_q = await first_question(db, bank)
         if not first_q:
             await send_reply("No active questions found in the system.")
             return {"ok": True}
@@ -223,14 +317,9 @@ async def telegram_webhook(request: Request, db: AsyncSession = Depends(get_db))
         # If active session exists, continue
         existing_session = await get_active_session(db, user_id)
         if existing_session:
-            qres = await db.execute(
-                select(Question)
-                .options(selectinload(Question.options))
-                .where(Question.id == existing_session.current_question_id)
-            )
-            current_q = qres.scalar_one_or_none()
-            total = await count_active_questions(db)
-            await send_reply(format_question(current_q, total=total))
+            session_bank = await pinned_bank(db, existing_session)
+            current_q = await load_question(db, session_bank, existing_session.current_question_id)
+            await send_reply(await question_message(db, session_bank, current_q))
             return {"ok": True}
 
         # Otherwise create a new assessment but REUSE chat_sessions row to avoid UNIQUE violation
@@ -239,6 +328,7 @@ async def telegram_webhook(request: Request, db: AsyncSession = Depends(get_db))
             overall_score=0.0,
             soft_score=0.0,
             digital_score=0.0,
+            bank_version_id=bank.version_id if bank else None,
         )
         db.add(assessment)
         await db.flush()
@@ -250,6 +340,7 @@ async def telegram_webhook(request: Request, db: AsyncSession = Depends(get_db))
             existing_row.state = "in_progress"
             existing_row.assessment_id = assessment.id
             existing_row.current_question_id = first_q.id
+            existing_row.bank_version_id = assessment.bank_version_id
             await db.commit()
         else:
             # first time user
@@ -259,12 +350,12 @@ async def telegram_webhook(request: Request, db: AsyncSession = Depends(get_db))
                 state="in_progress",
                 assessment_id=assessment.id,
                 current_question_id=first_q.id,
+                bank_version_id=assessment.bank_version_id,
             )
             db.add(session)
             await db.commit()
 
-        total = await count_active_questions(db)
-        await send_reply(format_question(first_q, total=total))
+        await send_reply(await question_message(db, bank, first_q))
         return {"ok": True}
 
     # --------------------------
@@ -282,12 +373,8 @@ async def telegram_webhook(request: Request, db: AsyncSession = Depends(get_db))
         await send_reply("Please reply with A, B, C, D, or E.\n(Or type (reset) / [RESET] to restart.)")
         return {"ok": True}
 
-    qres = await db.execute(
-        select(Question)
-        .options(selectinload(Question.options))
-        .where(Question.id == session.current_question_id)
-    )
-    current_q = qres.scalar_one_or_none()
+    session_bank = await pinned_bank(db, session)
+    current_q = await load_question(db, session_bank, session.current_question_id)
 
     if not current_q:
         session.state = "cancelled"
@@ -324,19 +411,18 @@ async def telegram_webhook(request: Request, db: AsyncSession = Depends(get_db))
             )
         )
 
-    next_q = await get_next_question(db, current_q)
+    next_q = await next_question(db, session_bank, current_q)
 
     if next_q:
         session.current_question_id = next_q.id
         await db.commit()
-        total = await count_active_questions(db)
-        await send_reply(format_question(next_q, total=total))
+        await send_reply(await question_message(db, session_bank, next_q))
         return {"ok": True}
 
     # --------------------------
     # Completed
     # --------------------------
-    soft_avg, digital_avg, overall_avg = await compute_scores(db, session.assessment_id)
+    soft_avg, digital_avg, overall_avg = await compute_scores(db, session.assessment_id, session_bank)
 
     a = (await db.execute(
         select(Assessment).where(Assessment.id == session.assessment_id)
@@ -353,6 +439,9 @@ async def telegram_webhook(request: Request, db: AsyncSession = Depends(get_db))
     db.add(Recommendation(assessment_id=a.id, skill_area="digital", priority=pr, message=msg))
 
     session.state = "completed"
+    if a.overall_score > 0:
+        # same event as a web submission, so live dashboards count it (COMPLETED rows only)
+        db.add(assessment_submitted_event(a, await category_totals(db, a.id, session_bank)))
     await db.commit()
 
     await send_reply(
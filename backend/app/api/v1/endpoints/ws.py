@@ -1,14 +1,131 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from app.core.events import ws_manager
+import json
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from app.core.database import AsyncSessionLocal
+from app.core.deps import authenticate_admin_token
+from app.core.events import Connection, event_bus, ws_manager
+from app.core.metrics import metrics
+from app.core.principal_cache import Principal
+from app.core.wire import FIELD_IDS, MSGPACK_SUBPROTOCOL, unpack_client_message
+from app.services.dashboard_service import live_dashboard
+from app.services.outbox_service import replay_events
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+@router.get('/ws/dashboard/fields')
+async def dashboard_ws_fields() -> dict:
+    """Field-name to integer-id table for the MessagePack subprotocol."""
+    return {"subprotocol": MSGPACK_SUBPROTOCOL, "fields": FIELD_IDS}
+
+
+async def _authenticate(websocket: WebSocket, token: Optional[str]) -> Optional[Principal]:
+    # browsers cannot set headers on a WebSocket, hence ?token=; other clients may use the header
+    header = websocket.headers.get("authorization", "")
+    if not token and header[:7].lower() == "bearer ":
+        token = header[7:]
+    try:
+        async with AsyncSessionLocal() as db:
+            return await authenticate_admin_token(token, db)
+    except HTTPException:
+        return None
+
+
+async def _resume(conn: Connection, last_event_id: int) -> None:
+    # missed events first, then the current aggregates from memory (no
+    # per-client summary query), then live traffic
+    try:
+        await replay_events(conn, event_bus, AsyncSessionLocal, last_event_id)
+    except Exception:
+        logger.exception("Event replay failed")
+        conn.send({"type": "replay_failed"})
+
+    conn.hold()
+    snapshot = None
+    try:
+        snapshot = await live_dashboard.snapshot()
+    except Exception:
+        logger.exception("Dashboard snapshot failed")
+    finally:
+        conn.release([conn.encode({"type": "dashboard_snapshot", "data": snapshot})] if snapshot else [])
+
+
 @router.websocket('/ws/dashboard')
-async def dashboard_ws(websocket: WebSocket):
-    await ws_manager.connect(websocket)
+async def dashboard_ws(
+    websocket: WebSocket,
+    last_event_id: Optional[int] = Query(None),
+    token: Optional[str] = Query(None),
+):
+    """
+    Admins only, like GET /dashboard/summary: pass the access token as
+    ?token=... (or an Authorization: Bearer header). Anything else is closed
+    with 1008 before the socket is accepted.
+
+    Every event carries its outbox "id". To resume after a reconnect, pass
+    ?last_event_id=N or send {"action": "resume", "last_event_id": N} (after
+    subscribing, to replay only matching events).
+
+    JSON text frames by default. Clients that offer the MSGPACK_SUBPROTOCOL
+    subprotocol get binary frames instead: an array of events per frame, with
+    keys replaced by the integer ids from GET /ws/dashboard/fields.
+
+    Client messages, as JSON text or MessagePack maps with these string keys
+    (anything else, e.g. "ping" keepalives, is ignored):
+      {"action": "subscribe", "event_types": [...], "sectors": [...], "categories": [...]}
+      {"action": "unsubscribe", ...same fields...}   # no fields: receive everything again
+      {"action": "resume", "last_event_id": N}
+    """
+    principal = await _authenticate(websocket, token)
+    if principal is None:
+        metrics.inc("ws.auth_rejected")
+        await websocket.close(code=1008)  # policy violation
+        return
+
+    conn = await ws_manager.connect(websocket, principal)
     try:
+        if last_event_id is not None:
+            await _resume(conn, last_event_id)
         while True:
-            await websocket.receive_text()  # keepalive from client
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                break
+            try:
+                if frame.get("bytes") is not None:
+                    message = unpack_client_message(frame["bytes"])
+                else:
+                    message = json.loads(frame.get("text") or "")
+            except ValueError:
+                continue  # keepalive
+            if not isinstance(message, dict):
+                continue
+
+            action = message.get("action")
+            if action == "resume":
+                if isinstance(message.get("last_event_id"), int):
+                    await _resume(conn, message["last_event_id"])
+                else:
+                    conn.send({"type": "error", "detail": "last_event_id must be an integer"})
+                continue
+            if action not in {"subscribe", "unsubscribe"}:
+                continue
+
+            filters = {k: v for k, v in message.items() if k != "action"}
+            try:
+                if any(not isinstance(v, list) for v in filters.values()):
+                    raise ValueError("Subscription fields must be lists")
+                if action == "subscribe":
+                    ws_manager.subscribe(conn, filters)
+                else:
+                    ws_manager.unsubscribe(conn, filters)
+            except ValueError as exc:
+                conn.send({"type": "error", "detail": str(exc)})
+                continue
+            conn.send({"type": "subscribed", "filters": {k: sorted(v) for k, v in conn.filters.items()}})
     except WebSocketDisconnect:
+        pass
+    finally:
         ws_manager.disconnect(websocket)
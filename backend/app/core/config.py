@@ -8,6 +8,8 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "change_this_in_production"
 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # bearer token accepted by GET /metrics besides an admin JWT (empty = admins only)
+    METRICS_TOKEN: str = ""
     TEMP_TOKEN_EXPIRE_MINUTES: int = 5
 
     POSTGRES_HOST: str = "127.0.0.1"
@@ -18,7 +20,48 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str | None = None
 
+    # connection pool per process: size + overflow, seconds to wait for a connection,
+    # recycle age (-1 = never); pre-ping costs a round trip on every checkout
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared-statement cache; DB_PGBOUNCER=true (transaction pooling) turns it off
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_PGBOUNCER: bool = False
+    # optional streaming replica for read-only endpoints; reads go back to the primary
+    # while its replay lag exceeds REPLICA_MAX_LAG_SECONDS (checked every REPLICA_LAG_CHECK_SECONDS)
+    DATABASE_REPLICA_URL: str | None = None
+    REPLICA_MAX_LAG_SECONDS: float = 5
+    REPLICA_LAG_CHECK_SECONDS: float = 2
+
     REDIS_URL: str = "redis://127.0.0.1:6379/0"
+    # pub/sub channel the outbox dispatcher publishes dashboard events to
+    EVENTS_CHANNEL: str = "skills:events"
+    # per-socket send queue on /ws/dashboard and what to do when a client can't keep up
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_SLOW_CONSUMER_POLICY: str = "drop_oldest"  # drop_oldest | disconnect
+    WS_SEND_TIMEOUT_SECONDS: float = 10
+    # live dashboard_delta pushes: rate cap, and how often each process reloads the aggregates
+    DASHBOARD_PUSH_MAX_PER_SECOND: float = 2
+    # resume after reconnect: in-memory replay buffer, max events replayed, concurrent DB replays
+    WS_REPLAY_BUFFER_SIZE: int = 2000
+    WS_REPLAY_MAX_EVENTS: int = 1000
+    WS_REPLAY_MAX_CONCURRENCY: int = 4
+    # events per binary frame for sockets on the MessagePack subprotocol
+    WS_MSGPACK_MAX_BATCH: int = 32
+    DASHBOARD_RESYNC_SECONDS: float = 300
+    # outbox listener: rows per dispatch batch, and the fallback sweep interval
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_SWEEP_SECONDS: float = 60
+    # single API process without Redis/Celery: dispatch the outbox from the app itself
+    OUTBOX_IN_PROCESS_DISPATCH: bool = False
+    # processed outbox events older than this are purged (daily, in small batches)
+    OUTBOX_RETENTION_DAYS: int = 7
+    OUTBOX_PURGE_BATCH_SIZE: int = 1000
+    # GET /metrics re-counts the outbox backlog at most this often
+    OUTBOX_BACKLOG_REFRESH_SECONDS: float = 15
 
     # -------------------------
     # 🔥 TELEGRAM CONFIG
@@ -30,6 +73,38 @@ class Settings(BaseSettings):
 
     PUBLIC_BASE_URL: str = ""
 
+    # Excel export build stage (pandas/openpyxl) runs off the event loop
+    EXPORT_EXECUTOR: str = "process"  # process | thread
+    EXPORT_MAX_CONCURRENCY: int = 2
+    # delta-export cursors stay this far behind the DB clock so rows from transactions
+    # still open when a cursor is issued are not skipped (must exceed the longest write transaction)
+    EXPORT_CURSOR_LAG_SECONDS: float = 300
+
+    # GET /questions body cache; bounds staleness across worker processes (0 = no expiry)
+    QUESTIONS_CACHE_TTL_SECONDS: int = 30
+
+    # how long a process trusts its cached "active bank version" pointer
+    QUESTION_BANK_POINTER_TTL_SECONDS: int = 5
+
+    # Argon2 hash/verify threads (argon2-cffi releases the GIL)
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 4
+
+    # cached active/admin flags per user for get_current_principal (0 disables)
+    AUTH_PRINCIPAL_TTL_SECONDS: int = 30
+
+    # Worker threads for 2FA QR rendering, and how long a rendered QR (it encodes the
+    # TOTP secret) stays cached for the setup -> GET /2fa/qr round trip (0 disables)
+    QR_RENDER_MAX_CONCURRENCY: int = 2
+    QR_CACHE_TTL_SECONDS: int = 120
+
+    # Login / 2FA / signup throttling (token buckets, checked before any hashing)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # memory (per process) | redis (shared)
+    LOGIN_RATE_IP_BURST: int = 20
+    LOGIN_RATE_IP_PER_MINUTE: float = 10
+    LOGIN_RATE_ACCOUNT_BURST: int = 5
+    LOGIN_RATE_ACCOUNT_PER_MINUTE: float = 3
+
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=True,
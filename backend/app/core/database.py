@@ -1,21 +1,213 @@
+import asyncio
+import logging
+import time
 from collections.abc import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from uuid import uuid4
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
 from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that reports checkout wait time, overflow connections and
+    timeouts as db.pool.<name>.* metrics (<name> is the engine's
+    pool_logging_name). Occupancy gauges are set by `record_pool_stats`.
+    Only public pool API is used: `connect()` is what the engine calls for
+    every checkout, and `overflow()` reports connections beyond pool_size.
+    """
+
+    def __init__(self, *args, logging_name: str | None = None, **kwargs) -> None:
+        super().__init__(*args, logging_name=logging_name, **kwargs)
+        # recreate() (engine.dispose) passes logging_name back in, so this survives it
+        self.metrics_prefix = f"db.pool.{logging_name or 'default'}"
+
+    def connect(self):
+        started = time.perf_counter()
+        overflow_before = self.overflow()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            metrics.inc(f"{self.metrics_prefix}.timeouts")
+            raise
+        finally:
+            metrics.observe(f"{self.metrics_prefix}.wait_seconds", time.perf_counter() - started)
+            # overflow() counts up from -pool_size; above zero means past pool_size
+            overflow = self.overflow()
+            if overflow > overflow_before and overflow > 0:
+                metrics.inc(f"{self.metrics_prefix}.overflow_connections")
+
+
+def _connect_args(url: str) -> dict:
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+    if settings.DB_PGBOUNCER:
+        # transaction pooling: the next transaction may run on another server
+        # connection, so nothing can rely on named prepared statements
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+
+
+def make_engine(url: str | None = None, name: str = "primary") -> AsyncEngine:
+    url = url or settings.DATABASE_URL
+    engine = create_async_engine(
+        url,
+        future=True,
+        poolclass=InstrumentedPool,
+        pool_logging_name=name,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_connect_args(url),
+    )
+
+    prefix = f"db.pool.{name}"
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(_dbapi_conn, _record) -> None:
+        metrics.inc(f"{prefix}.connects")
+
+    @event.listens_for(engine.sync_engine, "invalidate")
+    def _on_invalidate(_dbapi_conn, _record, _exception) -> None:
+        metrics.inc(f"{prefix}.invalidated")
+
+    return engine
+
+
+def record_pool_stats(engine: AsyncEngine, name: str = "primary") -> dict:
+    """Current pool occupancy, also set as db.pool.<name>.* gauges."""
+    pool = engine.pool
+    stats = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+    for key, value in stats.items():
+        metrics.gauge_set(f"db.pool.{name}.{key}", value)
+    return stats
+
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    future=True,
-    pool_pre_ping=True,
+def make_sessionmaker(bind: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind=bind,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+    )
+
+
+engine = make_engine()
+
+AsyncSessionLocal = make_sessionmaker(engine)
+
+# optional streaming replica for read-only endpoints (see get_read_db)
+replica_engine = make_engine(settings.DATABASE_REPLICA_URL, name="replica") if settings.DATABASE_REPLICA_URL else None
+
+ReplicaSessionLocal = make_sessionmaker(replica_engine) if replica_engine is not None else None
+
+# seconds of replay lag on a standby; 0 when caught up or not in recovery, NULL if unknown
+REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
 )
 
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    autoflush=False,
-    autocommit=False,
-    expire_on_commit=False,
+
+class ReplicaLagGuard:
+    """
+    Decides whether the replica is fresh enough to serve reads. The lag is
+    measured at most every `check_seconds` (not per request); a replica that
+    is too far behind, or cannot be asked, sends reads back to the primary.
+    A check that takes longer than `timeout_seconds` (default: check_seconds,
+    at least 1 s) counts as unreachable, so requests waiting on the shared
+    check are never held longer than that.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        max_lag_seconds: float,
+        check_seconds: float,
+        timeout_seconds: float | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self.timeout_seconds = timeout_seconds if timeout_seconds is not None else max(check_seconds, 1.0)
+        self.lag: float | None = None
+        self._checked_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def _query_lag(self) -> float | None:
+        async with self.session_factory() as db:
+            return (await db.execute(REPLICA_LAG_SQL)).scalar()
+
+    async def _measure(self) -> float | None:
+        try:
+            lag = await asyncio.wait_for(self._query_lag(), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            metrics.inc("db.replica.check_timeouts")
+            logger.warning("Replica lag check timed out after %ss, reading from the primary", self.timeout_seconds)
+            return None
+        except Exception as exc:
+            metrics.inc("db.replica.check_errors")
+            logger.warning("Replica lag check failed, reading from the primary: %s", exc)
+            return None
+        return None if lag is None else float(lag)
+
+    async def healthy(self) -> bool:
+        if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds:
+            async with self._lock:
+                # concurrent requests share one check
+                if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds:
+                    self.lag = await self._measure()
+                    self._checked_at = time.monotonic()
+                    if self.lag is not None:
+                        metrics.gauge_set("db.replica.lag_seconds", self.lag)
+        return self.lag is not None and self.lag <= self.max_lag_seconds
+
+
+replica_guard = (
+    ReplicaLagGuard(ReplicaSessionLocal, settings.REPLICA_MAX_LAG_SECONDS, settings.REPLICA_LAG_CHECK_SECONDS)
+    if ReplicaSessionLocal is not None
+    else None
 )
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for endpoints that only read and can tolerate up to
+    REPLICA_MAX_LAG_SECONDS of staleness: the replica when one is configured
+    and caught up, otherwise the primary.
+    """
+    if replica_guard is not None and await replica_guard.healthy():
+        metrics.inc("db.reads.replica")
+        async with ReplicaSessionLocal() as session:
+            yield session
+        return
+    metrics.inc("db.reads.primary")
+    async with AsyncSessionLocal() as session:
+        yield session
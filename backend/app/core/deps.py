@@ -1,18 +1,19 @@
+import hmac
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.principal_cache import Principal, principal_cache
 from app.core.security import decode_token
 from app.models.user import User
 
 bearer = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
-    creds: HTTPAuthorizationCredentials | None = Depends(bearer),
-    db: AsyncSession = Depends(get_db),
-) -> User:
+def _access_token_user_id(creds: HTTPAuthorizationCredentials | None) -> int:
     if not creds:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing auth token")
     try:
@@ -23,15 +24,60 @@ async def get_current_user(
     if payload.get("type") != "access":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
 
-    user_id = int(payload["sub"])
+    return int(payload["sub"])
+
+
+async def get_current_user(
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """The full ORM row; use for endpoints that modify the user."""
+    user_id = _access_token_user_id(creds)
     result = await db.execute(select(User).where(User.id == user_id, User.is_active.is_(True)))
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    principal_cache.put(Principal(id=user.id, email=user.email, is_admin=user.is_admin))
     return user
 
 
-async def get_admin_user(user: User = Depends(get_current_user)) -> User:
-    if not user.is_admin:
+async def get_current_principal(
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """Identity + flags, served from principal_cache in the common case (no DB round trip)."""
+    user_id = _access_token_user_id(creds)
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    row = (
+        await db.execute(
+            select(User.id, User.email, User.is_admin).where(User.id == user_id, User.is_active.is_(True))
+        )
+    ).one_or_none()
+    if not row:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return principal_cache.put(Principal(id=row.id, email=row.email, is_admin=row.is_admin))
+
+
+async def get_admin_user(principal: Principal = Depends(get_current_principal)) -> Principal:
+    if not principal.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
-    return user
+    return principal
+
+
+async def authenticate_admin_token(token: str | None, db: AsyncSession) -> Principal:
+    """`get_admin_user` for a raw access token, e.g. from a WebSocket handshake."""
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token) if token else None
+    return await get_admin_user(await get_current_principal(creds, db))
+
+
+async def require_metrics_reader(
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer),
+    db: AsyncSession = Depends(get_db),
+) -> None:
+    """Admins, or a scraper presenting METRICS_TOKEN as its bearer token."""
+    if settings.METRICS_TOKEN and creds and hmac.compare_digest(creds.credentials, settings.METRICS_TOKEN):
+        return
+    await get_admin_user(await get_current_principal(creds, db))
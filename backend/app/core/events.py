@@ -1,28 +1,456 @@
-from typing import Dict, Set
-from fastapi import WebSocket
+"""
+Dashboard event fan-out.
+
+Each API process keeps its own sockets in `ws_manager`. The outbox
+dispatcher (Celery worker) publishes events to a Redis pub/sub channel via
+`publish_events`; every API process runs an `EventBus` subscriber from its
+lifespan and rebroadcasts what it receives to its local sockets, so updates
+reach dashboards on any worker or node.
+
+Sockets may subscribe to a subset of events by event type, respondent
+sector or respondent category (see `ConnectionManager.subscribe`); a socket
+with no subscriptions receives everything.
+
+Every event carries its outbox `id`. The bus keeps the most recent ones in
+memory (`EventBus.recent`) so reconnecting clients can be replayed what
+they missed, usually without touching the database.
+"""
+import asyncio
 import json
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Callable, Deque, Dict, Iterable, Optional, Union
+
+from fastapi import WebSocket
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.principal_cache import Principal
+from app.core.redis_client import get_redis
+from app.core.wire import MSGPACK_SUBPROTOCOL, batch_frame, pack_event
+
+logger = logging.getLogger(__name__)
+
+# subscription dimension -> the event attribute it filters on
+SUBSCRIPTION_FIELDS: Dict[str, Callable[[Dict], Optional[str]]] = {
+    "event_types": lambda e: e.get("type"),
+    "sectors": lambda e: (e.get("payload") or {}).get("respondent_sector"),
+    "categories": lambda e: (e.get("payload") or {}).get("respondent_category"),
+}
+MAX_SUBSCRIPTION_VALUES = 50
+
+
+class Connection:
+    """
+    One dashboard socket with its own bounded send queue and writer task, so
+    a slow client only ever delays itself. Messages are queued already
+    serialised: JSON text, or one packed event for MessagePack sockets, whose
+    writer sends everything queued as a single batched binary frame.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: int,
+        policy: str,
+        send_timeout: float,
+        binary: bool = False,
+        max_batch: int = 1,
+        principal: Optional[Principal] = None,
+    ) -> None:
+        self.websocket = websocket
+        # who authenticated the handshake (None only for sockets registered directly)
+        self.principal = principal
+        self.binary = binary
+        self.max_batch = max(1, max_batch)
+        self.max_queue = max_queue
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.queue: Deque[Union[str, bytes]] = deque()
+        self.filters: Dict[str, set[str]] = {}
+        self.closed = False
+        # while a replay is being prepared, live messages wait here (with their event
+        # ids), bounded by max_queue under the same slow-consumer policy
+        self._held: Deque[tuple[Optional[int], Union[str, bytes]]] | None = None
+        self._ready = asyncio.Event()
+        self._writer: asyncio.Task | None = None
+
+    @property
+    def is_admin(self) -> bool:
+        return self.principal is not None and self.principal.is_admin
+
+    def start(self, on_dead: Callable[["Connection"], None]) -> None:
+        self._writer = asyncio.create_task(self._write_loop(on_dead), name="ws-writer")
+
+    def encode(self, event: Dict, text: Optional[str] = None) -> Union[str, bytes]:
+        """Serialise a message for this socket's format (reusing `text` for JSON)."""
+        if self.binary:
+            return pack_event(event)
+        return text if text is not None else json.dumps(event)
+
+    def send(self, event: Dict) -> bool:
+        """Queue a one-off message (replies, errors) for this socket only."""
+        return self.offer(self.encode(event))
+
+    def wants(self, event: Dict) -> bool:
+        return self.matches({dim: read(event) for dim, read in SUBSCRIPTION_FIELDS.items()})
+
+    def matches(self, attrs: Dict[str, Optional[str]]) -> bool:
+        # an event without a value for a dimension (e.g. no sector) is not filtered on it
+        return all(attrs[dim] is None or attrs[dim] in values for dim, values in self.filters.items())
+
+    def hold(self) -> None:
+        """Buffer live messages until `release`, so a replay can go out first."""
+        if self._held is None:
+            self._held = deque()
+
+    def release(self, replayed: list[Union[str, bytes]], replayed_ids: Iterable[int] = ()) -> bool:
+        """
+        Send the replayed messages, then the held live ones, skipping live
+        events whose ids are in `replayed_ids` (the replay already had them).
+        Outbox ids are not committed in order, so a live event below the
+        highest replayed id can still be new to this socket.
+        """
+        held, self._held = self._held or (), None
+        replayed_ids = set(replayed_ids)
+        for message in replayed:
+            if not self.offer(message):
+                return False
+        for event_id, message in held:
+            if event_id in replayed_ids:
+                continue
+            if not self.offer(message):
+                return False
+        return True
+
+    def offer(self, message: Union[str, bytes], event_id: Optional[int] = None) -> bool:
+        """Queue a message; False means the slow-consumer policy wants this socket gone."""
+        if self.closed:
+            return False
+        if self._held is not None:
+            if len(self._held) >= self.max_queue:
+                if self.policy == "disconnect":
+                    metrics.inc("ws.slow_disconnects")
+                    return False
+                self._held.popleft()
+                metrics.inc("ws.dropped")
+            self._held.append((event_id, message))
+            return True
+        if len(self.queue) >= self.max_queue:
+            if self.policy == "disconnect":
+                metrics.inc("ws.slow_disconnects")
+                return False
+            # drop_oldest: a lagging dashboard loses stale events, never the newest
+            self.queue.popleft()
+            metrics.gauge_add("ws.queue_depth", -1)
+            metrics.inc("ws.dropped")
+        self.queue.append(message)
+        metrics.gauge_add("ws.queue_depth", 1)
+        self._ready.set()
+        return True
+
+    async def _write_loop(self, on_dead: Callable[["Connection"], None]) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                while self.queue:
+                    started = time.perf_counter()
+                    if self.binary:
+                        batch = [self.queue.popleft() for _ in range(min(self.max_batch, len(self.queue)))]
+                        metrics.gauge_add("ws.queue_depth", -len(batch))
+                        metrics.observe("ws.batch_size", len(batch))
+                        await asyncio.wait_for(self.websocket.send_bytes(batch_frame(batch)), self.send_timeout)
+                    else:
+                        message = self.queue.popleft()
+                        metrics.gauge_add("ws.queue_depth", -1)
+                        await asyncio.wait_for(self.websocket.send_text(message), self.send_timeout)
+                    metrics.observe("ws.send_seconds", time.perf_counter() - started)
+                self._ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # send failed or timed out: the client is gone or hopelessly slow
+            metrics.inc("ws.send_errors")
+            on_dead(self)
+
+    async def close(self, code: int = 1000) -> None:
+        self.stop()
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+    def stop(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        metrics.gauge_add("ws.queue_depth", -len(self.queue))
+        self.queue.clear()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
 
 
 class ConnectionManager:
-    def __init__(self) -> None:
-        self.active_connections: Set[WebSocket] = set()
+    def __init__(
+        self,
+        max_queue: int | None = None,
+        policy: str | None = None,
+        send_timeout: float | None = None,
+    ) -> None:
+        self.max_queue = max_queue or settings.WS_SEND_QUEUE_SIZE
+        self.policy = policy or settings.WS_SLOW_CONSUMER_POLICY
+        self.send_timeout = send_timeout or settings.WS_SEND_TIMEOUT_SECONDS
+        self.active_connections: Dict[WebSocket, Connection] = {}
+        # Routing indexes. Unfiltered sockets get everything; a filtered one is
+        # indexed under each value of its first constrained dimension, so an
+        # event only visits sockets that can plausibly match it.
+        self._unfiltered: set[Connection] = set()
+        self._by_primary: Dict[str, Dict[str, set[Connection]]] = {
+            dim: defaultdict(set) for dim in SUBSCRIPTION_FIELDS
+        }
 
-    async def connect(self, websocket: WebSocket) -> None:
-        await websocket.accept()
-        self.active_connections.add(websocket)
+    async def connect(self, websocket: WebSocket, principal: Optional[Principal] = None) -> Connection:
+        """Accept an already-authenticated socket."""
+        # opt-in binary frames; JSON text stays the default
+        binary = MSGPACK_SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+        await websocket.accept(subprotocol=MSGPACK_SUBPROTOCOL if binary else None)
+        return self.register(websocket, binary=binary, principal=principal)
+
+    def register(
+        self,
+        websocket: WebSocket,
+        binary: bool = False,
+        principal: Optional[Principal] = None,
+    ) -> Connection:
+        conn = Connection(
+            websocket,
+            self.max_queue,
+            self.policy,
+            self.send_timeout,
+            binary=binary,
+            max_batch=settings.WS_MSGPACK_MAX_BATCH,
+            principal=principal,
+        )
+        conn.start(self._drop)
+        self.active_connections[websocket] = conn
+        self._unfiltered.add(conn)
+        metrics.gauge_set("ws.connections", len(self.active_connections))
+        return conn
 
     def disconnect(self, websocket: WebSocket) -> None:
-        self.active_connections.discard(websocket)
+        conn = self.active_connections.pop(websocket, None)
+        if conn is not None:
+            self._unindex(conn)
+            conn.stop()
+        metrics.gauge_set("ws.connections", len(self.active_connections))
+
+    def _drop(self, conn: Connection) -> None:
+        self.disconnect(conn.websocket)
+        # 1013: try again later
+        asyncio.get_running_loop().create_task(conn.close(code=1013))
+
+    def _index(self, conn: Connection) -> None:
+        if not conn.filters:
+            self._unfiltered.add(conn)
+            return
+        primary = next(dim for dim in SUBSCRIPTION_FIELDS if dim in conn.filters)
+        for value in conn.filters[primary]:
+            self._by_primary[primary][value].add(conn)
+
+    def _unindex(self, conn: Connection) -> None:
+        # conn.filters still says where it was indexed
+        self._unfiltered.discard(conn)
+        for dim, values in conn.filters.items():
+            index = self._by_primary[dim]
+            for value in values:
+                pool = index.get(value)
+                if pool is not None:
+                    pool.discard(conn)
+                    if not pool:
+                        del index[value]
+
+    def _set_filters(self, conn: Connection, filters: Dict[str, set[str]]) -> None:
+        self._unindex(conn)
+        conn.filters = filters
+        self._index(conn)
+
+    def subscribe(self, conn: Connection, filters: Dict[str, Iterable[str]]) -> None:
+        """Add values to the socket's filters, e.g. {"sectors": ["Health"]}."""
+        updated = {dim: set(values) for dim, values in conn.filters.items()}
+        for dim, values in filters.items():
+            if dim not in SUBSCRIPTION_FIELDS:
+                raise ValueError(f"Unknown subscription field: {dim}")
+            merged = updated.get(dim, set()) | {str(v) for v in values}
+            if len(merged) > MAX_SUBSCRIPTION_VALUES:
+                raise ValueError(f"At most {MAX_SUBSCRIPTION_VALUES} {dim} per connection")
+            if merged:
+                updated[dim] = merged
+        self._set_filters(conn, updated)
+
+    def unsubscribe(self, conn: Connection, filters: Dict[str, Iterable[str]] | None = None) -> None:
+        """Remove values from the filters; with no filters, go back to receiving everything."""
+        updated: Dict[str, set[str]] = {}
+        if filters:
+            updated = {dim: set(values) for dim, values in conn.filters.items()}
+            for dim, values in filters.items():
+                remaining = updated.get(dim, set()) - {str(v) for v in values}
+                if remaining:
+                    updated[dim] = remaining
+                else:
+                    updated.pop(dim, None)
+        self._set_filters(conn, updated)
+
+    def recipients(self, event: Dict) -> set[Connection]:
+        recipients = set(self._unfiltered)
+        attrs = {dim: read(event) for dim, read in SUBSCRIPTION_FIELDS.items()}
+        for dim, index in self._by_primary.items():
+            value = attrs[dim]
+            pools = index.values() if value is None else (index.get(value, ()),)
+            for pool in pools:
+                recipients.update(conn for conn in pool if conn.matches(attrs))
+        return recipients
 
     async def broadcast(self, payload: Dict) -> None:
-        dead = []
-        for ws in self.active_connections:
+        await self.broadcast_text(json.dumps(payload), payload)
+
+    def has_admins(self) -> bool:
+        return any(conn.is_admin for conn in self.active_connections.values())
+
+    async def broadcast_text(self, text: str, event: Dict | None = None, admins_only: bool = False) -> None:
+        """
+        Enqueue an already-serialised message for every local socket whose
+        subscriptions match `event` (all sockets when no event is given),
+        and only for admin-authenticated ones when `admins_only` is set.
+        Never awaits a send, so the cost is one append per recipient.
+        """
+        if event is None or len(self._unfiltered) == len(self.active_connections):
+            targets = list(self.active_connections.values())
+        else:
+            targets = self.recipients(event)
+            metrics.inc("ws.filtered_out", len(self.active_connections) - len(targets))
+        if admins_only:
+            targets = [conn for conn in targets if conn.is_admin]
+        event_id = event.get("id") if event else None
+        packed = None
+        for conn in targets:
+            if conn.binary:
+                if packed is None:
+                    # encoded once per event, however many binary sockets receive it
+                    packed = pack_event(event if event is not None else json.loads(text))
+                message = packed
+            else:
+                message = text
+            if not conn.offer(message, event_id):
+                self._drop(conn)
+
+
+ws_manager = ConnectionManager()
+
+
+async def publish_events(payloads: Iterable[Dict]) -> int:
+    """Publish to every API process in one round trip; returns the number sent."""
+    messages = [json.dumps(p) for p in payloads]
+    if not messages:
+        return 0
+    async with get_redis().pipeline(transaction=False) as pipe:
+        for message in messages:
+            pipe.publish(settings.EVENTS_CHANNEL, message)
+        await pipe.execute()
+    metrics.inc("events.published", len(messages))
+    return len(messages)
+
+
+class EventBus:
+    """Subscribes this process to the events channel and rebroadcasts locally."""
+
+    def __init__(self, manager: ConnectionManager, channel: str) -> None:
+        self.manager = manager
+        self.channel = channel
+        self.listeners: list[Callable[[Dict], None]] = []
+        # (outbox id, serialised text, decoded event) of the latest events, oldest first
+        self.recent: Deque[tuple[int, str, Dict]] = deque(maxlen=settings.WS_REPLAY_BUFFER_SIZE)
+        self._task: asyncio.Task | None = None
+
+    def add_listener(self, listener: Callable[[Dict], None]) -> None:
+        """Called with every decoded event, e.g. to maintain live aggregates."""
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="event-bus")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def handle(self, message: Dict) -> None:
+        if message.get("type") != "message":
+            return
+        metrics.inc("events.received")
+        # one bad message must not end the subscription for the whole process
+        try:
+            # decode once for routing; the publisher's serialised text is forwarded untouched
+            event = json.loads(message["data"])
+            if not isinstance(event, dict):
+                raise ValueError(f"expected a JSON object, got {type(event).__name__}")
+            await self.deliver(message["data"], event)
+        except Exception:
+            metrics.inc("events.bus_errors")
+            logger.exception("Dropping undeliverable event bus message: %.200r", message.get("data"))
+
+    async def deliver(self, text: str, event: Dict) -> None:
+        if event.get("id") is not None:
+            self.recent.append((event["id"], text, event))
+        await self.manager.broadcast_text(text, event)
+        for listener in self.listeners:
+            # a faulty listener neither skips the others nor fails the publisher
             try:
-                await ws.send_text(json.dumps(payload))
+                listener(event)
             except Exception:
-                dead.append(ws)
-        for ws in dead:
-            self.disconnect(ws)
+                metrics.inc("events.listener_errors")
+                logger.exception("Event listener %r failed on event %s", listener, event.get("id"))
 
+    async def publish_local(self, payloads: Iterable[Dict]) -> int:
+        """Drop-in for `publish_events` when this process is the only one (no Redis)."""
+        sent = 0
+        for payload in payloads:
+            # an event that cannot be delivered counts as sent: failing the batch
+            # would leave it unprocessed and re-broadcast everything before it forever
+            try:
+                await self.deliver(json.dumps(payload), payload)
+            except Exception:
+                metrics.inc("events.bus_errors")
+                logger.exception("Dropping undeliverable event %s", payload.get("id"))
+            sent += 1
+        metrics.inc("events.published_local", sent)
+        return sent
 
-ws_manager = ConnectionManager()
+    async def _run(self) -> None:
+        backoff = 0.5
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                backoff = 0.5
+                async for message in pubsub.listen():
+                    await self.handle(message)
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError) as exc:
+                metrics.inc("events.bus_errors")
+                logger.warning("Event bus disconnected, retrying in %.1fs: %s", backoff, exc)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                await pubsub.aclose()
+
+
+event_bus = EventBus(ws_manager, settings.EVENTS_CHANNEL)
@@ -0,0 +1,92 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """
+    Runs blocking callables off the event loop with a concurrency cap.
+
+    Callers beyond `max_concurrency` wait on a semaphore (not inside the pool),
+    so `<name>.queue_depth` reports real backlog and `<name>.in_flight` the work
+    currently occupying workers. The underlying pool is created lazily.
+    """
+
+    def __init__(self, name: str, kind: str, max_concurrency: int) -> None:
+        if kind not in {"thread", "process"}:
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_concurrency = max(1, max_concurrency)
+        self._executor: Executor | None = None
+        self._sem: asyncio.Semaphore | None = None
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # spawn: never fork a process that is running an event loop and threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix=self.name,
+                )
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+
+        queued_at = time.perf_counter()
+        metrics.gauge_add(f"{self.name}.queue_depth", 1)
+        try:
+            await self._sem.acquire()
+        finally:
+            metrics.gauge_add(f"{self.name}.queue_depth", -1)
+
+        started = time.perf_counter()
+        metrics.observe(f"{self.name}.wait_seconds", started - queued_at)
+        metrics.gauge_add(f"{self.name}.in_flight", 1)
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._pool(), partial(fn, *args, **kwargs))
+        except BaseException:
+            self._finish(started)
+            raise
+        # the slot belongs to the job, not the caller: a cancelled caller
+        # (client gone) must not free it while the worker is still busy
+        future.add_done_callback(partial(self._finish, started))
+        return await asyncio.shield(future)
+
+    def _finish(self, started: float, future: asyncio.Future | None = None) -> None:
+        metrics.gauge_add(f"{self.name}.in_flight", -1)
+        metrics.observe(f"{self.name}.run_seconds", time.perf_counter() - started)
+        self._sem.release()
+        if future is not None and not future.cancelled():
+            future.exception()  # retrieved here in case the caller stopped waiting
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+export_executor = BoundedExecutor("export", settings.EXPORT_EXECUTOR, settings.EXPORT_MAX_CONCURRENCY)
+password_executor = BoundedExecutor("password_hash", "thread", settings.PASSWORD_HASH_MAX_CONCURRENCY)
+qr_executor = BoundedExecutor("qr_render", "thread", settings.QR_RENDER_MAX_CONCURRENCY)
+
+
+def shutdown_executors() -> None:
+    export_executor.shutdown()
+    password_executor.shutdown()
+    qr_executor.shutdown()
@@ -0,0 +1,50 @@
+import threading
+from collections import defaultdict
+from typing import Dict
+
+
+class Metrics:
+    """
+    Minimal in-process metrics registry (counters, gauges, timings).
+    Exposed as JSON on GET /metrics; good enough to scrape or eyeball
+    without pulling in a Prometheus client.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = defaultdict(float)
+        self._timings: Dict[str, Dict[str, float]] = {}
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def gauge_add(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] += value
+
+    def gauge_set(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            t = self._timings.setdefault(name, {"count": 0, "sum": 0.0, "max": 0.0})
+            t["count"] += 1
+            t["sum"] += seconds
+            t["max"] = max(t["max"], seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": {
+                    k: {**v, "avg": (v["sum"] / v["count"]) if v["count"] else 0.0}
+                    for k, v in self._timings.items()
+                },
+            }
+
+
+metrics = Metrics()
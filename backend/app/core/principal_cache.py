@@ -0,0 +1,52 @@
+import time
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The bits of an authenticated user most requests need, without a DB row."""
+    id: int
+    email: str
+    is_admin: bool
+
+
+class PrincipalCache:
+    """
+    Short-TTL cache of active users by id, so authenticated requests skip the
+    `users` lookup. Only active users are cached; call `invalidate()` whenever a
+    user is deactivated, demoted or promoted. The TTL bounds how long other
+    worker processes may keep serving the old flags.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10_000) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: dict[int, tuple[Principal, float]] = {}
+
+    def get(self, user_id: int) -> Principal | None:
+        hit = self._entries.get(user_id)
+        if hit is not None and hit[1] < time.monotonic():
+            del self._entries[user_id]  # expired: evict rather than keep stale flags around
+            hit = None
+        if hit is None:
+            metrics.inc("principal_cache.miss")
+            return None
+        metrics.inc("principal_cache.hit")
+        return hit[0]
+
+    def put(self, principal: Principal) -> Principal:
+        if self.ttl_seconds <= 0:
+            return principal
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[principal.id] = (principal, time.monotonic() + self.ttl_seconds)
+        return principal
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+
+principal_cache = PrincipalCache(ttl_seconds=settings.AUTH_PRINCIPAL_TTL_SECONDS)
@@ -0,0 +1,133 @@
+"""
+Token-bucket throttling for expensive auth endpoints.
+
+Checks run before any DB or Argon2 work. The in-memory backend covers a
+single process; the Redis backend shares buckets across workers and nodes
+and falls back to memory (fail-open per node) if Redis is unreachable.
+"""
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BucketSpec:
+    name: str
+    capacity: int
+    per_minute: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.per_minute / 60.0
+
+
+class MemoryTokenBucket:
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, spec: BucketSpec) -> tuple[bool, float]:
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(key, (float(spec.capacity), now))
+        tokens = min(spec.capacity, tokens + (now - ts) * spec.refill_per_second)
+
+        allowed = tokens >= 1
+        retry_after = 0.0
+        if allowed:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / spec.refill_per_second
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+# Atomic refill-and-take using Redis server time, so node clocks don't matter.
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  retry = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry)}
+"""
+
+
+class RedisTokenBucket:
+    def __init__(self, prefix: str = "ratelimit:") -> None:
+        self.prefix = prefix
+        self._fallback = MemoryTokenBucket()
+        self._script = None
+
+    async def take(self, key: str, spec: BucketSpec) -> tuple[bool, float]:
+        try:
+            if self._script is None:
+                self._script = get_redis().register_script(_TOKEN_BUCKET_LUA)
+            allowed, retry = await self._script(
+                keys=[self.prefix + key], args=[spec.capacity, spec.refill_per_second]
+            )
+            return bool(int(allowed)), float(retry)
+        except (RedisError, OSError) as exc:
+            metrics.inc("rate_limit.backend_errors")
+            logger.warning("Redis rate limiter unavailable, using local buckets: %s", exc)
+            return await self._fallback.take(key, spec)
+
+
+LOGIN_PER_IP = BucketSpec("login_ip", settings.LOGIN_RATE_IP_BURST, settings.LOGIN_RATE_IP_PER_MINUTE)
+LOGIN_PER_ACCOUNT = BucketSpec(
+    "login_account", settings.LOGIN_RATE_ACCOUNT_BURST, settings.LOGIN_RATE_ACCOUNT_PER_MINUTE
+)
+
+login_limiter = RedisTokenBucket() if settings.RATE_LIMIT_BACKEND == "redis" else MemoryTokenBucket()
+
+
+def client_ip(request: Request) -> str:
+    # behind a proxy, run uvicorn with --proxy-headers so this is the real client
+    return request.client.host if request.client else "unknown"
+
+
+async def enforce_login_limits(request: Request, account: str | None = None) -> None:
+    """Raise 429 if this IP (and, when known, this account) is out of tokens."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+
+    checks = [(LOGIN_PER_IP, f"{LOGIN_PER_IP.name}:{client_ip(request)}")]
+    if account:
+        checks.append((LOGIN_PER_ACCOUNT, f"{LOGIN_PER_ACCOUNT.name}:{account.strip().lower()}"))
+
+    for spec, key in checks:
+        allowed, retry_after = await login_limiter.take(key, spec)
+        if not allowed:
+            metrics.inc(f"rate_limit.{spec.name}.rejected")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, try again later",
+                headers={"Retry-After": str(max(1, round(retry_after)))},
+            )
+        metrics.inc(f"rate_limit.{spec.name}.allowed")
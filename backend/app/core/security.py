@@ -3,6 +3,7 @@ from typing import Any
 import jwt
 from pwdlib import PasswordHash
 from app.core.config import settings
+from app.core.executor import password_executor
 
 password_hasher = PasswordHash.recommended()
 
@@ -15,6 +16,15 @@ def verify_password(password: str, hashed: str) -> bool:
     return password_hasher.verify(password, hashed)
 
 
+async def hash_password_async(password: str) -> str:
+    """Argon2 off the event loop; use this from request handlers."""
+    return await password_executor.run(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await password_executor.run(verify_password, password, hashed)
+
+
 def create_token(subject: str, minutes: int, token_type: str = "access", extra: dict[str, Any] | None = None) -> str:
     now = datetime.now(tz=timezone.utc)
     payload: dict[str, Any] = {
@@ -0,0 +1,76 @@
+"""
+Binary frame format for /ws/dashboard (subprotocol MSGPACK_SUBPROTOCOL).
+
+Each event is a MessagePack map whose known keys are replaced by the small
+integers in FIELD_IDS (values of opaque maps such as per-category totals
+keep their own keys). A frame is always an array of one or more packed
+events; since the array header is just a prefix, batching concatenates the
+already-packed events without encoding anything again.
+"""
+import struct
+from typing import Any, Iterable
+
+import msgpack
+
+MSGPACK_SUBPROTOCOL = "skills.msgpack.v1"
+
+FIELD_IDS = {
+    "id": 0,
+    "type": 1,
+    "payload": 2,
+    "data": 3,
+    "assessment_id": 4,
+    "overall_score": 5,
+    "soft_score": 6,
+    "digital_score": 7,
+    "respondent_sector": 8,
+    "respondent_category": 9,
+    "categories": 10,
+    "total_assessments": 11,
+    "avg_overall": 12,
+    "avg_soft": 13,
+    "avg_digital": 14,
+    "top_gaps": 15,
+    "gaps": 16,
+    "skill_area": 17,
+    "avg_score": 18,
+    "n_answers": 19,
+    "filters": 20,
+    "detail": 21,
+    "last_event_id": 22,
+}
+# maps keyed by data (category names, filter fields), not by schema
+_OPAQUE = {"categories", "filters"}
+
+
+def _compact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            FIELD_IDS.get(k, k): (v if k in _OPAQUE else _compact(v))
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_compact(v) for v in value]
+    return value
+
+
+def pack_event(event: dict) -> bytes:
+    return msgpack.packb(_compact(event), use_bin_type=True)
+
+
+def batch_frame(packed: Iterable[bytes]) -> bytes:
+    """Wrap already-packed events in a MessagePack array header."""
+    items = list(packed)
+    n = len(items)
+    if n < 16:
+        header = bytes([0x90 | n])
+    elif n < 0x10000:
+        header = b"\xdc" + struct.pack(">H", n)
+    else:
+        header = b"\xdd" + struct.pack(">I", n)
+    return header + b"".join(items)
+
+
+def unpack_client_message(data: bytes) -> Any:
+    # client -> server messages use the plain string keys
+    return msgpack.unpackb(data, raw=False)
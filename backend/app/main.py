@@ -1,9 +1,45 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine, record_pool_stats, replica_engine
+from app.core.deps import require_metrics_reader
+from app.core.events import event_bus
+from app.core.executor import shutdown_executors
+from app.core.metrics import metrics
+from app.core.redis_client import close_redis
 from app.api.v1.router import api_router
+from app.services.dashboard_service import live_dashboard
+from app.services.outbox_service import OutboxListener, refresh_outbox_backlog
+
+
+# single-node mode: this process drains the outbox and feeds its own sockets
+outbox_dispatcher = (
+    OutboxListener(AsyncSessionLocal, publish=event_bus.publish_local)
+    if settings.OUTBOX_IN_PROCESS_DISPATCH
+    else None
+)
+
 
-app = FastAPI(title=settings.APP_NAME)
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    event_bus.add_listener(live_dashboard.on_event)
+    live_dashboard.start()
+    if outbox_dispatcher is not None:
+        outbox_dispatcher.start()
+    else:
+        event_bus.start()
+    yield
+    if outbox_dispatcher is not None:
+        await outbox_dispatcher.stop()
+    await event_bus.stop()
+    await live_dashboard.stop()
+    shutdown_executors()
+    await close_redis()
+
+
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,6 +47,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 app.include_router(api_router, prefix="/api/v1")
@@ -19,3 +56,15 @@ app.include_router(api_router, prefix="/api/v1")
 @app.get("/")
 async def health() -> dict:
     return {"status": "ok", "service": settings.APP_NAME}
+
+
+@app.get("/metrics", dependencies=[Depends(require_metrics_reader)])
+async def metrics_snapshot() -> dict:
+    record_pool_stats(engine)
+    if replica_engine is not None:
+        record_pool_stats(replica_engine, "replica")
+    try:
+        await refresh_outbox_backlog(AsyncSessionLocal)
+    except Exception:
+        metrics.inc("outbox.backlog_errors")  # still serve the in-process metrics
+    return metrics.snapshot()
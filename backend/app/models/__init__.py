@@ -1,3 +1,4 @@
 from app.models.user import User
 from app.models.question import Question, QuestionOption
 from app.models.assessment import Assessment, AssessmentAnswer, Recommendation, OutboxEvent
+from app.models.question_bank import QuestionBankVersion
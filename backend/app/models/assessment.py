@@ -1,19 +1,47 @@
+from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Float, ForeignKey, UniqueConstraint, JSON, Boolean, Text
+from sqlalchemy import (
+    String, Float, ForeignKey, UniqueConstraint, JSON, Boolean, Text, DateTime, Index, func, literal_column, text,
+)
 from app.models.base import Base, TimestampMixin
 
 
 class Assessment(Base, TimestampMixin):
     __tablename__ = "assessments"
+    __table_args__ = (
+        Index("ix_assessments_created_at", "created_at"),
+        # reports only read completed assessments (see COMPLETED below)
+        Index(
+            "ix_assessments_completed_updated_at_id", "updated_at", "id",
+            postgresql_where=text("overall_score > 0"),
+        ),
+        Index(
+            "ix_assessments_completed_sector", "respondent_sector",
+            postgresql_where=text("overall_score > 0"),
+            postgresql_include=["overall_score", "digital_score", "id"],
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    bank_version_id: Mapped[int | None] = mapped_column(
+        ForeignKey("question_bank_versions.id", ondelete="RESTRICT"), nullable=True
+    )
     respondent_sector: Mapped[str | None] = mapped_column(String(100), nullable=True)
     respondent_category: Mapped[str | None] = mapped_column(String(100), nullable=True)
     submission_token: Mapped[str] = mapped_column(String(64), unique=True, index=True)
     overall_score: Mapped[float] = mapped_column(Float)
     soft_score: Mapped[float] = mapped_column(Float)
     digital_score: Mapped[float] = mapped_column(Float)
+    # Bumped on rescoring and (via DB trigger) whenever answers change; drives delta exports.
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+# A literal rather than a bound parameter, so even generic (prepared) plans
+# can prove the partial indexes' predicate.
+COMPLETED = Assessment.overall_score > literal_column("0")
 
 
 class AssessmentAnswer(Base):
@@ -22,15 +50,15 @@ class AssessmentAnswer(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     assessment_id: Mapped[int] = mapped_column(ForeignKey("assessments.id", ondelete="CASCADE"))
-    question_id: Mapped[int] = mapped_column(ForeignKey("questions.id", ondelete="RESTRICT"))
-    option_id: Mapped[int] = mapped_column(ForeignKey("question_options.id", ondelete="RESTRICT"))
+    question_id: Mapped[int] = mapped_column(ForeignKey("questions.id", ondelete="RESTRICT"), index=True)
+    option_id: Mapped[int] = mapped_column(ForeignKey("question_options.id", ondelete="RESTRICT"), index=True)
 
 
 class Recommendation(Base):
     __tablename__ = "recommendations"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    assessment_id: Mapped[int] = mapped_column(ForeignKey("assessments.id", ondelete="CASCADE"))
+    assessment_id: Mapped[int] = mapped_column(ForeignKey("assessments.id", ondelete="CASCADE"), index=True)
     skill_area: Mapped[str] = mapped_column(String(100))
     priority: Mapped[str] = mapped_column(String(20))
     message: Mapped[str] = mapped_column(Text)
@@ -38,6 +66,12 @@ class Recommendation(Base):
 
 class OutboxEvent(Base, TimestampMixin):
     __tablename__ = "outbox_events"
+    __table_args__ = (
+        # only the pending tail is indexed, so claiming stays cheap as history grows
+        Index("ix_outbox_events_pending", "id", postgresql_where=text("processed IS false")),
+        # retention purge walks the oldest rows first
+        Index("ix_outbox_events_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     event_type: Mapped[str] = mapped_column(String(50), index=True)
@@ -40,3 +40,9 @@ class ChatSession(Base, TimestampMixin):
         ForeignKey("questions.id", ondelete="SET NULL"),
         nullable=True,
     )
+
+    # bank version this conversation was started against (None = live tables)
+    bank_version_id: Mapped[int | None] = mapped_column(
+        ForeignKey("question_bank_versions.id", ondelete="RESTRICT"),
+        nullable=True,
+    )
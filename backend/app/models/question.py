@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Text, Integer, Boolean, ForeignKey
+from sqlalchemy import String, Text, Integer, Boolean, ForeignKey, Index, func
 from app.models.base import Base
 
 
@@ -26,3 +26,15 @@ class QuestionOption(Base):
     score: Mapped[int] = mapped_column(Integer)
 
     question = relationship("Question", back_populates="options")
+
+
+# Expression indexes matching the normalised lookups in api/v1/endpoints/questions.py
+Index("ix_questions_category_norm", func.lower(func.trim(Question.category)))
+Index(
+    "uq_questions_domain_category_text_norm",
+    Question.domain,
+    func.lower(func.trim(Question.category)),
+    func.lower(func.trim(Question.text)),
+    unique=True,
+)
+Index("ix_questions_active_order", Question.is_active, Question.display_order, Question.id)
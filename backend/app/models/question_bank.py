@@ -0,0 +1,22 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Boolean, ForeignKey, JSON, Index, text
+from app.models.base import Base, TimestampMixin
+
+
+class QuestionBankVersion(Base, TimestampMixin):
+    """
+    An immutable, published snapshot of the active question bank.
+    `snapshot` holds the ordered questions with their options; rows are never
+    updated after insert except for the `is_active` pointer.
+    """
+    __tablename__ = "question_bank_versions"
+    __table_args__ = (
+        # at most one active version
+        Index("uq_question_bank_versions_active", "is_active", unique=True, postgresql_where=text("is_active")),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    label: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    snapshot: Mapped[dict] = mapped_column(JSON)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    created_by: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
@@ -10,6 +10,8 @@ class AssessmentSubmitRequest(BaseModel):
     submission_token: str = Field(min_length=8, max_length=64)
     respondent_sector: str | None = None
     respondent_category: str | None = None
+    # bank version the answers were given against; defaults to the active one
+    bank_version_id: int | None = None
     answers: list[AnswerInput]
 
 
@@ -21,6 +23,7 @@ class RecommendationOut(BaseModel):
 
 class AssessmentResultOut(BaseModel):
     assessment_id: int
+    bank_version_id: int | None = None
     overall_score: float
     soft_score: float
     digital_score: float
@@ -35,4 +35,21 @@ class TwoFAVerifyLoginRequest(BaseModel):
 class TwoFASetupResponse(BaseModel):
     secret: str
     otpauth_uri: str
-    qr_image_data_url: str
+    qr_image_data_url: str | None = None
+    qr_image_url: str | None = None
+
+
+class UserFlagsUpdate(BaseModel):
+    is_active: bool | None = None
+    is_admin: bool | None = None
+
+
+class UserOut(BaseModel):
+    id: int
+    email: EmailStr
+    full_name: str
+    is_active: bool
+    is_admin: bool
+
+    class Config:
+        from_attributes = True
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 
@@ -26,14 +28,56 @@ class QuestionOptionOut(BaseModel):
         from_attributes = True
 
 
-class QuestionOut(BaseModel):
+class QuestionSummaryOut(BaseModel):
     id: int
     text: str
     domain: str
     category: str
     display_order: int
     is_active: bool
+
+    class Config:
+        from_attributes = True
+
+
+class QuestionOut(QuestionSummaryOut):
     options: list[QuestionOptionOut]
 
+
+class QuestionCountOut(BaseModel):
+    count: int
+
+
+class QuestionImportRow(BaseModel):
+    row: int
+    status: str  # created | valid (dry run) | duplicate | invalid
+    question_id: int | None = None
+    detail: str | None = None
+
+
+class QuestionImportReport(BaseModel):
+    dry_run: bool
+    created: int
+    duplicates: int
+    invalid: int
+    rows: list[QuestionImportRow]
+
+
+class QuestionBankPublishRequest(BaseModel):
+    label: str | None = Field(default=None, max_length=100)
+    activate: bool = False
+
+
+class QuestionBankVersionOut(BaseModel):
+    id: int
+    label: str | None
+    is_active: bool
+    created_at: datetime
+
     class Config:
         from_attributes = True
+
+
+class QuestionBankVersionDetail(BaseModel):
+    version_id: int
+    questions: list[QuestionOut]
@@ -6,6 +6,24 @@ from fastapi import HTTPException
 from app.models.question import Question, QuestionOption
 from app.models.assessment import Assessment, AssessmentAnswer, Recommendation, OutboxEvent
 from app.services.recommendation_service import generate_recommendations
+from app.services.question_bank_service import get_active_snapshot, get_snapshot
+
+
+def assessment_submitted_event(assessment: Assessment, categories: dict[str, list[float]]) -> OutboxEvent:
+    """Outbox event for a completed assessment; `categories` is [score sum, answers] per skill area."""
+    return OutboxEvent(
+        event_type="assessment_submitted",
+        payload={
+            "assessment_id": assessment.id,
+            "overall_score": assessment.overall_score,
+            "soft_score": assessment.soft_score,
+            "digital_score": assessment.digital_score,
+            "respondent_sector": assessment.respondent_sector,
+            "respondent_category": assessment.respondent_category,
+            # for the live dashboard aggregates
+            "categories": categories,
+        },
+    )
 
 
 async def submit_assessment(
@@ -15,6 +33,7 @@ async def submit_assessment(
     respondent_category: str | None,
     answers: list[dict],
     user_id: int | None = None,
+    bank_version_id: int | None = None,
 ) -> dict:
     # Idempotency guard
     existing = await db.execute(select(Assessment).where(Assessment.submission_token == submission_token))
@@ -22,12 +41,25 @@ async def submit_assessment(
     if found:
         raise HTTPException(status_code=409, detail="Duplicate submission token")
 
-    # Fetch all active questions and options for validation
-    q_rows = await db.execute(select(Question).where(Question.is_active.is_(True)))
-    questions = {q.id: q for q in q_rows.scalars().all()}
-
-    opt_rows = await db.execute(select(QuestionOption))
-    options = {o.id: o for o in opt_rows.scalars().all()}
+    # Validate against a published bank version: its lookup indexes are built
+    # once per version and cached, so no per-submission bank scan.
+    if bank_version_id is not None:
+        bank = await get_snapshot(db, bank_version_id)
+        if bank is None:
+            raise HTTPException(status_code=400, detail="Unknown bank version")
+    else:
+        bank = await get_active_snapshot(db)
+
+    if bank:
+        questions = bank.by_id
+        options = bank.options_by_id
+    else:
+        # Nothing published yet: fetch all active questions and options for validation
+        q_rows = await db.execute(select(Question).where(Question.is_active.is_(True)))
+        questions = {q.id: q for q in q_rows.scalars().all()}
+
+        opt_rows = await db.execute(select(QuestionOption))
+        options = {o.id: o for o in opt_rows.scalars().all()}
 
     if not answers:
         raise HTTPException(status_code=400, detail="No answers provided")
@@ -44,6 +76,7 @@ async def submit_assessment(
             respondent_sector=respondent_sector,
             respondent_category=respondent_category,
             submission_token=submission_token,
+            bank_version_id=bank.version_id if bank else None,
             overall_score=0,
             soft_score=0,
             digital_score=0,
@@ -92,20 +125,11 @@ async def submit_assessment(
             ))
 
         # outbox event so UI can update in near-real time
-        db.add(OutboxEvent(
-            event_type="assessment_submitted",
-            payload={
-                "assessment_id": assessment.id,
-                "overall_score": overall,
-                "soft_score": soft,
-                "digital_score": digital,
-                "respondent_sector": respondent_sector,
-                "respondent_category": respondent_category,
-            }
-        ))
+        db.add(assessment_submitted_event(assessment, {k: [sum(v), len(v)] for k, v in category_score.items()}))
 
     return {
         "assessment_id": assessment.id,
+        "bank_version_id": assessment.bank_version_id,
         "overall_score": overall,
         "soft_score": soft,
         "digital_score": digital,
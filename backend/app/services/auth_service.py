@@ -3,9 +3,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from fastapi import HTTPException, status
 from app.models.user import User
-from app.core.security import hash_password, verify_password, create_token, decode_token
+from app.core.security import hash_password_async, verify_password_async, create_token, decode_token
 from app.core.config import settings
-from app.utils.qr import qr_data_url
+from app.core.principal_cache import principal_cache
+from app.utils.qr import qr_image_data_url
 
 
 async def signup(db: AsyncSession, email: str, full_name: str, password: str) -> User:
@@ -16,7 +17,7 @@ async def signup(db: AsyncSession, email: str, full_name: str, password: str) ->
     user = User(
         email=email,
         full_name=full_name,
-        password_hash=hash_password(password),
+        password_hash=await hash_password_async(password),
         is_active=True,
     )
     db.add(user)
@@ -28,32 +29,56 @@ async def signup(db: AsyncSession, email: str, full_name: str, password: str) ->
 async def login_step(db: AsyncSession, email: str, password: str) -> dict:
     result = await db.execute(select(User).where(User.email == email, User.is_active.is_(True)))
     user = result.scalar_one_or_none()
-    if not user or not verify_password(password, user.password_hash):
+    if not user or not await verify_password_async(password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
     if user.totp_enabled:
         temp_token = create_token(str(user.id), settings.TEMP_TOKEN_EXPIRE_MINUTES, token_type="temp")
         return {"mfa_required": True, "temp_token": temp_token}
 
-    access = create_token(str(user.id), settings.ACCESS_TOKEN_EXPIRE_MINUTES, token_type="access")
-    return {"mfa_required": False, "access_token": access}
+    return {"mfa_required": False, "access_token": issue_access_token(user)}
 
 
-async def setup_2fa(user: User, db: AsyncSession) -> dict:
+def issue_access_token(user: User) -> str:
+    return create_token(str(user.id), settings.ACCESS_TOKEN_EXPIRE_MINUTES, token_type="access")
+
+
+async def update_user_flags(
+    db: AsyncSession, user_id: int, is_active: bool | None = None, is_admin: bool | None = None
+) -> User:
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if is_active is not None:
+        user.is_active = is_active
+    if is_admin is not None:
+        user.is_admin = is_admin
+    await db.commit()
+
+    # drop the cached principal so the new flags apply on the next request
+    principal_cache.invalidate(user.id)
+    return user
+
+
+def provisioning_uri(user: User) -> str:
+    return pyotp.TOTP(user.totp_secret).provisioning_uri(name=user.email, issuer_name="SkillsAssessment")
+
+
+async def setup_2fa(user: User, db: AsyncSession, qr_format: str = "png", inline: bool = True) -> dict:
     if not user.totp_secret:
         user.totp_secret = pyotp.random_base32()
         user.totp_enabled = False
         await db.commit()
         await db.refresh(user)
 
-    totp = pyotp.TOTP(user.totp_secret)
-    uri = totp.provisioning_uri(name=user.email, issuer_name="SkillsAssessment")
-    qr = qr_data_url(uri)
-
+    uri = provisioning_uri(user)
     return {
         "secret": user.totp_secret,
         "otpauth_uri": uri,
-        "qr_image_data_url": qr,
+        # with inline=False the client fetches GET /auth/2fa/qr instead
+        "qr_image_data_url": await qr_image_data_url(uri, qr_format) if inline else None,
     }
 
 
@@ -88,4 +113,4 @@ async def verify_2fa_login(db: AsyncSession, temp_token: str, code: str) -> str:
     if not totp.verify(code, valid_window=1):
         raise HTTPException(status_code=401, detail="Invalid TOTP code")
 
-    return create_token(str(user.id), settings.ACCESS_TOKEN_EXPIRE_MINUTES, token_type="access")
+    return issue_access_token(user)
@@ -0,0 +1,266 @@
+"""
+Dashboard aggregates.
+
+`DashboardAggregates` holds the running sums behind GET /dashboard/summary.
+`LiveDashboard` loads them once per API process, then keeps them current
+from `assessment_submitted` events on the bus (emitted by web submissions
+and Telegram completions alike) and pushes what changed to
+/ws/dashboard as `dashboard_delta` messages, at most
+DASHBOARD_PUSH_MAX_PER_SECOND times a second however fast submissions
+arrive. Values in a delta are absolute, so clients simply merge them into
+the summary they fetched.
+
+Only completed assessments count (COMPLETED, like the reports), so rows
+for Telegram sessions still in progress never move the numbers. A load
+also records which events it already includes, so an event delivered after
+the load that counted its row is not applied twice.
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import ConnectionManager, ws_manager
+from app.core.metrics import metrics
+from app.models.assessment import COMPLETED, Assessment, AssessmentAnswer, OutboxEvent
+from app.models.question import Question, QuestionOption
+
+logger = logging.getLogger(__name__)
+
+TOP_GAPS = 10
+# outbox ids this far below the newest are assumed committed by load time
+EVENT_ID_WINDOW = 10_000
+
+
+@dataclass
+class DashboardAggregates:
+    count: int = 0
+    sum_overall: float = 0.0
+    sum_soft: float = 0.0
+    sum_digital: float = 0.0
+    # skill area (question category) -> [sum of option scores, number of answers]
+    categories: dict[str, list[float]] = field(default_factory=dict)
+    # assessment_submitted events already reflected in the totals: every id up to
+    # counted_through, plus counted_ids above it
+    counted_through: int = 0
+    counted_ids: set[int] = field(default_factory=set)
+
+    def includes(self, event_id: int | None) -> bool:
+        return event_id is not None and (event_id <= self.counted_through or event_id in self.counted_ids)
+
+    def apply(self, payload: dict) -> None:
+        """Fold one assessment_submitted payload into the totals."""
+        self.count += 1
+        self.sum_overall += payload.get("overall_score") or 0
+        self.sum_soft += payload.get("soft_score") or 0
+        self.sum_digital += payload.get("digital_score") or 0
+        for category, (score_sum, n) in (payload.get("categories") or {}).items():
+            entry = self.categories.setdefault(category, [0.0, 0])
+            entry[0] += score_sum
+            entry[1] += n
+
+    def gap(self, category: str) -> dict:
+        score_sum, n = self.categories[category]
+        return {"skill_area": category, "avg_score": round(score_sum / n, 2) if n else 0.0, "n_answers": int(n)}
+
+    def summary(self) -> dict:
+        gaps = sorted((self.gap(c) for c in self.categories), key=lambda g: g["avg_score"])
+        n = max(self.count, 1)
+        return {
+            "total_assessments": self.count,
+            "avg_overall": round(self.sum_overall / n, 2),
+            "avg_soft": round(self.sum_soft / n, 2),
+            "avg_digital": round(self.sum_digital / n, 2),
+            "top_gaps": gaps[:TOP_GAPS],
+        }
+
+
+async def load_aggregates(db: AsyncSession) -> DashboardAggregates:
+    count, sum_overall, sum_soft, sum_digital = (
+        await db.execute(
+            select(
+                func.count(Assessment.id),
+                func.coalesce(func.sum(Assessment.overall_score), 0),
+                func.coalesce(func.sum(Assessment.soft_score), 0),
+                func.coalesce(func.sum(Assessment.digital_score), 0),
+            ).where(COMPLETED)
+        )
+    ).one()
+
+    # skill area = question category, scored by the chosen option
+    rows = await db.execute(
+        select(
+            Question.category,
+            func.coalesce(func.sum(QuestionOption.score), 0),
+            func.count(AssessmentAnswer.id),
+        )
+        .select_from(AssessmentAnswer)
+        .join(QuestionOption, QuestionOption.id == AssessmentAnswer.option_id)
+        .join(Question, Question.id == AssessmentAnswer.question_id)
+        .join(Assessment, Assessment.id == AssessmentAnswer.assessment_id)
+        .where(COMPLETED)
+        .group_by(Question.category)
+    )
+
+    return DashboardAggregates(
+        count=int(count or 0),
+        sum_overall=float(sum_overall or 0),
+        sum_soft=float(sum_soft or 0),
+        sum_digital=float(sum_digital or 0),
+        categories={c: [float(s), int(n)] for c, s, n in rows.all() if c is not None},
+    )
+
+
+async def load_live_aggregates(db: AsyncSession) -> DashboardAggregates:
+    """
+    `load_aggregates` plus the assessment_submitted events it already counts,
+    all read from one snapshot. Outbox ids are allocated before commit, so
+    ids near the top are listed rather than assumed from the maximum.
+    """
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    aggregates = await load_aggregates(db)
+    newest = (await db.execute(select(func.max(OutboxEvent.id)))).scalar() or 0
+    aggregates.counted_through = max(newest - EVENT_ID_WINDOW, 0)
+    aggregates.counted_ids = set(
+        (
+            await db.execute(
+                select(OutboxEvent.id).where(
+                    OutboxEvent.id > aggregates.counted_through,
+                    OutboxEvent.event_type == "assessment_submitted",
+                )
+            )
+        ).scalars()
+    )
+    return aggregates
+
+
+class LiveDashboard:
+    def __init__(
+        self,
+        manager: ConnectionManager,
+        session_factory: async_sessionmaker,
+        max_per_second: float | None = None,
+        resync_seconds: float | None = None,
+    ) -> None:
+        self.manager = manager
+        self.session_factory = session_factory
+        self.interval = 1 / (max_per_second or settings.DASHBOARD_PUSH_MAX_PER_SECOND)
+        self.resync_seconds = resync_seconds or settings.DASHBOARD_RESYNC_SECONDS
+        self.state: DashboardAggregates | None = None
+        self._loaded_at = 0.0
+        self._last_sent: dict = {}
+        self._dirty = asyncio.Event()
+        self._load_lock = asyncio.Lock()
+        # events that arrive while a load is in flight, applied to its result
+        self._pending: list[dict] | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            # bind the primitives to the running loop
+            self._dirty = asyncio.Event()
+            self._load_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run(), name="live-dashboard")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def on_event(self, event: dict) -> None:
+        if event.get("type") != "assessment_submitted":
+            return
+        if self._pending is not None:
+            self._pending.append(event)
+        elif self.state is not None:
+            self._apply(self.state, event)
+        self._dirty.set()
+
+    @staticmethod
+    def _apply(state: DashboardAggregates, event: dict) -> None:
+        if state.includes(event.get("id")):
+            metrics.inc("dashboard.events_already_counted")
+            return
+        state.apply(event.get("payload") or {})
+
+    def diff(self, summary: dict) -> dict:
+        """Fields of `summary` that differ from what was last pushed."""
+        last = self._last_sent
+        delta = {k: v for k, v in summary.items() if k != "top_gaps" and last.get(k) != v}
+
+        sent_gaps = last.get("_gaps", {})
+        gaps = [self.state.gap(c) for c in self.state.categories]
+        changed = [g for g in gaps if sent_gaps.get(g["skill_area"]) != g]
+        if changed:
+            delta["gaps"] = changed
+        if summary["top_gaps"] != last.get("top_gaps"):
+            delta["top_gaps"] = summary["top_gaps"]
+
+        self._last_sent = {**summary, "_gaps": {g["skill_area"]: g for g in gaps}}
+        return delta
+
+    async def _ensure_loaded(self) -> DashboardAggregates:
+        # one query per process (not per viewer), and periodically to correct drift;
+        # concurrent callers (e.g. a wave of reconnects) share the same load
+        async with self._load_lock:
+            if self.state is None or time.monotonic() - self._loaded_at > self.resync_seconds:
+                state, pending = self.state, []
+                self._pending = pending
+                try:
+                    async with self.session_factory() as db:
+                        state = await load_live_aggregates(db)
+                    self._loaded_at = time.monotonic()
+                    metrics.inc("dashboard.aggregate_loads")
+                finally:
+                    # on failure the previous totals stay, so they still need these events
+                    self._pending = None
+                    if state is not None:
+                        for event in pending:
+                            self._apply(state, event)
+                    self.state = state
+            return self.state
+
+    async def snapshot(self) -> dict:
+        """Current summary from process memory, for (re)connecting clients."""
+        return (await self._ensure_loaded()).summary()
+
+    async def _push(self) -> None:
+        if not self.manager.has_admins():
+            # no admin watching: drop the state rather than keep it in sync
+            self.state = None
+            self._last_sent = {}
+            return
+
+        await self._ensure_loaded()
+        delta = self.diff(self.state.summary())
+        if delta:
+            message = {"type": "dashboard_delta", "data": delta}
+            # admin-only data, like GET /dashboard/summary
+            await self.manager.broadcast_text(json.dumps(message), message, admins_only=True)
+            metrics.inc("dashboard.deltas_pushed")
+
+    async def _run(self) -> None:
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+            try:
+                await self._push()
+            except Exception:
+                metrics.inc("dashboard.push_errors")
+                logger.exception("Live dashboard update failed")
+                self.state = None
+            # events arriving meanwhile coalesce into the next push
+            await asyncio.sleep(self.interval)
+
+
+live_dashboard = LiveDashboard(ws_manager, AsyncSessionLocal)
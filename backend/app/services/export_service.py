@@ -0,0 +1,139 @@
+"""
+CPU-bound half of the Excel export.
+
+These functions run inside the export worker pool (see app/core/executor.py),
+so they take plain, picklable data and return the finished workbook bytes.
+No DB or app state in here.
+"""
+from datetime import datetime
+from io import BytesIO
+from typing import NamedTuple
+
+import pandas as pd
+
+
+class ExportRow(NamedTuple):
+    """One completed assessment as fetched for the Raw Data sheet (plain, picklable)."""
+    id: int
+    user_id: int | None
+    respondent_sector: str | None
+    respondent_category: str | None
+    overall_score: float
+    soft_score: float
+    digital_score: float
+    created_at: datetime | None
+    updated_at: datetime | None
+
+
+def _risk_for_skill(avg_score: float) -> str:
+    if avg_score < 3:
+        return "High"
+    if avg_score < 3.5:
+        return "Medium"
+    return "Low"
+
+
+def _raw_frame(rows: list[ExportRow]) -> pd.DataFrame:
+    return pd.DataFrame([
+        {
+            "Assessment ID": r.id,
+            "User ID": r.user_id,
+            "Sector": r.respondent_sector,
+            "Category": r.respondent_category,
+            "Overall Score": r.overall_score,
+            "Soft Score": r.soft_score,
+            "Digital Score": r.digital_score,
+            "Created At": r.created_at.isoformat() if r.created_at else None,
+            "Updated At": r.updated_at.isoformat() if r.updated_at else None,
+        }
+        for r in rows
+    ])
+
+
+def _write_workbook(sheets: dict[str, pd.DataFrame]) -> bytes:
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        for sheet_name, df in sheets.items():
+            df.to_excel(writer, index=False, sheet_name=sheet_name)
+    return output.getvalue()
+
+
+def build_policy_report(
+    summary: tuple,
+    skill_rows: list[tuple],
+    sector_rows: list[tuple],
+    raw_rows: list[ExportRow],
+) -> bytes:
+    # -------------------------------------------------------
+    # 1️⃣ NATIONAL SUMMARY (Completed Assessments Only)
+    # -------------------------------------------------------
+    total, avg_overall, avg_soft, avg_digital = summary
+    summary_df = pd.DataFrame([
+        {
+            "Total Assessments": int(total or 0),
+            "Average Overall Score": round(float(avg_overall or 0), 2),
+            "Average Soft Skills": round(float(avg_soft or 0), 2),
+            "Average Digital Skills": round(float(avg_digital or 0), 2),
+        }
+    ])
+
+    # -------------------------------------------------------
+    # 2️⃣ SKILL GAP ANALYSIS (Lowest Scores First)
+    # -------------------------------------------------------
+    skill_data = []
+    for skill_area, avg, responses in skill_rows:
+        avg_score = round(float(avg or 0), 2)
+        skill_data.append({
+            "Skill Area": skill_area,
+            "Average Score": avg_score,
+            "Risk Level": _risk_for_skill(avg_score),
+            "Total Responses": int(responses),
+        })
+    skill_df = pd.DataFrame(skill_data)
+
+    # -------------------------------------------------------
+    # 3️⃣ SECTOR PERFORMANCE
+    # -------------------------------------------------------
+    sector_df = pd.DataFrame([
+        {
+            "Sector": r[0],
+            "Avg Overall Score": round(float(r[1] or 0), 2),
+            "Avg Digital Score": round(float(r[2] or 0), 2),
+            "Assessments": int(r[3]),
+        }
+        for r in sector_rows if r[0] is not None
+    ])
+
+    # -------------------------------------------------------
+    # 4️⃣ RISK DISTRIBUTION (Overall Score)
+    # -------------------------------------------------------
+    risk_counts = {"High Risk (<3)": 0, "Medium Risk (3–3.5)": 0, "Low Risk (>3.5)": 0}
+    for s in (r.overall_score for r in raw_rows):
+        if s < 3:
+            risk_counts["High Risk (<3)"] += 1
+        elif s < 3.5:
+            risk_counts["Medium Risk (3–3.5)"] += 1
+        else:
+            risk_counts["Low Risk (>3.5)"] += 1
+
+    risk_df = pd.DataFrame([
+        {"Risk Level": k, "Count": v}
+        for k, v in risk_counts.items()
+    ])
+
+    # -------------------------------------------------------
+    # 5️⃣ RAW DATA (Cleaned – Completed Only)
+    # -------------------------------------------------------
+    raw_df = _raw_frame(raw_rows)
+
+    return _write_workbook({
+        "National Summary": summary_df,
+        "Skill Gaps": skill_df,
+        "Sector Analysis": sector_df,
+        "Risk Distribution": risk_df,
+        "Raw Data": raw_df,
+    })
+
+
+def build_delta_report(raw_rows: list[ExportRow]) -> bytes:
+    return _write_workbook({"Raw Data": _raw_frame(raw_rows)})
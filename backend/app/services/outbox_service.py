@@ -0,0 +1,418 @@
+"""
+Outbox dispatch.
+
+Inserting into outbox_events fires a statement-level trigger that NOTIFYs
+OUTBOX_CHANNEL; the notification is delivered when the inserting
+transaction commits. `OutboxListener` holds one LISTEN connection and drains
+the outbox as soon as a notification arrives, with a slow fallback sweep
+(OUTBOX_SWEEP_SECONDS) for anything sent while it was disconnected.
+
+Batches are claimed with FOR UPDATE SKIP LOCKED, so any number of
+dispatchers can drain concurrently without delivering a row twice; ordering
+is then per batch, not global.
+
+With OUTBOX_IN_PROCESS_DISPATCH the API process runs an `OutboxListener`
+itself and delivers straight to its own sockets through
+`EventBus.publish_local`: no Redis, no worker, but only for a single API
+process, since each one would claim batches for its own sockets only.
+
+Retention: `purge_outbox` deletes processed rows older than
+OUTBOX_RETENTION_DAYS in small batches. If the table has been converted to
+monthly partitions (see partition_outbox.py) it also keeps partitions
+created ahead and drops whole expired months instead; a DEFAULT partition
+takes any rows beyond the newest month meanwhile.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import date, datetime, timedelta, timezone
+
+import asyncpg
+from sqlalchemy import Delete, Select, delete, func, select, text, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.events import Connection, EventBus, publish_events
+from app.core.metrics import metrics
+from app.models.assessment import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_CHANNEL = "outbox_events"
+_CONNECTION_ERRORS = (OSError, asyncpg.PostgresError, asyncpg.InterfaceError)
+
+Publisher = Callable[[Iterable[dict]], Awaitable[int]]
+
+
+def claim_outbox_stmt(limit: int) -> Select:
+    # served by the partial index ix_outbox_events_pending (same predicate text, so it always matches)
+    return (
+        select(OutboxEvent.id, OutboxEvent.event_type, OutboxEvent.payload)
+        .where(OutboxEvent.processed.is_(False))
+        .order_by(OutboxEvent.id.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+async def dispatch_batch(db: AsyncSession, limit: int, publish: Publisher = publish_events) -> int:
+    events = (await db.execute(claim_outbox_stmt(limit))).all()
+    if not events:
+        await db.rollback()
+        return 0
+
+    # API processes own the sockets; hand events to them via the bus. Rows
+    # stay locked until commit and are only marked once the publish succeeded.
+    await publish({"id": ev.id, "type": ev.event_type, "payload": ev.payload} for ev in events)
+    await db.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id.in_([ev.id for ev in events]))
+        .values(processed=True)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return len(events)
+
+
+async def drain_outbox(
+    session_factory: async_sessionmaker,
+    batch_size: int | None = None,
+    publish: Publisher = publish_events,
+) -> int:
+    """Dispatch batches until the outbox is empty; returns the number of events sent."""
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    started = time.perf_counter()
+    total = 0
+    while True:
+        async with session_factory() as db:
+            sent = await dispatch_batch(db, batch_size, publish)
+        total += sent
+        if sent < batch_size:
+            break
+    metrics.inc("outbox.dispatched", total)
+    metrics.observe("outbox.drain_seconds", time.perf_counter() - started)
+    return total
+
+
+async def record_outbox_backlog(db: AsyncSession) -> tuple[int, float]:
+    """Pending event count and age of the oldest one (seconds), also set as gauges."""
+    count, oldest = (
+        await db.execute(
+            select(func.count(), func.min(OutboxEvent.created_at)).where(OutboxEvent.processed.is_(False))
+        )
+    ).one()
+    age = (datetime.now(timezone.utc) - oldest).total_seconds() if oldest else 0.0
+    metrics.gauge_set("outbox.backlog", count)
+    metrics.gauge_set("outbox.oldest_pending_seconds", age)
+    return count, age
+
+
+_backlog_refreshed_at: float | None = None
+_backlog_lock: asyncio.Lock | None = None
+
+
+async def refresh_outbox_backlog(session_factory: async_sessionmaker, max_age_seconds: float | None = None) -> None:
+    """`record_outbox_backlog` at most once per `max_age_seconds`; otherwise the gauges stand."""
+    global _backlog_refreshed_at, _backlog_lock
+    max_age = settings.OUTBOX_BACKLOG_REFRESH_SECONDS if max_age_seconds is None else max_age_seconds
+    if _backlog_lock is None:
+        _backlog_lock = asyncio.Lock()
+    async with _backlog_lock:
+        if _backlog_refreshed_at is not None and time.monotonic() - _backlog_refreshed_at < max_age:
+            return
+        # stamped even on failure, so a broken database is not hammered either
+        _backlog_refreshed_at = time.monotonic()
+        async with session_factory() as db:
+            await record_outbox_backlog(db)
+
+
+PARTITION_PREFIX = "outbox_events_p"
+# catches rows past the newest monthly partition, so inserts (and with them
+# assessment submissions) never fail because the purge task stopped running
+DEFAULT_PARTITION = "outbox_events_default"
+
+
+def _add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+async def outbox_is_partitioned(db: AsyncSession) -> bool:
+    return bool(
+        (
+            await db.execute(
+                text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'outbox_events'::regclass)")
+            )
+        ).scalar()
+    )
+
+
+async def _outbox_partitions(db: AsyncSession) -> list[str]:
+    rows = await db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'outbox_events'::regclass"
+    ))
+    return sorted(r[0] for r in rows.all())
+
+
+async def ensure_outbox_partitions(db: AsyncSession, first_month: date, months_ahead: int = 2) -> list[str]:
+    """
+    Create the DEFAULT partition and monthly partitions from `first_month`
+    through `months_ahead` past the current month; returns the months created.
+    A new month is filled with any of its rows that landed in the default
+    partition before being attached (attaching fails while they are there).
+    """
+    existing = set(await _outbox_partitions(db))
+    if DEFAULT_PARTITION not in existing:
+        await db.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF outbox_events DEFAULT"))
+
+    created = []
+    month = first_month.replace(day=1)
+    last = _add_months(datetime.now(timezone.utc).date().replace(day=1), months_ahead)
+    while month <= last:
+        upper = _add_months(month, 1)
+        name = partition_name(month)
+        if name not in existing:
+            lower_ts, upper_ts = f"'{month.isoformat()} 00:00+00'", f"'{upper.isoformat()} 00:00+00'"
+            await db.execute(text(
+                f"CREATE TABLE {name} (LIKE outbox_events INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            ))
+            await db.execute(text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                f"WHERE created_at >= {lower_ts} AND created_at < {upper_ts} RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            ))
+            await db.execute(text(
+                f"ALTER TABLE outbox_events ATTACH PARTITION {name} FOR VALUES FROM ({lower_ts}) TO ({upper_ts})"
+            ))
+            created.append(name)
+        month = upper
+    return created
+
+
+async def drop_expired_outbox_partitions(db: AsyncSession, cutoff: datetime) -> list[str]:
+    """Drop months that ended before `cutoff` and hold no pending events."""
+    dropped = []
+    for name in await _outbox_partitions(db):
+        if not name.startswith(PARTITION_PREFIX):
+            continue
+        month = datetime.strptime(name.removeprefix(PARTITION_PREFIX), "%Y%m").date()
+        upper = datetime.combine(_add_months(month, 1), datetime.min.time(), tzinfo=timezone.utc)
+        if upper > cutoff:
+            continue
+        pending = (await db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name} WHERE processed IS false)"))).scalar()
+        if pending:
+            continue
+        await db.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    return dropped
+
+
+def purge_outbox_stmt(cutoff: datetime, limit: int) -> Delete:
+    doomed = (
+        select(OutboxEvent.id)
+        .where(OutboxEvent.processed.is_(True), OutboxEvent.created_at < cutoff)
+        .order_by(OutboxEvent.created_at.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    return delete(OutboxEvent).where(OutboxEvent.id.in_(doomed)).execution_options(synchronize_session=False)
+
+
+async def purge_outbox(
+    session_factory: async_sessionmaker,
+    retention_days: int | None = None,
+    batch_size: int | None = None,
+) -> dict:
+    retention_days = settings.OUTBOX_RETENTION_DAYS if retention_days is None else retention_days
+    batch_size = batch_size or settings.OUTBOX_PURGE_BATCH_SIZE
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+
+    dropped: list[str] = []
+    async with session_factory() as db:
+        if await outbox_is_partitioned(db):
+            await ensure_outbox_partitions(db, datetime.now(timezone.utc).date())
+            dropped = await drop_expired_outbox_partitions(db, cutoff)
+            await db.commit()
+
+    # short transactions: row locks and WAL stay small, vacuum keeps up
+    deleted = 0
+    while True:
+        async with session_factory() as db:
+            n = (await db.execute(purge_outbox_stmt(cutoff, batch_size))).rowcount
+            await db.commit()
+        deleted += n
+        if n < batch_size:
+            break
+
+    async with session_factory() as db:
+        await record_outbox_backlog(db)
+    metrics.inc("outbox.purged", deleted)
+    metrics.inc("outbox.partitions_dropped", len(dropped))
+    return {"deleted": deleted, "dropped_partitions": dropped}
+
+
+def replay_stmt(after_id: int, limit: int) -> Select:
+    # primary key range scan; unprocessed rows are still on their way through the bus
+    return (
+        select(OutboxEvent.id, OutboxEvent.event_type, OutboxEvent.payload)
+        .where(OutboxEvent.id > after_id, OutboxEvent.processed.is_(True))
+        .order_by(OutboxEvent.id.asc())
+        .limit(limit)
+    )
+
+
+_replay_slots: asyncio.Semaphore | None = None
+
+
+async def replay_events(
+    conn: Connection,
+    bus: EventBus,
+    session_factory: async_sessionmaker,
+    last_event_id: int,
+) -> dict:
+    """
+    Queue the events after `last_event_id` that match the socket's filters,
+    ahead of any live traffic. Served from the bus's in-memory buffer when it
+    reaches back far enough, otherwise from outbox_events with a bounded
+    number of concurrent queries (mass reconnects after a deploy).
+    """
+    global _replay_slots
+    limit = settings.WS_REPLAY_MAX_EVENTS
+    conn.hold()
+    replayed: list[str] = []
+    replayed_ids: list[int] = []
+    truncated = False
+    try:
+        # the buffer is in delivery order, which is not id order across batches
+        recent = sorted(bus.recent, key=lambda item: item[0])
+        if recent and recent[0][0] <= last_event_id:
+            metrics.inc("ws.replay_memory")
+            rows = [(eid, text, event) for eid, text, event in recent if eid > last_event_id]
+        else:
+            metrics.inc("ws.replay_db")
+            if _replay_slots is None:
+                _replay_slots = asyncio.Semaphore(settings.WS_REPLAY_MAX_CONCURRENCY)
+            async with _replay_slots:
+                async with session_factory() as db:
+                    result = await db.execute(replay_stmt(last_event_id, limit + 1))
+            rows = []
+            for eid, event_type, payload in result.all():
+                event = {"id": eid, "type": event_type, "payload": payload}
+                rows.append((eid, json.dumps(event), event))
+
+        truncated = len(rows) > limit
+        rows = rows[:limit]
+        replayed = [conn.encode(event, text) for _eid, text, event in rows if conn.wants(event)]
+        replayed_ids = [eid for eid, _text, _event in rows]
+        if truncated:
+            # the client should rely on the dashboard_snapshot that follows
+            replayed.append(conn.encode({"type": "replay_truncated", "last_event_id": replayed_ids[-1]}))
+        metrics.inc("ws.replayed_events", len(replayed))
+    finally:
+        conn.release(replayed, replayed_ids)
+    return {"replayed": len(replayed), "truncated": truncated}
+
+
+def _asyncpg_dsn() -> str:
+    # LISTEN needs a dedicated raw connection, outside SQLAlchemy's pool
+    return make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class OutboxListener:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        sweep_seconds: float | None = None,
+        publish: Publisher | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.sweep_seconds = sweep_seconds or settings.OUTBOX_SWEEP_SECONDS
+        self.publish = publish
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Run in the background of the current loop (in-process dispatch)."""
+        if self._task is None:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self.run(), name="outbox-dispatcher")
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Let an in-flight batch commit, then stop; cancel if that takes too long."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        _done, pending = await asyncio.wait({self._task}, timeout=timeout)
+        if pending:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def _on_notify(self, *_args) -> None:
+        metrics.inc("outbox.notifications")
+        self._wakeup.set()
+
+    async def _drain(self, record_backlog: bool = False) -> None:
+        try:
+            await drain_outbox(self.session_factory, publish=self.publish or publish_events)
+            if record_backlog:
+                async with self.session_factory() as db:
+                    await record_outbox_backlog(db)
+        except Exception:
+            # leave rows unprocessed; the next notification or sweep retries them
+            metrics.inc("outbox.dispatch_errors")
+            logger.exception("Outbox dispatch failed")
+
+    async def _serve(self, conn: asyncpg.Connection) -> None:
+        await conn.add_listener(OUTBOX_CHANNEL, self._on_notify)
+        # anything committed while we were not listening
+        await self._drain()
+        while not conn.is_closed() and not self._stopping:
+            sweep = False
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.sweep_seconds)
+            except asyncio.TimeoutError:
+                metrics.inc("outbox.sweeps")
+                sweep = True
+            self._wakeup.clear()
+            if self._stopping:
+                break
+            await self._drain(record_backlog=sweep)
+
+    async def run(self) -> None:
+        backoff = 0.5
+        while not self._stopping:
+            try:
+                conn = await asyncpg.connect(_asyncpg_dsn())
+            except _CONNECTION_ERRORS as exc:
+                metrics.inc("outbox.listener_errors")
+                logger.warning("Outbox listener cannot connect, retrying in %.1fs: %s", backoff, exc)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+                continue
+
+            backoff = 0.5
+            conn.add_termination_listener(lambda _conn: self._wakeup.set())
+            try:
+                await self._serve(conn)
+            except _CONNECTION_ERRORS as exc:
+                metrics.inc("outbox.listener_errors")
+                logger.warning("Outbox listener connection lost: %s", exc)
+            finally:
+                if not conn.is_closed():
+                    await conn.close()
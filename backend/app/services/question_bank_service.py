@@ -0,0 +1,219 @@
+"""
+Published, immutable question-bank versions.
+
+A version freezes the ordered active questions and their options as JSON.
+Because a version never changes, everything derived from it (lookup
+indexes, rendered chat messages, API bodies) is cached per version for the
+life of the process. Switching banks is a pointer swap on `is_active`.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.models.question import Question
+from app.models.question_bank import QuestionBankVersion
+
+
+@dataclass(frozen=True)
+class FrozenOption:
+    id: int
+    question_id: int
+    label: str
+    text: str
+    score: int
+
+
+@dataclass(frozen=True)
+class FrozenQuestion:
+    """Attribute-compatible with the Question model for read-only use."""
+    id: int
+    text: str
+    domain: str
+    category: str
+    display_order: int
+    is_active: bool
+    options: tuple[FrozenOption, ...]
+
+
+class BankSnapshot:
+    def __init__(self, version_id: int, snapshot: dict) -> None:
+        self.version_id = version_id
+        self.questions: tuple[FrozenQuestion, ...] = tuple(
+            FrozenQuestion(
+                id=q["id"],
+                text=q["text"],
+                domain=q["domain"],
+                category=q["category"],
+                display_order=q["display_order"],
+                is_active=True,
+                options=tuple(FrozenOption(question_id=q["id"], **o) for o in q["options"]),
+            )
+            for q in snapshot.get("questions", [])
+        )
+        self.by_id = {q.id: q for q in self.questions}
+        self.options_by_id = {o.id: o for q in self.questions for o in q.options}
+        self._position = {q.id: i for i, q in enumerate(self.questions)}
+        self._derived: dict[Any, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def filtered(
+        self,
+        domain: str | None = None,
+        norm_category: str | None = None,
+        after: tuple[int, int] | None = None,
+        limit: int | None = None,
+    ) -> list[FrozenQuestion]:
+        """Same filters and (display_order, id) keyset as GET /questions over the live tables."""
+        questions = [
+            q for q in self.questions
+            if (not domain or q.domain == domain)
+            and (norm_category is None or q.category.strip(" ").lower() == norm_category)
+            and (after is None or (q.display_order, q.id) > after)
+        ]
+        return questions[:limit] if limit is not None else questions
+
+    def first(self) -> FrozenQuestion | None:
+        return self.questions[0] if self.questions else None
+
+    def next_after(self, question_id: int) -> FrozenQuestion | None:
+        pos = self._position.get(question_id)
+        if pos is None or pos + 1 >= len(self.questions):
+            return None
+        return self.questions[pos + 1]
+
+    def derived(self, key: Any, build: Callable[[], Any]) -> Any:
+        """Memoise an artefact computed from this (immutable) version."""
+        try:
+            return self._derived[key]
+        except KeyError:
+            value = self._derived[key] = build()
+            return value
+
+
+_MAX_CACHED_VERSIONS = 16
+_snapshots: OrderedDict[int, BankSnapshot] = OrderedDict()
+_active_pointer: tuple[int | None, float] | None = None
+
+
+async def build_snapshot_payload(db: AsyncSession) -> dict:
+    rows = await db.execute(
+        select(Question)
+        .options(selectinload(Question.options))
+        .where(Question.is_active.is_(True))
+        .order_by(Question.display_order.asc(), Question.id.asc())
+    )
+    return {
+        "questions": [
+            {
+                "id": q.id,
+                "text": q.text,
+                "domain": q.domain,
+                "category": q.category,
+                "display_order": q.display_order,
+                "options": [
+                    {"id": o.id, "label": o.label, "text": o.text, "score": o.score}
+                    for o in sorted(q.options, key=lambda o: (o.score, o.label, o.id))
+                ],
+            }
+            for q in rows.scalars().unique().all()
+        ]
+    }
+
+
+async def publish_version(
+    db: AsyncSession,
+    label: str | None = None,
+    created_by: int | None = None,
+    activate: bool = False,
+) -> QuestionBankVersion:
+    version = QuestionBankVersion(
+        label=label,
+        snapshot=await build_snapshot_payload(db),
+        is_active=False,
+        created_by=created_by,
+    )
+    db.add(version)
+    await db.flush()
+    if activate:
+        await _swap_active(db, version.id)
+        version.is_active = True
+    await db.commit()
+    if activate:
+        _set_pointer(version.id)
+    return version
+
+
+async def activate_version(db: AsyncSession, version_id: int) -> bool:
+    exists = (
+        await db.execute(select(QuestionBankVersion.id).where(QuestionBankVersion.id == version_id))
+    ).scalar_one_or_none()
+    if exists is None:
+        return False
+    await _swap_active(db, version_id)
+    await db.commit()
+    _set_pointer(version_id)
+    return True
+
+
+async def _swap_active(db: AsyncSession, version_id: int) -> None:
+    # concurrent activations would otherwise both clear the old row and race on
+    # uq_question_bank_versions_active; the lock is held until commit
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext("question_bank_versions.activate"))))
+    # clear first: uq_question_bank_versions_active allows a single true row
+    await db.execute(
+        update(QuestionBankVersion)
+        .where(QuestionBankVersion.is_active.is_(True), QuestionBankVersion.id != version_id)
+        .values(is_active=False)
+    )
+    await db.execute(
+        update(QuestionBankVersion).where(QuestionBankVersion.id == version_id).values(is_active=True)
+    )
+
+
+def _set_pointer(version_id: int | None) -> None:
+    global _active_pointer
+    _active_pointer = (version_id, time.monotonic())
+
+
+async def get_snapshot(db: AsyncSession, version_id: int) -> BankSnapshot | None:
+    snap = _snapshots.get(version_id)
+    if snap is not None:
+        _snapshots.move_to_end(version_id)
+        return snap
+
+    payload = (
+        await db.execute(select(QuestionBankVersion.snapshot).where(QuestionBankVersion.id == version_id))
+    ).scalar_one_or_none()
+    if payload is None:
+        return None
+
+    snap = _snapshots[version_id] = BankSnapshot(version_id, payload)
+    while len(_snapshots) > _MAX_CACHED_VERSIONS:
+        _snapshots.popitem(last=False)
+    return snap
+
+
+async def get_active_snapshot(db: AsyncSession) -> BankSnapshot | None:
+    """
+    The active version, or None when nothing has been published yet (callers
+    then fall back to the live tables). The pointer is re-read after a short
+    TTL so activations made by other processes are picked up.
+    """
+    pointer = _active_pointer
+    if pointer is None or time.monotonic() - pointer[1] > settings.QUESTION_BANK_POINTER_TTL_SECONDS:
+        version_id = (
+            await db.execute(select(QuestionBankVersion.id).where(QuestionBankVersion.is_active.is_(True)))
+        ).scalar_one_or_none()
+        _set_pointer(version_id)
+    else:
+        version_id = pointer[0]
+
+    return await get_snapshot(db, version_id) if version_id is not None else None
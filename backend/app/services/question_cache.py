@@ -0,0 +1,116 @@
+"""
+Pre-serialised bodies for GET /questions.
+
+Each filter combination maps to the JSON body, its gzip'd form and a strong
+ETag, tagged with the bank version it was built from. `invalidate()` bumps the
+version (create_question calls it); the TTL bounds staleness for writes made
+by *other* worker processes, which cannot reach this in-process cache.
+Right after an invalidation the replica may not have the write yet, so
+`written_within` tells readers to refill from the primary for a while.
+"""
+import gzip
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    body: bytes
+    gzipped: bytes
+    etag: str
+    version: int
+    built_at: float
+    next_cursor: str | None = None
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def make_cached_body(body: bytes, version: int = 0, next_cursor: str | None = None) -> CachedBody:
+    return CachedBody(
+        body=body,
+        gzipped=gzip.compress(body, compresslevel=6),
+        etag=make_etag(body + (next_cursor or "").encode()),
+        version=version,
+        built_at=time.monotonic(),
+        next_cursor=next_cursor,
+    )
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses weak comparison (RFC 9110 §13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (c.strip() for c in if_none_match.split(","))
+    return any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Accept-Encoding allows gzip with a non-zero q-value, by name or via * (RFC 9110 §12.5.3)."""
+    qvalues: dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding.lower()] = q
+    for coding in ("gzip", "x-gzip"):
+        if coding in qvalues:
+            return qvalues[coding] > 0
+    return qvalues.get("*", 0.0) > 0
+
+
+class QuestionListCache:
+    def __init__(self, ttl_seconds: float, max_entries: int = 256) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version = 0
+        self.invalidated_at: float | None = None
+        self._entries: OrderedDict[tuple, CachedBody] = OrderedDict()
+
+    def get(self, key: tuple) -> CachedBody | None:
+        entry = self._entries.get(key)
+        if entry is None or entry.version != self.version or (
+            self.ttl_seconds and time.monotonic() - entry.built_at > self.ttl_seconds
+        ):
+            metrics.inc("questions_cache.miss")
+            return None
+        self._entries.move_to_end(key)
+        metrics.inc("questions_cache.hit")
+        return entry
+
+    def put(self, key: tuple, body: bytes, version: int, next_cursor: str | None = None) -> CachedBody:
+        entry = make_cached_body(body, version, next_cursor)
+        # a write may have landed while we were querying; don't cache stale data
+        if version == self.version:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self.invalidated_at = time.monotonic()
+        self._entries.clear()
+
+    def written_within(self, seconds: float) -> bool:
+        return self.invalidated_at is not None and time.monotonic() - self.invalidated_at < seconds
+
+
+question_cache = QuestionListCache(ttl_seconds=settings.QUESTIONS_CACHE_TTL_SECONDS)
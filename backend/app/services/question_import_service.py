@@ -0,0 +1,202 @@
+"""
+Bulk question import.
+
+Rows arrive as JSON (a list of QuestionCreate objects) or CSV (one question
+per line, see CSV_COLUMNS). Everything is normalised in one pass, duplicates
+against the existing bank are found with one set-based query per chunk, and
+questions/options go in as multi-row inserts inside a single transaction.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.question import Question, QuestionOption
+from app.schemas.question import QuestionCreate
+from app.utils.text import normalize_spaces
+
+MAX_IMPORT_ROWS = 10_000
+OPTION_LABELS = ("A", "B", "C", "D", "E")
+# text,domain,category,display_order,is_active,option_a,score_a,...,option_e,score_e
+CSV_COLUMNS = ["text", "domain", "category", "display_order", "is_active"] + [
+    col for label in OPTION_LABELS for col in (f"option_{label.lower()}", f"score_{label.lower()}")
+]
+
+# 3 bind params per key; stay well under asyncpg's 32767 limit
+_DUP_PROBE_CHUNK = 5_000
+
+
+@dataclass
+class _PreparedQuestion:
+    row: int
+    domain: str
+    category: str
+    text: str
+    display_order: int
+    is_active: bool
+    options: list[tuple[str, str, int]]
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return (self.domain, self.category.lower(), self.text.lower())
+
+
+def question_rule_error(payload: QuestionCreate) -> str | None:
+    """Business rules shared by create_question and the bulk import."""
+    if len(payload.options) < 2:
+        return "At least two options required"
+    labels = [op.label.strip().upper() for op in payload.options]
+    if len(labels) != len(set(labels)):
+        return "Duplicate option labels are not allowed"
+    return None
+
+
+def parse_json_rows(raw: bytes) -> list[tuple[int, dict]]:
+    try:
+        data = json.loads(raw or b"null")
+    except ValueError:
+        raise ValueError("Body is not valid JSON")
+    if not isinstance(data, list):
+        raise ValueError("JSON body must be a list of questions")
+    return [(i, item) for i, item in enumerate(data, start=1)]
+
+
+def parse_csv_rows(raw: bytes) -> list[tuple[int, dict]]:
+    try:
+        text = raw.decode("utf-8-sig")  # tolerate Excel's BOM
+    except UnicodeDecodeError:
+        raise ValueError("CSV must be UTF-8 encoded")
+
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or "text" not in {(f or "").strip().lower() for f in reader.fieldnames}:
+        raise ValueError(f"CSV header must include: {', '.join(CSV_COLUMNS)}")
+
+    items: list[tuple[int, dict]] = []
+    for row in reader:
+        cells = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items() if k}
+        options = [
+            {"label": label, "text": cells[f"option_{label.lower()}"], "score": cells.get(f"score_{label.lower()}")}
+            for label in OPTION_LABELS
+            if cells.get(f"option_{label.lower()}")
+        ]
+        items.append((reader.line_num, {
+            "text": cells.get("text"),
+            "domain": cells.get("domain", "").lower(),
+            "category": cells.get("category"),
+            "display_order": cells.get("display_order") or 0,
+            "is_active": cells.get("is_active") or True,
+            "options": options,
+        }))
+    return items
+
+
+def _prepare(row: int, item: dict) -> _PreparedQuestion | str:
+    try:
+        payload = QuestionCreate.model_validate(item)
+    except ValidationError as exc:
+        err = exc.errors()[0]
+        loc = ".".join(str(p) for p in err["loc"])
+        return f"{loc}: {err['msg']}" if loc else err["msg"]
+
+    error = question_rule_error(payload)
+    if error:
+        return error
+
+    return _PreparedQuestion(
+        row=row,
+        domain=payload.domain,
+        category=normalize_spaces(payload.category),
+        text=normalize_spaces(payload.text),
+        display_order=payload.display_order,
+        is_active=payload.is_active,
+        options=[(op.label.strip().upper(), normalize_spaces(op.text), op.score) for op in payload.options],
+    )
+
+
+async def _existing_ids(db: AsyncSession, keys: list[tuple[str, str, str]]) -> dict[tuple[str, str, str], int]:
+    norm_category = func.lower(func.trim(Question.category))
+    norm_text = func.lower(func.trim(Question.text))
+    found: dict[tuple[str, str, str], int] = {}
+    for start in range(0, len(keys), _DUP_PROBE_CHUNK):
+        chunk = keys[start:start + _DUP_PROBE_CHUNK]
+        rows = await db.execute(
+            select(Question.id, Question.domain, norm_category, norm_text)
+            .where(tuple_(Question.domain, norm_category, norm_text).in_(chunk))
+        )
+        for qid, domain, category, text in rows.all():
+            found.setdefault((domain, category, text), qid)
+    return found
+
+
+async def import_questions(db: AsyncSession, items: list[tuple[int, dict]], dry_run: bool = False) -> dict:
+    report: dict[int, dict] = {}
+    prepared: list[_PreparedQuestion] = []
+    seen: dict[tuple[str, str, str], int] = {}
+
+    for row, item in items:
+        p = _prepare(row, item) if isinstance(item, dict) else "Row must be an object"
+        if isinstance(p, str):
+            report[row] = {"row": row, "status": "invalid", "detail": p}
+        elif p.key in seen:
+            report[row] = {"row": row, "status": "duplicate", "detail": f"Same question as row {seen[p.key]}"}
+        else:
+            seen[p.key] = row
+            prepared.append(p)
+
+    existing = await _existing_ids(db, [p.key for p in prepared]) if prepared else {}
+    to_create: list[_PreparedQuestion] = []
+    for p in prepared:
+        if p.key in existing:
+            report[p.row] = {
+                "row": p.row,
+                "status": "duplicate",
+                "question_id": existing[p.key],
+                "detail": "Question already exists (same domain/category/text)",
+            }
+        else:
+            to_create.append(p)
+
+    if to_create and not dry_run:
+        result = await db.execute(
+            insert(Question).returning(Question.id, sort_by_parameter_order=True),
+            [
+                {
+                    "text": p.text,
+                    "domain": p.domain,
+                    "category": p.category,
+                    "display_order": p.display_order,
+                    "is_active": p.is_active,
+                }
+                for p in to_create
+            ],
+        )
+        ids = result.scalars().all()
+
+        await db.execute(
+            insert(QuestionOption),
+            [
+                {"question_id": qid, "label": label, "text": text, "score": score}
+                for qid, p in zip(ids, to_create)
+                for label, text, score in p.options
+            ],
+        )
+        await db.commit()
+
+        for qid, p in zip(ids, to_create):
+            report[p.row] = {"row": p.row, "status": "created", "question_id": qid}
+    else:
+        for p in to_create:
+            report[p.row] = {"row": p.row, "status": "valid"}
+
+    rows = [report[row] for row, _ in items]
+    return {
+        "dry_run": dry_run,
+        "created": sum(1 for r in rows if r["status"] == "created"),
+        "duplicates": sum(1 for r in rows if r["status"] == "duplicate"),
+        "invalid": sum(1 for r in rows if r["status"] == "invalid"),
+        "rows": rows,
+    }
@@ -1,5 +1,8 @@
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
 from app.core.config import settings
+from app.tasks.runtime import runtime
 
 celery_app = Celery(
     "skills_tasks",
@@ -10,3 +13,24 @@ celery_app = Celery(
 celery_app.conf.task_routes = {
     "app.tasks.outbox_tasks.*": {"queue": "default"},
 }
+
+# run with `celery ... beat` (or `worker -B` in development)
+celery_app.conf.beat_schedule = {
+    "purge-outbox": {
+        "task": "app.tasks.outbox_tasks.purge_outbox",
+        "schedule": crontab(hour=3, minute=15),
+    },
+}
+
+
+# prefork: each child gets its own loop and engine after the fork, never the parent's
+@worker_process_init.connect
+def _start_runtime(**_kwargs) -> None:
+    runtime.start()
+
+
+# solo/threads pools start the runtime lazily and stop it with the worker
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _stop_runtime(**_kwargs) -> None:
+    runtime.stop()
@@ -0,0 +1,25 @@
+"""
+Long-lived outbox dispatcher: LISTENs for outbox inserts and drains them
+immediately. Run one (or more) per deployment:
+
+    python -m app.tasks.outbox_listener
+"""
+import asyncio
+import logging
+
+from app.core.database import AsyncSessionLocal, engine
+from app.core.redis_client import close_redis
+from app.services.outbox_service import OutboxListener
+
+
+async def main() -> None:
+    try:
+        await OutboxListener(AsyncSessionLocal).run()
+    finally:
+        await close_redis()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""
+One asyncio loop per Celery worker process.
+
+asyncpg connections and the Redis client belong to the loop they were
+opened on, so calling asyncio.run() per task either breaks pooled
+connections or reconnects every time. `WorkerRuntime` instead runs a
+single loop in a background thread, with its own engine, for the life of
+the process; tasks hand it coroutines with `run()`. Started and stopped
+from the worker signals in celery_app.py, or lazily on first use (solo
+pool, eager tasks).
+"""
+import asyncio
+import logging
+import threading
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.core.database import make_engine, make_sessionmaker
+from app.core.redis_client import close_redis
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class WorkerRuntime:
+    def __init__(self) -> None:
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.engine: AsyncEngine | None = None
+        self.session_factory: async_sessionmaker | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.loop is not None
+
+    def start(self) -> None:
+        with self._lock:
+            if self.loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=loop.run_forever, name="worker-asyncio", daemon=True)
+            self._thread.start()
+            self.engine = make_engine()
+            self.session_factory = make_sessionmaker(self.engine)
+            self.loop = loop
+
+    def run(self, fn: Callable[[async_sessionmaker], Awaitable[T]], timeout: float | None = None) -> T:
+        """Run `fn(session_factory)` on the worker loop and wait for its result."""
+        if self.loop is None:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(fn(self.session_factory), self.loop).result(timeout)
+
+    def stop(self) -> None:
+        with self._lock:
+            loop, self.loop = self.loop, None
+            if loop is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._close(), loop).result(timeout=10)
+            except Exception:
+                logger.exception("Worker runtime did not shut down cleanly")
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join(timeout=10)
+            loop.close()
+            self._thread = None
+            self.engine = None
+            self.session_factory = None
+
+    async def _close(self) -> None:
+        await close_redis()
+        await self.engine.dispose()
+
+
+runtime = WorkerRuntime()
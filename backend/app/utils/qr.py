@@ -1,11 +1,81 @@
 import base64
+import hashlib
+import time
+from collections import OrderedDict
 from io import BytesIO
+
 import qrcode
 
+from app.core.config import settings
+from app.core.executor import qr_executor
+from app.core.metrics import metrics
+
+QR_MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+_MAX_CACHED = 512
+# (format, sha256 of data) -> (image, expires at), oldest first. The images encode
+# TOTP secrets, so they only live long enough to cover setup and the follow-up fetch.
+_rendered: OrderedDict[tuple[str, str], tuple[bytes, float]] = OrderedDict()
+
+
+def _svg(matrix: list[list[bool]]) -> bytes:
+    # one path segment per horizontal run of dark modules, in module units
+    size = len(matrix)
+    runs = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            runs.append(f"M{start} {y}h{x - start}v1H{start}z")
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="100%" height="100%" fill="#fff"/><path d="{"".join(runs)}"/></svg>'
+    ).encode()
+
+
+def render_qr(data: str, fmt: str = "png") -> bytes:
+    if fmt == "svg":
+        # plain string building: no Pillow, scales to any size on the client; about
+        # 5x the bytes of the 1-bit PNG, which stays the compact default
+        qr = qrcode.QRCode(border=4)
+        qr.add_data(data)
+        qr.make(fit=True)
+        return _svg(qr.get_matrix())
 
-def qr_data_url(data: str) -> str:
-    img = qrcode.make(data)
     buff = BytesIO()
-    img.save(buff, format="PNG")
-    b64 = base64.b64encode(buff.getvalue()).decode("utf-8")
-    return f"data:image/png;base64,{b64}"
+    qrcode.make(data).save(buff, format="PNG")
+    return buff.getvalue()
+
+
+def _evict_expired(now: float) -> None:
+    while _rendered and next(iter(_rendered.values()))[1] <= now:
+        _rendered.popitem(last=False)
+
+
+async def qr_image(data: str, fmt: str = "png") -> bytes:
+    """Rendered QR for `data`, briefly cached per (format, data) and rendered off the event loop."""
+    now = time.monotonic()
+    _evict_expired(now)
+    key = (fmt, hashlib.sha256(data.encode()).hexdigest())
+    hit = _rendered.get(key)
+    if hit is not None:
+        metrics.inc("qr_cache.hit")
+        return hit[0]
+
+    metrics.inc("qr_cache.miss")
+    image = await qr_executor.run(render_qr, data, fmt)
+    if settings.QR_CACHE_TTL_SECONDS > 0:
+        _rendered[key] = (image, time.monotonic() + settings.QR_CACHE_TTL_SECONDS)
+        while len(_rendered) > _MAX_CACHED:
+            _rendered.popitem(last=False)
+    return image
+
+
+async def qr_image_data_url(data: str, fmt: str = "png") -> str:
+    b64 = base64.b64encode(await qr_image(data, fmt)).decode("utf-8")
+    return f"data:{QR_MEDIA_TYPES[fmt]};base64,{b64}"
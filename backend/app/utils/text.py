@@ -0,0 +1,6 @@
+import re
+
+
+def normalize_spaces(value: str) -> str:
+    """Trim and collapse repeated whitespace to a single space."""
+    return re.sub(r"\s+", " ", value.strip())
@@ -0,0 +1,80 @@
+# backend/partition_outbox.py
+"""
+Optional one-off: convert outbox_events to monthly range partitions on
+created_at, so retention drops whole months instead of deleting rows.
+
+    python partition_outbox.py [--keep-history]
+
+Besides the months, a DEFAULT partition catches rows past the newest one, so
+inserts keep working even if the daily purge (which creates months ahead)
+stops running.
+
+Run it in a maintenance window with the outbox listener stopped. Pending
+events are always carried over; processed ones only with --keep-history.
+The old table is kept as outbox_events_legacy for inspection; drop it once
+you are happy.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.core.config import settings
+from app.services.outbox_service import ensure_outbox_partitions, outbox_is_partitioned
+
+
+async def main(keep_history: bool) -> None:
+    engine = create_async_engine(settings.DATABASE_URL)
+    SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with SessionLocal() as session:
+        if await outbox_is_partitioned(session):
+            print("outbox_events is already partitioned")
+            await engine.dispose()
+            return
+
+        await session.execute(text("LOCK TABLE outbox_events IN ACCESS EXCLUSIVE MODE"))
+        await session.execute(text("ALTER TABLE outbox_events RENAME TO outbox_events_legacy"))
+        await session.execute(text("ALTER INDEX outbox_events_pkey RENAME TO outbox_events_legacy_pkey"))
+        for index in ("ix_outbox_events_event_type", "ix_outbox_events_pending", "ix_outbox_events_created_at"):
+            await session.execute(text(f"DROP INDEX IF EXISTS {index}"))
+        await session.execute(text("DROP TRIGGER IF EXISTS trg_outbox_events_notify ON outbox_events_legacy"))
+
+        # the partition key must be part of the primary key
+        await session.execute(text(
+            "CREATE TABLE outbox_events (LIKE outbox_events_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            "PARTITION BY RANGE (created_at)"
+        ))
+        await session.execute(text("ALTER TABLE outbox_events ADD PRIMARY KEY (id, created_at)"))
+        await session.execute(text("ALTER SEQUENCE outbox_events_id_seq OWNED BY outbox_events.id"))
+        await session.execute(text("CREATE INDEX ix_outbox_events_event_type ON outbox_events (event_type)"))
+        await session.execute(text(
+            "CREATE INDEX ix_outbox_events_pending ON outbox_events (id) WHERE processed IS false"
+        ))
+        await session.execute(text("CREATE INDEX ix_outbox_events_created_at ON outbox_events (created_at)"))
+        await session.execute(text(
+            "CREATE TRIGGER trg_outbox_events_notify AFTER INSERT ON outbox_events "
+            "FOR EACH STATEMENT EXECUTE FUNCTION notify_outbox_events()"
+        ))
+
+        where = "" if keep_history else " WHERE processed IS false"
+        oldest = (
+            await session.execute(text(f"SELECT min(created_at) FROM outbox_events_legacy{where}"))
+        ).scalar()
+        await ensure_outbox_partitions(session, (oldest or datetime.now(timezone.utc)).date())
+        copied = (
+            await session.execute(text(f"INSERT INTO outbox_events SELECT * FROM outbox_events_legacy{where}"))
+        ).rowcount
+
+        await session.commit()
+
+    await engine.dispose()
+    print(f"✅ outbox_events partitioned by month ({copied} events carried over)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keep-history", action="store_true", help="also copy already-processed events")
+    asyncio.run(main(parser.parse_args().keep_history))
@@ -1,10 +1,11 @@
 # backend/seed_question_bank.py
 import asyncio
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
-from sqlalchemy import text as sql_text
+from sqlalchemy import select
 
 from app.core.config import settings
 from app.models.question import Question, QuestionOption
+from app.services.question_bank_service import publish_version
 
 SCORE_BY_LABEL = {"a": 5, "b": 4, "c": 3, "d": 2, "e": 1}
 
@@ -255,6 +256,13 @@ QUESTION_BANK = [
 ]
 
 async def main():
+    """
+    Sync the live bank to QUESTION_BANK and publish it as the active version.
+
+    Existing questions are matched on (domain, category, text) and reordered /
+    reactivated in place; questions no longer in the bank are deactivated, never
+    deleted, so answers and earlier published versions stay valid.
+    """
     db_url = settings.DATABASE_URL
     if not db_url:
         raise RuntimeError("settings.DATABASE_URL is empty. Check your .env POSTGRES_* or DATABASE_URL")
@@ -263,16 +271,21 @@ async def main():
     Session = async_sessionmaker(engine, expire_on_commit=False)
 
     async with Session() as session:
-        q_table = Question.__tablename__
-        o_table = QuestionOption.__tablename__
-
-        # wipe clean
-        await session.execute(
-            sql_text(f'TRUNCATE TABLE "{o_table}", "{q_table}" RESTART IDENTITY CASCADE;')
-        )
+        existing = {
+            (q.domain, q.category.strip().lower(), q.text.strip().lower()): q
+            for q in (await session.execute(select(Question))).scalars().all()
+        }
+        wanted = set()
 
-        # insert
         for i, q in enumerate(QUESTION_BANK, start=1):
+            key = (q["domain"], q["category"].strip().lower(), q["text"].strip().lower())
+            wanted.add(key)
+
+            if key in existing:
+                existing[key].display_order = i
+                existing[key].is_active = True
+                continue
+
             question = Question(
                 text=q["text"].strip(),
                 domain=q["domain"],
@@ -291,10 +304,16 @@ async def main():
                 )
             session.add(question)
 
+        for key, question in existing.items():
+            if key not in wanted:
+                question.is_active = False
+
         await session.commit()
 
+        version = await publish_version(session, label="seed_question_bank", activate=True)
+
     await engine.dispose()
-    print(f"✅ Seeded {len(QUESTION_BANK)} questions")
+    print(f"✅ Seeded {len(QUESTION_BANK)} questions (published as bank version {version.id})")
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import pytest
 from httpx import AsyncClient
@@ -39,9 +40,55 @@ def _set_test_env():
     os.environ.setdefault("REDIS_URL", "redis://localhost:6379/1")
 
 
+class FakeSocket:
+    """WebSocket stand-in for ConnectionManager tests: records text frames, can fail or stall sends."""
+
+    def __init__(self, fail: bool = False, delay: float = 0) -> None:
+        self.sent: list[str] = []
+        self.fail = fail
+        self.delay = delay
+        self.closed_with = None
+
+    async def send_text(self, text: str) -> None:
+        if self.fail:
+            raise RuntimeError("closed")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+@pytest.fixture
+def fake_socket():
+    """The FakeSocket class, e.g. `fake_socket(fail=True)`."""
+    return FakeSocket
+
+
 @pytest.fixture
 async def client():
     transport = ASGITransport(app=app)
     async with LifespanManager(app):
         async with AsyncClient(transport=transport, base_url="http://test") as ac:
             yield ac
+
+
+@pytest.fixture
+async def pg_conn():
+    """Raw connection to the test database; skips when PostgreSQL is not reachable."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import NullPool
+    from app.core.config import settings
+
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        conn = await engine.connect()
+    except Exception as exc:  # noqa: BLE001 - any connect failure means "no DB here"
+        await engine.dispose()
+        pytest.skip(f"PostgreSQL not reachable: {exc}")
+    try:
+        yield conn
+    finally:
+        await conn.close()
+        await engine.dispose()
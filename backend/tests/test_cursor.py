@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.v1.endpoints.exports import next_export_cursor
+from app.utils.cursor import decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip():
+    ts = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+    cursor = encode_cursor(ts, 42)
+    assert "=" not in cursor
+    iso, last_id = decode_cursor(cursor)
+    assert datetime.fromisoformat(iso) == ts
+    assert last_id == 42
+
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor!")
+
+
+def test_export_cursor_stays_behind_the_cutoff():
+    cutoff = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+    old = SimpleNamespace(id=7, updated_at=cutoff - timedelta(minutes=10))
+    recent = SimpleNamespace(id=3, updated_at=cutoff + timedelta(minutes=2))
+
+    # a row newer than the cutoff may still have older rows committing behind it
+    assert decode_cursor(next_export_cursor([old, recent], None, cutoff)) == [old.updated_at.isoformat(), 7]
+    # nothing settled yet: keep the caller's watermark, or start at the cutoff
+    watermark = (cutoff - timedelta(hours=1), 1)
+    assert decode_cursor(next_export_cursor([recent], watermark, cutoff)) == [watermark[0].isoformat(), 1]
+    assert decode_cursor(next_export_cursor([recent], None, cutoff)) == [cutoff.isoformat(), 0]
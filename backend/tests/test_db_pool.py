@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from app.core.database import InstrumentedPool, make_engine, record_pool_stats
+from app.core.metrics import metrics
+
+
+class FakeDBAPIConnection:
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def _pool_metrics(name: str) -> dict:
+    snap = metrics.snapshot()
+    prefix = f"db.pool.{name}."
+    return {
+        k.removeprefix(prefix): v
+        for section in ("counters", "timings")
+        for k, v in snap[section].items()
+        if k.startswith(prefix)
+    }
+
+
+@pytest.mark.anyio
+async def test_pool_reports_wait_overflow_and_timeouts():
+    pool = InstrumentedPool(FakeDBAPIConnection, pool_size=1, max_overflow=1, timeout=0.05, logging_name="t1")
+
+    def checkout_three():
+        first, second = pool.connect(), pool.connect()  # second one is overflow
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+        second.close()
+        first.close()
+
+    await greenlet_spawn(checkout_three)
+
+    stats = _pool_metrics("t1")
+    assert stats["overflow_connections"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["wait_seconds"]["count"] == 3
+    assert stats["wait_seconds"]["max"] >= 0.05  # the timed-out checkout waited
+
+
+@pytest.mark.anyio
+async def test_pool_metrics_name_survives_recreate():
+    pool = InstrumentedPool(FakeDBAPIConnection, pool_size=1, logging_name="t3")
+    recreated = pool.recreate()  # what engine.dispose() does
+    assert isinstance(recreated, InstrumentedPool) and recreated.metrics_prefix == "db.pool.t3"
+
+    await greenlet_spawn(lambda: recreated.connect().close())
+    assert _pool_metrics("t3")["wait_seconds"]["count"] == 1
+
+
+def test_engine_takes_pool_settings(monkeypatch):
+    from app.core import database
+
+    monkeypatch.setattr(database.settings, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(database.settings, "DB_MAX_OVERFLOW", 2)
+    monkeypatch.setattr(database.settings, "DB_PGBOUNCER", True)
+    engine = make_engine("postgresql+asyncpg://u:p@localhost/db", name="t2")
+
+    assert isinstance(engine.pool, InstrumentedPool)
+    assert engine.pool.size() == 3 and engine.pool.overflow() == -3
+    args = database._connect_args(str(engine.url))
+    assert args["statement_cache_size"] == 0 and args["prepared_statement_cache_size"] == 0
+    assert record_pool_stats(engine, "t2") == {"size": 3, "checked_out": 0, "checked_in": 0, "overflow": 0}
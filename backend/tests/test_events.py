@@ -0,0 +1,138 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core import events
+from app.core.events import ConnectionManager, EventBus
+
+
+@pytest.mark.anyio
+async def test_bus_rebroadcasts_published_messages_to_local_sockets(fake_socket):
+    manager = ConnectionManager()
+    alive, dead = fake_socket(), fake_socket(fail=True)
+    manager.register(alive)
+    manager.register(dead)
+    bus = EventBus(manager, "test")
+
+    event = json.dumps({"type": "assessment_submitted", "payload": {"assessment_id": 1}})
+    await bus.handle({"type": "subscribe", "data": 1})
+    await bus.handle({"type": "message", "data": event})
+    await asyncio.sleep(0.01)
+
+    assert alive.sent == [event]
+    assert list(manager.active_connections) == [alive]
+    assert dead.closed_with == 1013
+
+
+@pytest.mark.anyio
+async def test_bad_message_or_listener_does_not_stop_the_bus(fake_socket):
+    manager = ConnectionManager()
+    socket = fake_socket()
+    manager.register(socket)
+    bus = EventBus(manager, "test")
+    seen = []
+
+    def broken(event):
+        raise KeyError("categories")
+
+    bus.add_listener(broken)
+    bus.add_listener(seen.append)
+
+    valid = json.dumps({"id": 7, "type": "assessment_submitted", "payload": {}})
+    await bus.handle({"type": "message", "data": "not json"})
+    await bus.handle({"type": "message", "data": "[1, 2]"})
+    await bus.handle({"type": "message", "data": valid})
+    await asyncio.sleep(0.01)
+
+    assert socket.sent == [valid]
+    assert seen == [json.loads(valid)]  # delivered despite the listener before it raising
+    manager.disconnect(socket)
+
+
+@pytest.mark.anyio
+async def test_subscriber_loop_survives_garbage_on_the_channel(monkeypatch):
+    valid = json.dumps({"id": 8, "type": "assessment_submitted", "payload": {}})
+
+    class FakePubSub:
+        async def subscribe(self, _channel) -> None:
+            pass
+
+        async def listen(self):
+            for data in ("{garbage", valid):
+                yield {"type": "message", "data": data}
+            await asyncio.sleep(60)
+
+        async def aclose(self) -> None:
+            pass
+
+    class FakeRedis:
+        def pubsub(self):
+            return FakePubSub()
+
+    monkeypatch.setattr(events, "get_redis", lambda: FakeRedis())
+    bus = EventBus(ConnectionManager(), "test")
+    seen = []
+    bus.add_listener(seen.append)
+    bus.start()
+    await asyncio.sleep(0.01)
+
+    assert seen == [json.loads(valid)]
+    assert not bus._task.done()
+    await bus.stop()
+
+
+@pytest.mark.anyio
+async def test_slow_consumer_does_not_hold_up_others(fake_socket):
+    manager = ConnectionManager(max_queue=3, policy="drop_oldest")
+    fast, slow = fake_socket(), fake_socket(delay=10)
+    manager.register(fast)
+    manager.register(slow)
+
+    for i in range(5):
+        await manager.broadcast_text(str(i))
+        await asyncio.sleep(0)  # events arrive one bus message at a time
+    await asyncio.sleep(0.01)
+
+    assert fast.sent == ["0", "1", "2", "3", "4"]
+    # "0" is stuck in the slow socket's send; only the newest three stay queued
+    assert list(manager.active_connections[slow].queue) == ["2", "3", "4"]
+
+    strict = ConnectionManager(max_queue=1, policy="disconnect")
+    strict.register(slow)
+    for i in range(3):
+        await strict.broadcast_text(str(i))
+    assert not strict.active_connections
+    manager.disconnect(slow)
+    manager.disconnect(fast)
+
+
+@pytest.mark.anyio
+async def test_events_are_routed_by_subscription(fake_socket):
+    manager = ConnectionManager()
+    everything, health, health_digital, deltas = fake_socket(), fake_socket(), fake_socket(), fake_socket()
+    for socket in (everything, health, health_digital, deltas):
+        manager.register(socket)
+    conns = manager.active_connections
+    manager.subscribe(conns[health], {"sectors": ["Health"]})
+    manager.subscribe(conns[health_digital], {"event_types": ["assessment_submitted"], "sectors": ["Health"]})
+    manager.subscribe(conns[health_digital], {"categories": ["Digital"]})
+    manager.subscribe(conns[deltas], {"event_types": ["dashboard_delta"]})
+
+    def event(sector, category):
+        return {"type": "assessment_submitted", "payload": {"respondent_sector": sector, "respondent_category": category}}
+
+    assert manager.recipients(event("Health", "Digital")) == {conns[everything], conns[health], conns[health_digital]}
+    assert manager.recipients(event("Health", "Soft")) == {conns[everything], conns[health]}
+    assert manager.recipients(event("Education", "Digital")) == {conns[everything]}
+    assert manager.recipients({"type": "dashboard_delta"}) == {conns[everything], conns[health], conns[deltas]}
+
+    manager.unsubscribe(conns[health_digital])
+    assert conns[health_digital] in manager.recipients(event("Education", "Soft"))
+
+    with pytest.raises(ValueError):
+        manager.subscribe(conns[health], {"sectors": ["Mining"], "regions": ["x"]})
+    assert manager.recipients(event("Mining", "Soft")) == {conns[everything], conns[health_digital]}
+    for socket in (everything, health, health_digital, deltas):
+        manager.disconnect(socket)
+    assert not manager._unfiltered and not any(manager._by_primary.values())
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.executor import BoundedExecutor
+from app.core.metrics import metrics
+
+
+def _slow_square(x: int) -> int:
+    time.sleep(0.05)
+    return x * x
+
+
+@pytest.mark.anyio
+async def test_bounded_executor_caps_concurrency():
+    ex = BoundedExecutor("test_pool", "thread", max_concurrency=2)
+    try:
+        results = await asyncio.gather(*(ex.run(_slow_square, i) for i in range(5)))
+    finally:
+        ex.shutdown()
+
+    assert results == [0, 1, 4, 9, 16]
+    snap = metrics.snapshot()
+    assert snap["gauges"]["test_pool.queue_depth"] == 0
+    assert snap["gauges"]["test_pool.in_flight"] == 0
+    assert snap["timings"]["test_pool.run_seconds"]["count"] == 5
+    # at most 2 ran at once, so someone must have waited
+    assert snap["timings"]["test_pool.wait_seconds"]["max"] > 0.04
+
+
+@pytest.mark.anyio
+async def test_cancelled_caller_keeps_the_slot_until_the_job_ends():
+    ex = BoundedExecutor("test_cancel", "thread", max_concurrency=1)
+    spans = []
+
+    def job(name: str) -> None:
+        start = time.monotonic()
+        time.sleep(0.1)
+        spans.append((name, start, time.monotonic()))
+
+    try:
+        first = asyncio.create_task(ex.run(job, "first"))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        await ex.run(job, "second")
+    finally:
+        ex.shutdown()
+
+    (_, _, first_end), (_, second_start, _) = sorted(spans)
+    assert second_start >= first_end  # never two jobs at once
+    assert metrics.snapshot()["gauges"]["test_cancel.in_flight"] == 0
@@ -0,0 +1,86 @@
+import asyncio
+import json
+from contextlib import nullcontext
+
+import pytest
+
+from app.core.events import ConnectionManager
+from app.core.principal_cache import Principal
+from app.services import dashboard_service
+from app.services.dashboard_service import DashboardAggregates, LiveDashboard
+
+
+def submitted(overall, soft, digital, categories):
+    return {
+        "type": "assessment_submitted",
+        "payload": {"overall_score": overall, "soft_score": soft, "digital_score": digital, "categories": categories},
+    }
+
+
+@pytest.mark.anyio
+async def test_submissions_are_coalesced_into_one_delta(fake_socket):
+    manager = ConnectionManager()
+    socket = fake_socket()
+    manager.register(socket, principal=Principal(id=1, email="admin@example.com", is_admin=True))
+    bystander = fake_socket()
+    manager.register(bystander, principal=Principal(id=2, email="user@example.com", is_admin=False))
+    live = LiveDashboard(manager, session_factory=None, max_per_second=1000)
+    live.state = DashboardAggregates(count=1, sum_overall=4, sum_soft=4, sum_digital=4,
+                                     categories={"Communication": [8.0, 2]})
+    live.resync_seconds = float("inf")
+    live.diff(live.state.summary())  # pretend the baseline was already pushed
+    live.start()
+
+    live.on_event(submitted(2, 2, 0, {"Communication": [2, 1], "Teamwork": [6, 2]}))
+    live.on_event(submitted(3, 0, 3, {"Digital Literacy": [4, 1]}))
+    live.on_event({"type": "something_else", "payload": {}})
+    await asyncio.sleep(0.05)
+    await live.stop()
+
+    deltas = [json.loads(m) for m in socket.sent]
+    assert len(deltas) == 1 and deltas[0]["type"] == "dashboard_delta"
+    data = deltas[0]["data"]
+    assert data["total_assessments"] == 3
+    assert data["avg_overall"] == 3.0
+    assert {g["skill_area"] for g in data["gaps"]} == {"Communication", "Teamwork", "Digital Literacy"}
+    assert data["top_gaps"][0] == {"skill_area": "Teamwork", "avg_score": 3.0, "n_answers": 2}
+    assert data["avg_soft"] == 2.0
+    assert bystander.sent == []
+    manager.disconnect(socket)
+    manager.disconnect(bystander)
+
+
+@pytest.mark.anyio
+async def test_no_admin_connected_drops_state(fake_socket):
+    manager = ConnectionManager()
+    socket = fake_socket()
+    manager.register(socket, principal=Principal(id=2, email="user@example.com", is_admin=False))
+    live = LiveDashboard(manager, session_factory=None, max_per_second=1000)
+    live.state = DashboardAggregates(count=1, sum_overall=4, sum_soft=4, sum_digital=4, categories={})
+
+    await live._push()
+
+    assert live.state is None
+    assert socket.sent == []
+    manager.disconnect(socket)
+
+
+@pytest.mark.anyio
+async def test_events_already_counted_by_the_load_are_not_applied_twice(monkeypatch):
+    live = LiveDashboard(ConnectionManager(), session_factory=lambda: nullcontext(), max_per_second=1000)
+
+    async def load(_db):
+        # 41 and 43 are in this snapshot; 42 was allocated earlier but committed later
+        live.on_event({"id": 43, **submitted(5, 5, 5, {})})  # delivered while loading
+        return DashboardAggregates(count=2, sum_overall=8, sum_soft=8, sum_digital=8,
+                                   counted_through=40, counted_ids={41, 43})
+
+    monkeypatch.setattr(dashboard_service, "load_live_aggregates", load)
+    state = await live._ensure_loaded()
+    assert state.count == 2
+
+    live.on_event({"id": 41, **submitted(4, 4, 4, {})})
+    live.on_event({"id": 12, **submitted(4, 4, 4, {})})
+    assert state.count == 2
+    live.on_event({"id": 42, **submitted(2, 2, 2, {"Teamwork": [2, 1]})})
+    assert state.count == 3 and state.categories == {"Teamwork": [2, 1]}
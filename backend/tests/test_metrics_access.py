@@ -0,0 +1,59 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import main
+from app.core.config import settings
+from app.core.principal_cache import Principal, principal_cache
+from app.core.security import create_token
+from app.services import outbox_service
+
+
+@pytest.fixture
+async def metrics_client(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    # no database here: only the access check is under test
+    async def no_backlog(_session_factory, max_age_seconds=None):
+        return None
+
+    monkeypatch.setattr(main, "refresh_outbox_backlog", no_backlog)
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.anyio
+async def test_metrics_requires_admin_or_scrape_token(metrics_client):
+    assert (await metrics_client.get("/metrics")).status_code == 401
+    assert (await metrics_client.get("/metrics", headers={"Authorization": "Bearer wrong"})).status_code == 401
+
+    principal_cache.put(Principal(id=9001, email="user@example.com", is_admin=False))
+    user = create_token("9001", 5)
+    assert (await metrics_client.get("/metrics", headers={"Authorization": f"Bearer {user}"})).status_code == 403
+
+    principal_cache.put(Principal(id=9002, email="admin@example.com", is_admin=True))
+    admin = create_token("9002", 5)
+    assert (await metrics_client.get("/metrics", headers={"Authorization": f"Bearer {admin}"})).status_code == 200
+
+    resp = await metrics_client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert resp.status_code == 200
+    assert "counters" in resp.json()
+
+
+@pytest.mark.anyio
+async def test_backlog_is_counted_at_most_once_per_interval(monkeypatch):
+    calls = []
+
+    class Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return None
+
+    async def fake_record(db):
+        calls.append(db)
+
+    monkeypatch.setattr(outbox_service, "record_outbox_backlog", fake_record)
+    monkeypatch.setattr(outbox_service, "_backlog_refreshed_at", None)
+    for _ in range(5):
+        await outbox_service.refresh_outbox_backlog(Session, max_age_seconds=60)
+    assert len(calls) == 1
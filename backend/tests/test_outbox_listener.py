@@ -0,0 +1,121 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.events import ConnectionManager, EventBus
+from app.services import outbox_service
+from app.services.outbox_service import OUTBOX_CHANNEL, OutboxListener, dispatch_batch
+
+
+class FakeListenConnection:
+    def __init__(self) -> None:
+        self.listeners = {}
+        self.closed = False
+
+    async def add_listener(self, channel, callback) -> None:
+        self.listeners[channel] = callback
+
+    def add_termination_listener(self, callback) -> None:
+        pass
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeOutboxSession:
+    """Claims the given rows, then records the processed-marking update and commit."""
+
+    def __init__(self, rows) -> None:
+        self.rows = rows
+        self.statements = []
+        self.committed = False
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        rows = self.rows if len(self.statements) == 1 else []
+        return SimpleNamespace(all=lambda: rows)
+
+    async def commit(self) -> None:
+        self.committed = True
+
+    async def rollback(self) -> None:
+        pass
+
+
+@pytest.mark.anyio
+async def test_failing_listener_does_not_block_the_batch_commit():
+    bus = EventBus(ConnectionManager(), "unused")
+    seen = []
+
+    def broken(event):
+        if event["id"] == 2:
+            raise ValueError("bad payload")
+        seen.append(event["id"])
+
+    bus.add_listener(broken)
+    db = FakeOutboxSession(
+        [SimpleNamespace(id=i, event_type="assessment_submitted", payload={}) for i in (1, 2, 3)]
+    )
+
+    assert await dispatch_batch(db, 10, bus.publish_local) == 3
+    assert db.committed and len(db.statements) == 2  # claimed, then marked processed
+    assert seen == [1, 3]
+    assert [r[0] for r in bus.recent] == [1, 2, 3]
+
+
+@pytest.mark.anyio
+async def test_listener_drains_on_connect_and_on_notify(monkeypatch):
+    drains = []
+
+    async def fake_drain(_session_factory, batch_size=None, publish=None):
+        drains.append(asyncio.get_running_loop().time())
+        return 0
+
+    monkeypatch.setattr(outbox_service, "drain_outbox", fake_drain)
+    listener = OutboxListener(session_factory=None, sweep_seconds=60)
+    conn = FakeListenConnection()
+    task = asyncio.create_task(listener._serve(conn))
+
+    await asyncio.sleep(0.01)
+    assert len(drains) == 1  # catch-up drain before waiting
+
+    conn.listeners[OUTBOX_CHANNEL](conn, 1234, OUTBOX_CHANNEL, "")
+    await asyncio.sleep(0.01)
+    assert len(drains) == 2  # woken by NOTIFY, not by the 60s sweep
+
+    conn.closed = True
+    conn.listeners[OUTBOX_CHANNEL](conn, 1234, OUTBOX_CHANNEL, "")
+    await asyncio.wait_for(task, 1)
+
+
+@pytest.mark.anyio
+async def test_in_process_dispatcher_delivers_locally_and_stops_cleanly(monkeypatch):
+    bus = EventBus(ConnectionManager(), "unused")
+    seen = []
+    bus.add_listener(seen.append)
+    conn = FakeListenConnection()
+    pending = [{"id": 1, "type": "assessment_submitted", "payload": {}}]
+
+    async def fake_connect(_dsn):
+        return conn
+
+    async def fake_drain(_session_factory, batch_size=None, publish=None):
+        batch = list(pending)
+        pending.clear()
+        return await publish(batch)
+
+    monkeypatch.setattr(outbox_service.asyncpg, "connect", fake_connect)
+    monkeypatch.setattr(outbox_service, "drain_outbox", fake_drain)
+    listener = OutboxListener(session_factory=None, sweep_seconds=60, publish=bus.publish_local)
+    listener.start()
+
+    await asyncio.sleep(0.01)
+    assert seen == [{"id": 1, "type": "assessment_submitted", "payload": {}}]  # no Redis involved
+    assert bus.recent[-1][0] == 1  # still available for replay
+
+    await listener.stop(timeout=1)
+    assert conn.closed
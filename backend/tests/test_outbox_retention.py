@@ -0,0 +1,94 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.services import outbox_service
+from app.services.outbox_service import (
+    DEFAULT_PARTITION,
+    _add_months,
+    drop_expired_outbox_partitions,
+    ensure_outbox_partitions,
+    partition_name,
+)
+
+
+def test_monthly_partition_names_roll_over_years():
+    assert _add_months(date(2026, 11, 1), 1) == date(2026, 12, 1)
+    assert _add_months(date(2026, 12, 1), 1) == date(2027, 1, 1)
+    assert _add_months(date(2027, 1, 1), -1) == date(2026, 12, 1)
+    assert partition_name(date(2027, 1, 1)) == "outbox_events_p202701"
+
+
+class FakeResult:
+    def __init__(self, rows=(), scalar=None) -> None:
+        self._rows = rows
+        self._scalar = scalar
+
+    def all(self):
+        return list(self._rows)
+
+    def scalar(self):
+        return self._scalar
+
+
+class FakeCatalog:
+    """Records DDL and answers the partition-listing and pending-rows queries."""
+
+    def __init__(self, partitions, pending=()) -> None:
+        self.partitions = list(partitions)
+        self.pending = set(pending)
+        self.statements: list[str] = []
+
+    async def execute(self, stmt):
+        sql = str(stmt)
+        self.statements.append(sql)
+        if "pg_inherits" in sql:
+            return FakeResult(rows=[(p,) for p in self.partitions])
+        if sql.startswith("SELECT EXISTS"):
+            return FakeResult(scalar=any(f"FROM {p} " in sql for p in self.pending))
+        return FakeResult()
+
+
+@pytest.fixture
+def frozen_now(monkeypatch):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+    monkeypatch.setattr(outbox_service, "datetime", FrozenDatetime)
+
+
+@pytest.mark.anyio
+async def test_ensure_partitions_adds_default_and_missing_months(frozen_now):
+    db = FakeCatalog(["outbox_events_p202610"])
+
+    created = await ensure_outbox_partitions(db, date(2026, 10, 5))
+
+    assert created == ["outbox_events_p202611", "outbox_events_p202612"]
+    assert f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF outbox_events DEFAULT" in db.statements
+    # rows that fell into the default partition move into their month before it is attached
+    november = [s for s in db.statements if "outbox_events_p202611" in s]
+    assert [s.split()[0] for s in november] == ["CREATE", "WITH", "ALTER"]
+    assert "DELETE FROM outbox_events_default" in november[1]
+    assert "FOR VALUES FROM ('2026-11-01 00:00+00') TO ('2026-12-01 00:00+00')" in november[2]
+
+
+@pytest.mark.anyio
+async def test_ensure_partitions_is_idempotent(frozen_now):
+    db = FakeCatalog([DEFAULT_PARTITION, "outbox_events_p202610", "outbox_events_p202611", "outbox_events_p202612"])
+    assert await ensure_outbox_partitions(db, date(2026, 10, 1)) == []
+    assert len(db.statements) == 1  # just the listing
+
+
+@pytest.mark.anyio
+async def test_drop_expired_partitions_keeps_pending_current_and_default():
+    db = FakeCatalog(
+        [DEFAULT_PARTITION, "outbox_events_p202607", "outbox_events_p202608", "outbox_events_p202609"],
+        pending=["outbox_events_p202608"],
+    )
+
+    dropped = await drop_expired_outbox_partitions(db, datetime(2026, 9, 12, tzinfo=timezone.utc))
+
+    assert dropped == ["outbox_events_p202607"]  # 08 has pending events, 09 has not ended
+    assert [s for s in db.statements if s.startswith("DROP")] == ["DROP TABLE outbox_events_p202607"]
@@ -0,0 +1,33 @@
+from app.core import principal_cache
+from app.core.principal_cache import Principal, PrincipalCache
+
+
+def test_principal_cache_hit_and_invalidate():
+    cache = PrincipalCache(ttl_seconds=60)
+    assert cache.get(1) is None
+
+    p = cache.put(Principal(id=1, email="a@example.com", is_admin=True))
+    assert cache.get(1) is p
+
+    cache.invalidate(1)  # e.g. demoted
+    assert cache.get(1) is None
+
+
+def test_principal_cache_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(principal_cache.time, "monotonic", lambda: now[0])
+    cache = PrincipalCache(ttl_seconds=30)
+    p = cache.put(Principal(id=2, email="b@example.com", is_admin=False))
+
+    now[0] += 29
+    assert cache.get(2) is p
+
+    now[0] += 2  # past the TTL
+    assert cache.get(2) is None
+    assert 2 not in cache._entries
+
+
+def test_principal_cache_disabled_with_zero_ttl():
+    cache = PrincipalCache(ttl_seconds=0)
+    cache.put(Principal(id=3, email="c@example.com", is_admin=False))
+    assert cache.get(3) is None
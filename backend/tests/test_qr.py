@@ -0,0 +1,38 @@
+import pytest
+
+from app.core.metrics import metrics
+from app.utils import qr
+from app.utils.qr import qr_image, qr_image_data_url
+
+URI = "otpauth://totp/SkillsAssessment:a%40b.c?secret=JBSWY3DPEHPK3PXP&issuer=SkillsAssessment"
+
+
+@pytest.mark.anyio
+async def test_qr_rendering_is_cached_per_uri_and_format():
+    png = await qr_image(URI, "png")
+    svg = await qr_image(URI, "svg")
+    assert png.startswith(b"\x89PNG")
+    assert b"<svg" in svg
+
+    hits = metrics.snapshot()["counters"].get("qr_cache.hit", 0)
+    assert await qr_image(URI, "svg") is svg
+    assert metrics.snapshot()["counters"]["qr_cache.hit"] == hits + 1
+
+    assert (await qr_image_data_url(URI, "svg")).startswith("data:image/svg+xml;base64,")
+
+
+@pytest.mark.anyio
+async def test_qr_cache_expires_and_never_keys_on_the_secret(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(qr.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(qr.settings, "QR_CACHE_TTL_SECONDS", 60)
+    qr._rendered.clear()
+
+    await qr_image(URI, "png")
+    assert all("JBSWY3DPEHPK3PXP" not in key[1] for key in qr._rendered)
+
+    now[0] += 61
+    misses = metrics.snapshot()["counters"]["qr_cache.miss"]
+    await qr_image(URI, "svg")  # any access sweeps expired renders
+    assert ("png", qr.hashlib.sha256(URI.encode()).hexdigest()) not in qr._rendered
+    assert metrics.snapshot()["counters"]["qr_cache.miss"] == misses + 1
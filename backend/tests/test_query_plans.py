@@ -0,0 +1,50 @@
+"""
+Checks that hot queries can use their indexes. Sequential scans are disabled so
+the planner picks an index whenever one matches, regardless of table size;
+requires a migrated database (alembic upgrade head).
+"""
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.endpoints.exports import completed_rows_stmt, sector_performance_stmt
+from app.api.v1.endpoints.questions import duplicate_question_stmt, list_questions_stmt
+from app.api.v1.endpoints.telegram_webhook import active_session_stmt
+from app.models.assessment import AssessmentAnswer, Recommendation
+from app.services.outbox_service import claim_outbox_stmt, purge_outbox_stmt, replay_stmt
+
+
+async def _plan(conn, stmt) -> str:
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    async with conn.begin():
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        rows = await conn.exec_driver_sql(f"EXPLAIN {sql}")
+        return "\n".join(r[0] for r in rows)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    ("stmt", "index"),
+    [
+        (duplicate_question_stmt("soft", "Communication", "Some text"), "uq_questions_domain_category_text_norm"),
+        (list_questions_stmt(False, None, "communication"), "ix_questions_category_norm"),
+        (list_questions_stmt(True, None, None), "ix_questions_active_order"),
+        (claim_outbox_stmt(100), "ix_outbox_events_pending"),
+        (replay_stmt(1000, 1000), "outbox_events_pkey"),
+        (purge_outbox_stmt(datetime(2026, 1, 1, tzinfo=timezone.utc), 1000), "ix_outbox_events_created_at"),
+        # exports read completed assessments only
+        (completed_rows_stmt(), "ix_assessments_completed_updated_at_id"),
+        (completed_rows_stmt((datetime(2026, 1, 1, tzinfo=timezone.utc), 42), 1000), "ix_assessments_completed_updated_at_id"),
+        (sector_performance_stmt(), "ix_assessments_completed_sector"),
+        # scoring, and the lookups behind cascade deletes and RESTRICT checks
+        (select(AssessmentAnswer.option_id).where(AssessmentAnswer.assessment_id == 1), "uq_assessment_question"),
+        (select(AssessmentAnswer.id).where(AssessmentAnswer.question_id == 1), "ix_assessment_answers_question_id"),
+        (select(AssessmentAnswer.id).where(AssessmentAnswer.option_id == 1), "ix_assessment_answers_option_id"),
+        (delete(Recommendation).where(Recommendation.assessment_id == 1), "ix_recommendations_assessment_id"),
+        (active_session_stmt("12345"), "uq_chat_sessions_channel_phone"),
+    ],
+)
+async def test_hot_lookups_use_indexes(pg_conn, stmt, index):
+    assert index in await _plan(pg_conn, stmt)
@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import main
+from app.api.v1.endpoints import questions
+from app.api.v1.endpoints.telegram_webhook import category_totals, format_question
+from app.schemas.question import QuestionOut
+from app.services import question_bank_service
+from app.services.question_bank_service import BankSnapshot
+from app.services.question_cache import question_cache
+
+SNAPSHOT = {
+    "questions": [
+        {
+            "id": 10,
+            "text": "First?",
+            "domain": "soft",
+            "category": "Communication",
+            "display_order": 1,
+            "options": [
+                {"id": 101, "label": "b", "text": "No", "score": 1},
+                {"id": 100, "label": "a", "text": "Yes", "score": 5},
+            ],
+        },
+        {
+            "id": 7,
+            "text": "Second?",
+            "domain": "digital",
+            "category": "Use of Technology",
+            "display_order": 2,
+            "options": [{"id": 70, "label": "a", "text": "Yes", "score": 5}],
+        },
+    ]
+}
+
+
+def test_snapshot_navigation_and_indexes():
+    bank = BankSnapshot(3, SNAPSHOT)
+    assert len(bank) == 2
+    assert bank.first().id == 10
+    assert bank.next_after(10).id == 7
+    assert bank.next_after(7) is None
+    assert bank.options_by_id[70].question_id == 7
+
+
+def test_snapshot_derived_artefacts_are_memoised():
+    bank = BankSnapshot(3, SNAPSHOT)
+    q = bank.first()
+    msg = bank.derived(("telegram_message", q.id), lambda: format_question(q, total=len(bank)))
+    assert msg.startswith("Q1/2 (Soft - Communication)")
+    assert "A) Yes" in msg
+    assert bank.derived(("telegram_message", q.id), lambda: "rebuilt") is msg
+
+
+def test_frozen_question_serialises_like_the_model():
+    out = QuestionOut.model_validate(BankSnapshot(3, SNAPSHOT).first())
+    assert [o.id for o in out.options] == [101, 100]
+
+
+def test_snapshot_filters_like_the_live_listing():
+    bank = BankSnapshot(3, SNAPSHOT)
+    assert [q.id for q in bank.filtered()] == [10, 7]
+    assert [q.id for q in bank.filtered(domain="digital")] == [7]
+    assert [q.id for q in bank.filtered(norm_category="communication")] == [10]
+    assert [q.id for q in bank.filtered(after=(1, 10))] == [7]
+    assert [q.id for q in bank.filtered(limit=1)] == [10]
+
+
+@pytest.mark.anyio
+async def test_active_only_listing_serves_the_active_version(monkeypatch):
+    bank = BankSnapshot(3, SNAPSHOT)
+
+    async def active(_db):
+        return bank
+
+    async def no_db():
+        yield None
+
+    monkeypatch.setattr(questions, "get_active_snapshot", active)
+    main.app.dependency_overrides[questions.get_questions_read_db] = no_db
+    question_cache.invalidate()
+    try:
+        async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+            listed = await ac.get("/api/v1/questions", params={"active_only": "true", "limit": 1})
+            counted = await ac.get("/api/v1/questions/count", params={"active_only": "true"})
+    finally:
+        main.app.dependency_overrides.pop(questions.get_questions_read_db)
+        question_cache.invalidate()
+
+    assert listed.headers["X-Bank-Version"] == "3"
+    assert [q["id"] for q in listed.json()] == [10]
+    assert listed.headers["X-Next-Cursor"]
+    assert counted.json() == {"count": 2}
+
+
+@pytest.mark.anyio
+async def test_activation_is_serialised_before_touching_the_active_row():
+    class RecordingSession:
+        def __init__(self) -> None:
+            self.statements = []
+
+        async def execute(self, stmt):
+            self.statements.append(str(stmt))
+
+    db = RecordingSession()
+    await question_bank_service._swap_active(db, 5)
+    assert "pg_advisory_xact_lock" in db.statements[0]
+    assert all(s.startswith("UPDATE question_bank_versions") for s in db.statements[1:])
+
+
+@pytest.mark.anyio
+async def test_telegram_category_totals_use_the_pinned_bank():
+    class AnswerRows:
+        async def execute(self, _stmt):
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: [100, 70, 999]))
+
+    totals = await category_totals(AnswerRows(), 1, BankSnapshot(3, SNAPSHOT))
+    assert totals == {"Communication": [5, 1], "Use of Technology": [5, 1]}
@@ -0,0 +1,80 @@
+import gzip
+
+import pytest
+
+from app.api.v1.endpoints import questions
+from app.core.config import settings
+from app.services import question_cache
+from app.services.question_cache import QuestionListCache, accepts_gzip, etag_matches
+
+
+def test_cache_roundtrip_and_invalidate():
+    cache = QuestionListCache(ttl_seconds=0)
+    key = (True, None, None)
+    assert cache.get(key) is None
+
+    entry = cache.put(key, b'[{"id":1}]', cache.version)
+    assert gzip.decompress(entry.gzipped) == b'[{"id":1}]'
+    assert cache.get(key) is entry
+
+    cache.invalidate()
+    assert cache.get(key) is None
+
+
+def test_put_built_from_stale_version_is_not_cached():
+    cache = QuestionListCache(ttl_seconds=0)
+    version = cache.version
+    cache.invalidate()  # a create_question landed mid-query
+    cache.put(("k",), b"[]", version)
+    assert cache.get(("k",)) is None
+
+
+def test_etag_matches():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"x", "abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"x"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_accepts_gzip_honours_q_values():
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("br;q=1.0, gzip;q=0.5")
+    assert accepts_gzip("*")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("gzip; q=0.000, *")
+    assert not accepts_gzip("*;q=0")
+    assert not accepts_gzip("identity")
+    assert not accepts_gzip(None)
+
+
+@pytest.mark.anyio
+async def test_reads_go_to_the_primary_right_after_a_bank_write(monkeypatch):
+    async def primary():
+        yield "primary"
+
+    async def replica():
+        yield "replica"
+
+    async def session():
+        async for db in questions.get_questions_read_db():
+            return db
+
+    cache = QuestionListCache(ttl_seconds=0)
+    now = [1000.0]
+    monkeypatch.setattr(questions, "question_cache", cache)
+    monkeypatch.setattr(questions, "get_db", primary)
+    monkeypatch.setattr(questions, "get_read_db", replica)
+    monkeypatch.setattr(question_cache.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(settings, "REPLICA_MAX_LAG_SECONDS", 5)
+    monkeypatch.setattr(settings, "REPLICA_LAG_CHECK_SECONDS", 2)
+
+    assert await session() == "replica"
+    cache.invalidate()  # create_question / import
+    assert await session() == "primary"
+    now[0] += 6.9
+    assert await session() == "primary"
+    now[0] += 0.2
+    assert await session() == "replica"
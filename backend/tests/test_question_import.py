@@ -0,0 +1,53 @@
+import pytest
+
+from app.services.question_import_service import import_questions, parse_csv_rows
+
+CSV_BODY = b"""\xef\xbb\xbftext,domain,category,option_a,score_a,option_b,score_b
+ Q one ,soft,Comm,Yes,5,No,1
+Q  one,soft,comm,Yes,5,No,1
+Q two,digital,ICT,Only,5,,
+Q three,digital,ICT,Yes,5,No,1
+"""
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _ProbeOnlyDB:
+    """Answers the duplicate probe; dry runs must not issue anything else."""
+
+    def __init__(self, existing):
+        self.existing = existing
+        self.calls = 0
+
+    async def execute(self, stmt, params=None):
+        self.calls += 1
+        assert params is None
+        return _Rows(self.existing)
+
+
+def test_parse_csv_rows_normalises_cells():
+    items = parse_csv_rows(CSV_BODY)
+    assert [row for row, _ in items] == [2, 3, 4, 5]
+    _, first = items[0]
+    assert first["text"] == "Q one"
+    assert first["options"] == [
+        {"label": "A", "text": "Yes", "score": "5"},
+        {"label": "B", "text": "No", "score": "1"},
+    ]
+
+
+@pytest.mark.anyio
+async def test_import_dry_run_reports_each_row():
+    db = _ProbeOnlyDB(existing=[(7, "digital", "ict", "q three")])
+    report = await import_questions(db, parse_csv_rows(CSV_BODY), dry_run=True)
+
+    assert db.calls == 1  # one set-based duplicate probe
+    assert [r["status"] for r in report["rows"]] == ["valid", "duplicate", "invalid", "duplicate"]
+    assert report["rows"][3]["question_id"] == 7
+    assert (report["created"], report["duplicates"], report["invalid"]) == (0, 2, 1)
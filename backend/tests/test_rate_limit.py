@@ -0,0 +1,172 @@
+from types import SimpleNamespace
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app import main
+from app.api.v1.endpoints import auth
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.metrics import metrics
+from app.core.rate_limit import BucketSpec, MemoryTokenBucket, RedisTokenBucket
+from app.core.security import create_token
+
+
+@pytest.mark.anyio
+async def test_memory_bucket_allows_burst_then_rejects():
+    bucket = MemoryTokenBucket()
+    spec = BucketSpec("t", capacity=3, per_minute=1)
+
+    results = [await bucket.take("k", spec) for _ in range(4)]
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] > 0  # retry-after
+
+    # other keys have their own bucket
+    assert (await bucket.take("other", spec))[0]
+
+
+class FakeScriptRedis:
+    """register_script() stand-in: records calls and answers like the Lua script (or raises)."""
+
+    def __init__(self, *replies) -> None:
+        self.replies = list(replies)
+        self.calls = []
+
+    def register_script(self, _source):
+        async def script(keys, args):
+            self.calls.append((keys, args))
+            reply = self.replies.pop(0)
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+
+        return script
+
+
+def counter(name: str) -> float:
+    return metrics.snapshot()["counters"].get(name, 0)
+
+
+@pytest.mark.anyio
+async def test_redis_bucket_runs_the_script_and_falls_back_to_memory(monkeypatch):
+    redis = FakeScriptRedis([1, "0"], [0, "2.5"], RedisConnectionError("down"))
+    monkeypatch.setattr(rate_limit, "get_redis", lambda: redis)
+    bucket = RedisTokenBucket(prefix="rl:")
+    spec = BucketSpec("t", capacity=2, per_minute=30)
+
+    assert await bucket.take("k", spec) == (True, 0.0)
+    assert await bucket.take("k", spec) == (False, 2.5)
+    assert redis.calls[0] == (["rl:k"], [2, 0.5])
+
+    errors = counter("rate_limit.backend_errors")
+    assert (await bucket.take("k", spec))[0]  # fail open onto the local bucket
+    assert counter("rate_limit.backend_errors") == errors + 1
+    assert "k" in bucket._fallback._buckets
+
+
+@pytest.fixture
+async def redis_client():
+    from app.core.redis_client import get_redis
+
+    client = get_redis()
+    try:
+        await client.ping()
+    except Exception as exc:  # noqa: BLE001 - any failure means "no Redis here"
+        pytest.skip(f"Redis not reachable: {exc}")
+    return client
+
+
+@pytest.mark.anyio
+async def test_redis_lua_bucket_against_a_real_server(redis_client):
+    bucket = RedisTokenBucket(prefix="test:ratelimit:")
+    spec = BucketSpec("t", capacity=2, per_minute=1)
+    await redis_client.delete("test:ratelimit:k")
+
+    results = [await bucket.take("k", spec) for _ in range(3)]
+    assert [allowed for allowed, _ in results] == [True, True, False]
+    assert 0 < results[-1][1] <= 60
+    assert 0 < await redis_client.ttl("test:ratelimit:k") <= 121
+    await redis_client.delete("test:ratelimit:k")
+
+
+@pytest.fixture
+async def auth_client(monkeypatch):
+    """Auth endpoints with tiny buckets; the services record calls instead of hashing or touching a DB."""
+    calls = []
+
+    async def fake_signup(_db, email, full_name, password):
+        calls.append("signup")
+        return SimpleNamespace(id=1, email=email, is_admin=False)
+
+    async def fake_login_step(_db, email, password):
+        calls.append("login")
+        return {"mfa_required": False, "access_token": "t"}
+
+    async def fake_verify(_db, temp_token, code):
+        calls.append("verify")
+        return "t"
+
+    async def no_db():
+        yield None
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "login_limiter", MemoryTokenBucket())
+    monkeypatch.setattr(rate_limit, "LOGIN_PER_IP", BucketSpec("login_ip", capacity=2, per_minute=1))
+    monkeypatch.setattr(rate_limit, "LOGIN_PER_ACCOUNT", BucketSpec("login_account", capacity=1, per_minute=1))
+    monkeypatch.setattr(auth, "signup", fake_signup)
+    monkeypatch.setattr(auth, "issue_access_token", lambda _user: "t")
+    monkeypatch.setattr(auth, "login_step", fake_login_step)
+    monkeypatch.setattr(auth, "verify_2fa_login", fake_verify)
+    main.app.dependency_overrides[get_db] = no_db
+    try:
+        async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+            yield ac, calls
+    finally:
+        main.app.dependency_overrides.pop(get_db)
+
+
+@pytest.mark.anyio
+async def test_signup_is_throttled_per_ip_before_hashing(auth_client):
+    client, calls = auth_client
+    body = {"email": "a@example.com", "full_name": "Ann", "password": "pw-123456"}
+    rejected = counter("rate_limit.login_ip.rejected")
+
+    assert [(await client.post("/api/v1/auth/signup", json=body)).status_code for _ in range(2)] == [200, 200]
+    resp = await client.post("/api/v1/auth/signup", json=body)
+
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) >= 1
+    assert calls == ["signup", "signup"]  # the rejected request never reached the service
+    assert counter("rate_limit.login_ip.rejected") == rejected + 1
+
+
+@pytest.mark.anyio
+async def test_login_is_throttled_per_account(auth_client):
+    client, calls = auth_client
+    allowed = counter("rate_limit.login_account.allowed")
+    rejected = counter("rate_limit.login_account.rejected")
+
+    first = await client.post("/api/v1/auth/login", json={"email": "Victim@example.com", "password": "x"})
+    # same account, differently spelled: shares the bucket
+    second = await client.post("/api/v1/auth/login", json={"email": "VICTIM@example.com", "password": "y"})
+
+    assert first.status_code == 200
+    assert second.status_code == 429 and second.headers["Retry-After"] == "60"
+    assert calls == ["login"]
+    assert counter("rate_limit.login_account.allowed") == allowed + 1
+    assert counter("rate_limit.login_account.rejected") == rejected + 1
+
+
+@pytest.mark.anyio
+async def test_2fa_verify_is_throttled_per_user(auth_client):
+    client, calls = auth_client
+    temp = create_token("42", 5, token_type="2fa")
+
+    ok = await client.post("/api/v1/auth/2fa/verify-login", json={"temp_token": temp, "code": "000000"})
+    throttled = await client.post("/api/v1/auth/2fa/verify-login", json={"temp_token": temp, "code": "111111"})
+
+    assert ok.status_code == 200
+    assert throttled.status_code == 429 and "Retry-After" in throttled.headers
+    assert calls == ["verify"]
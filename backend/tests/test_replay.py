@@ -0,0 +1,93 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.events import ConnectionManager, EventBus
+from app.services.outbox_service import replay_events
+
+
+def bus_message(event_id, sector="Health"):
+    event = {"id": event_id, "type": "assessment_submitted", "payload": {"respondent_sector": sector}}
+    return {"type": "message", "data": json.dumps(event)}
+
+
+@pytest.mark.anyio
+async def test_resume_replays_missed_events_once_and_in_order(fake_socket):
+    manager = ConnectionManager()
+    bus = EventBus(manager, "test")
+    for event_id, sector in ((10, "Health"), (11, "Health"), (12, "Education"), (13, "Health")):
+        await bus.handle(bus_message(event_id, sector))
+
+    socket = fake_socket()
+    conn = manager.register(socket)
+    manager.subscribe(conn, {"sectors": ["Health"]})
+
+    conn.hold()
+    await bus.handle(bus_message(14))  # live event racing the replay: held, then deduplicated
+    result = await replay_events(conn, bus, session_factory=None, last_event_id=11)
+    await bus.handle(bus_message(15))
+    await asyncio.sleep(0.01)
+
+    assert result == {"replayed": 2, "truncated": False}
+    assert [json.loads(m)["id"] for m in socket.sent] == [13, 14, 15]
+    manager.disconnect(socket)
+
+
+class FakeReplayDb:
+    """Outbox replay query that returns `rows`; `during` runs while it is in flight."""
+
+    def __init__(self, rows, during) -> None:
+        self.rows = rows
+        self.during = during
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+    async def execute(self, _stmt):
+        await self.during()
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+@pytest.mark.anyio
+async def test_event_committed_out_of_order_during_replay_is_not_lost(fake_socket):
+    manager = ConnectionManager()
+    bus = EventBus(manager, "test")
+    socket = fake_socket()
+    conn = manager.register(socket)
+
+    # 13 and 15 were processed; 14 (allocated earlier, committed later) arrives live mid-replay
+    rows = [(eid, "assessment_submitted", {"respondent_sector": "Health"}) for eid in (13, 15)]
+    db = FakeReplayDb(rows, during=lambda: bus.handle(bus_message(14)))
+    result = await replay_events(conn, bus, db, last_event_id=12)
+    await asyncio.sleep(0.01)
+
+    assert result == {"replayed": 2, "truncated": False}
+    assert [json.loads(m)["id"] for m in socket.sent] == [13, 15, 14]
+    manager.disconnect(socket)
+
+
+@pytest.mark.anyio
+async def test_held_live_messages_are_bounded(fake_socket):
+    manager = ConnectionManager(max_queue=2, policy="drop_oldest")
+    socket = fake_socket()
+    conn = manager.register(socket)
+
+    conn.hold()
+    for event_id in (1, 2, 3):
+        assert conn.offer(str(event_id), event_id)
+    assert [eid for eid, _message in conn._held] == [2, 3]
+    conn.release([])
+
+    conn.policy = "disconnect"
+    conn.hold()
+    assert conn.offer("4", 4) and conn.offer("5", 5)
+    assert not conn.offer("6", 6)
+    manager.disconnect(socket)
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core import database
+from app.core.database import ReplicaLagGuard
+
+
+class FakeResult:
+    def __init__(self, value) -> None:
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class FakeReplica:
+    """Session factory whose lag query returns the next value (or raises)."""
+
+    def __init__(self, *lags) -> None:
+        self.lags = list(lags)
+        self.checks = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+    async def execute(self, _stmt):
+        self.checks += 1
+        lag = self.lags.pop(0)
+        if isinstance(lag, Exception):
+            raise lag
+        if lag == "hang":
+            await asyncio.sleep(60)
+        return FakeResult(lag)
+
+
+@pytest.mark.anyio
+async def test_guard_falls_back_when_lagging_or_unreachable():
+    replica = FakeReplica(0.4, 30.0, OSError("down"), None)
+    guard = ReplicaLagGuard(replica, max_lag_seconds=5, check_seconds=0)
+
+    assert await guard.healthy()
+    assert not await guard.healthy()  # too far behind
+    assert not await guard.healthy()  # cannot ask it
+    assert not await guard.healthy()  # replay position unknown
+
+
+@pytest.mark.anyio
+async def test_guard_checks_lag_at_most_once_per_interval():
+    replica = FakeReplica(0.0)
+    guard = ReplicaLagGuard(replica, max_lag_seconds=5, check_seconds=60)
+
+    for _ in range(10):
+        assert await guard.healthy()
+    assert replica.checks == 1
+
+
+@pytest.mark.anyio
+async def test_hung_lag_check_times_out_as_unhealthy():
+    replica = FakeReplica("hang", 0.0)
+    guard = ReplicaLagGuard(replica, max_lag_seconds=5, check_seconds=0.2, timeout_seconds=0.05)
+
+    started = time.monotonic()
+    results = await asyncio.gather(*(guard.healthy() for _ in range(5)))
+    assert not any(results)  # waiters share the one timed-out check
+    assert time.monotonic() - started < 1
+    assert replica.checks == 1
+
+    await asyncio.sleep(0.2)
+    assert await guard.healthy()  # the next interval asks again
+
+
+@pytest.mark.anyio
+async def test_read_sessions_route_by_replica_health(monkeypatch):
+    class Guard:
+        ok = True
+
+        async def healthy(self) -> bool:
+            return self.ok
+
+    primary, replica = FakeReplica(), FakeReplica()
+    guard = Guard()
+    monkeypatch.setattr(database, "AsyncSessionLocal", primary)
+    monkeypatch.setattr(database, "ReplicaSessionLocal", replica)
+    monkeypatch.setattr(database, "replica_guard", guard)
+
+    async def session():
+        async for db in database.get_read_db():
+            return db
+
+    assert await session() is replica
+    guard.ok = False
+    assert await session() is primary
@@ -0,0 +1,15 @@
+import pytest
+
+from app.core.metrics import metrics
+from app.core.security import hash_password_async, verify_password_async
+
+
+@pytest.mark.anyio
+async def test_password_hashing_runs_in_executor():
+    hashed = await hash_password_async("correct horse battery")
+    assert await verify_password_async("correct horse battery", hashed)
+    assert not await verify_password_async("wrong password", hashed)
+
+    timings = metrics.snapshot()["timings"]
+    assert timings["password_hash.run_seconds"]["count"] >= 3
+    assert "password_hash.wait_seconds" in timings
@@ -0,0 +1,22 @@
+import msgpack
+
+from app.core.wire import FIELD_IDS, batch_frame, pack_event
+
+
+def test_events_use_integer_field_ids_and_batch_without_reencoding():
+    event = {
+        "id": 7,
+        "type": "assessment_submitted",
+        "payload": {"overall_score": 3.5, "categories": {"id": [4, 1]}},
+    }
+    packed = pack_event(event)
+    assert msgpack.unpackb(packed, strict_map_key=False) == {
+        FIELD_IDS["id"]: 7,
+        FIELD_IDS["type"]: "assessment_submitted",
+        # category names are data, not schema: left alone
+        FIELD_IDS["payload"]: {FIELD_IDS["overall_score"]: 3.5, FIELD_IDS["categories"]: {"id": [4, 1]}},
+    }
+
+    for n in (1, 15, 16, 70_000):
+        frame = batch_frame([packed] * n)
+        assert frame == msgpack.packb([msgpack.unpackb(packed, strict_map_key=False)] * n)
@@ -0,0 +1,34 @@
+import asyncio
+import threading
+
+from app.tasks.runtime import WorkerRuntime
+
+
+def test_tasks_share_one_loop_and_engine():
+    runtime = WorkerRuntime()
+
+    async def where(session_factory):
+        return asyncio.get_running_loop(), session_factory
+
+    try:
+        loop1, factory1 = runtime.run(where)  # started lazily
+        engine = runtime.engine
+        loop2, factory2 = runtime.run(where)
+        assert loop1 is loop2 is runtime.loop
+        assert factory1 is factory2
+        assert runtime.engine is engine
+
+        # concurrent task threads submit to the same loop
+        seen = []
+        threads = [threading.Thread(target=lambda: seen.append(runtime.run(where)[0])) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert seen == [loop1] * 4
+    finally:
+        runtime.stop()
+
+    assert not runtime.running
+    assert loop1.is_closed()
+    runtime.stop()  # idempotent
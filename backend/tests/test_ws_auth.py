@@ -0,0 +1,56 @@
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app import main
+from app.api.v1.endpoints import ws
+from app.core.principal_cache import Principal, principal_cache
+from app.core.security import create_token
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    seen = []
+
+    async def replay(*args, **kwargs):
+        seen.append("replay")
+
+    async def snapshot():
+        seen.append("snapshot")
+        return {"total": 0}
+
+    monkeypatch.setattr(ws, "replay_events", replay)
+    monkeypatch.setattr(ws.live_dashboard, "snapshot", snapshot)
+    return seen
+
+
+def _rejected(url: str, **kwargs) -> int:
+    # no lifespan: only the handshake check is under test
+    client = TestClient(main.app)
+    with pytest.raises(WebSocketDisconnect) as info:
+        with client.websocket_connect(url, **kwargs) as socket:
+            socket.receive_text()
+    return info.value.code
+
+
+def test_unauthenticated_connect_gets_no_replay_or_snapshot(calls):
+    assert _rejected("/api/v1/ws/dashboard?last_event_id=0") == 1008
+    assert _rejected("/api/v1/ws/dashboard?last_event_id=0&token=garbage") == 1008
+    assert calls == []
+
+
+def test_non_admin_token_is_rejected(calls):
+    principal_cache.put(Principal(id=9101, email="user@example.com", is_admin=False))
+    token = create_token("9101", 5)
+    assert _rejected(f"/api/v1/ws/dashboard?last_event_id=0&token={token}") == 1008
+    assert _rejected("/api/v1/ws/dashboard", headers={"Authorization": f"Bearer {token}"}) == 1008
+    assert calls == []
+
+
+def test_admin_token_gets_replay_and_snapshot(calls):
+    principal_cache.put(Principal(id=9102, email="admin@example.com", is_admin=True))
+    token = create_token("9102", 5)
+    client = TestClient(main.app)
+    with client.websocket_connect(f"/api/v1/ws/dashboard?last_event_id=0&token={token}") as socket:
+        assert socket.receive_json() == {"type": "dashboard_snapshot", "data": {"total": 0}}
+    assert calls == ["replay", "snapshot"]
@@ -33,15 +33,43 @@ export default function Dashboard() {
   useEffect(() => { load() }, [])
 
   useEffect(() => {
-    const ws = new WebSocket(`${WS_BASE}/api/v1/ws/dashboard`)
-    ws.onopen = () => ws.send('ping')
-    ws.onmessage = (msg) => {
-      const ev = JSON.parse(msg.data)
-      setEvents((prev) => [ev, ...prev].slice(0, 20))
-      load()
+    let ws
+    let lastEventId = null
+    let retry = null
+    let stopped = false
+
+    const connect = () => {
+      // admin access token in the query string (browsers cannot set headers here);
+      // after a drop, resume: the server replays missed events and sends a fresh snapshot
+      const params = new URLSearchParams({ token: localStorage.getItem('access_token') || '' })
+      if (lastEventId !== null) params.set('last_event_id', lastEventId)
+      ws = new WebSocket(`${WS_BASE}/api/v1/ws/dashboard?${params}`)
+      ws.onopen = () => ws.send('ping')
+      ws.onmessage = (msg) => {
+        const ev = JSON.parse(msg.data)
+        if (ev.id !== undefined) lastEventId = ev.id
+        if (ev.type === 'dashboard_snapshot') {
+          setSummary(ev.data)
+          return
+        }
+        if (ev.type === 'dashboard_delta') {
+          // server-computed, coalesced aggregates: merge instead of refetching
+          const changed = { ...ev.data }
+          delete changed.gaps // per-area entries; top_gaps already carries the chart data
+          setSummary((prev) => (prev ? { ...prev, ...changed } : prev))
+          return
+        }
+        if (ev.type !== 'assessment_submitted') return
+        setEvents((prev) => [ev, ...prev].slice(0, 20))
+      }
+      ws.onclose = () => {
+        if (!stopped) retry = setTimeout(connect, 1000 + Math.random() * 4000)
+      }
     }
+
+    connect()
     const i = setInterval(() => ws.readyState === 1 && ws.send('ping'), 20000)
-    return () => { clearInterval(i); ws.close() }
+    return () => { stopped = true; clearInterval(i); clearTimeout(retry); ws.close() }
   }, [])
 
   const gaps = useMemo(() => summary?.top_gaps || [], [summary])